@@ -0,0 +1,175 @@
+import os
+import glob
+import random
+import struct
+import zlib
+
+
+# 基准测试使用的固定公众号信息
+FIXTURE_FAKEID = 'MzA5MDAwMDAwMA=='
+FIXTURE_NICKNAME = '基准测试公众号'
+
+_PARAGRAPH_WORDS = ['微信', '公众号', '文章', '采集', '性能', '测试', '数据', '内容', '图片', '下载',
+                    '解析', '转换', '线程', '队列', '网络', '请求', '缓存', '存储', '分析', '优化']
+
+
+def _sentence(rng, min_words=8, max_words=30):
+    """生成一个随机句子"""
+    words = [rng.choice(_PARAGRAPH_WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ''.join(words) + '。'
+
+
+def _paragraph(rng):
+    """生成带内联样式的段落，模拟公众号编辑器的输出"""
+    parts = []
+    for _ in range(rng.randint(2, 5)):
+        kind = rng.random()
+        text = _sentence(rng)
+        if kind < 0.15:
+            parts.append(f'<strong>{text}</strong>')
+        elif kind < 0.25:
+            parts.append(f'<em>{text}</em>')
+        elif kind < 0.3:
+            parts.append(f'<a href="https://mp.weixin.qq.com/s/{rng.randint(1000, 9999)}">{text}</a>')
+        else:
+            parts.append(f'<span style="font-size: 15px;color: rgb(62, 62, 62);">{text}</span>')
+    return f'<p style="margin-bottom: 0px;">{"".join(parts)}</p>'
+
+
+def build_article_html(seed, image_base_url, paragraphs=40, images=8):
+    """生成一篇结构接近真实公众号文章的HTML页面
+
+    Args:
+        seed: 随机种子，相同种子生成相同页面
+        image_base_url: 图片地址前缀（指向桩服务器）
+        paragraphs: 段落数量
+        images: 图片数量
+
+    Returns:
+        tuple: (标题, HTML文本)
+    """
+    rng = random.Random(seed)
+    title = f'基准测试文章{seed:04d}：{_sentence(rng, 4, 8)}'
+    blocks = []
+    image_slots = set(rng.sample(range(paragraphs), min(images, paragraphs)))
+    for i in range(paragraphs):
+        kind = rng.random()
+        if kind < 0.08:
+            blocks.append(f'<h2>{_sentence(rng, 3, 6)}</h2>')
+        elif kind < 0.14:
+            items = ''.join(f'<li>{_sentence(rng)}</li>' for _ in range(rng.randint(2, 5)))
+            tag = 'ol' if rng.random() < 0.5 else 'ul'
+            blocks.append(f'<{tag}>{items}</{tag}>')
+        elif kind < 0.2:
+            blocks.append(f'<blockquote><p>{_sentence(rng)}</p><p>{_sentence(rng)}</p></blockquote>')
+        elif kind < 0.5:
+            blocks.append(f'<section style="line-height: 1.75em;">{_paragraph(rng)}</section>')
+        else:
+            blocks.append(_paragraph(rng))
+        if i in image_slots:
+            blocks.append(
+                f'<section style="text-align: center;"><img class="rich_pages wxw-img" '
+                f'data-src="{image_base_url}/mmbiz_jpg/{seed}_{i}/640?wx_fmt=jpeg" data-ratio="0.56" data-w="1080"></section>'
+            )
+    # 正文前后保留页面其他部分，使解析成本接近真实页面
+    html = f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script>var msg_title = "{title}"; var msg_desc = "{_sentence(rng)}"; var ct = "{1700000000 + seed}";</script>
+</head><body id="activity-detail" class="zh_CN">
+<div class="rich_media_wrp"><div class="rich_media_inner">
+<h1 class="rich_media_title" id="activity-name">{title}</h1>
+<div id="meta_content" class="rich_media_meta_list"><span id="js_name">{FIXTURE_NICKNAME}</span></div>
+<div class="rich_media_content js_underline_content" id="js_content" style="visibility: hidden;">
+{"".join(blocks)}
+</div>
+</div></div>
+<script>{"var x = 1;" * 200}</script>
+</body></html>'''
+    return title, html
+
+
+def build_list_page(offset, count, total, article_base_url):
+    """生成 appmsg?action=list_ex 接口的返回数据
+
+    Args:
+        offset: 起始位置
+        count: 每页数量
+        total: 文章总数
+        article_base_url: 文章链接前缀（指向桩服务器）
+
+    Returns:
+        dict: 接口返回的JSON数据
+    """
+    articles = []
+    for index in range(offset, min(offset + count, total)):
+        articles.append({
+            'aid': f'{2247480000 + index}_1',
+            'title': f'基准测试文章{index:04d}',
+            'link': f'{article_base_url}/s/{index}',
+            'create_time': 1700000000 + index * 3600,
+            'cover': '',
+            'digest': ''
+        })
+    return {
+        'base_resp': {'ret': 0, 'err_msg': 'ok'},
+        'app_msg_cnt': total,
+        'app_msg_list': articles
+    }
+
+
+def build_search_result():
+    """生成 searchbiz 接口的返回数据"""
+    return {
+        'base_resp': {'ret': 0, 'err_msg': 'ok'},
+        'list': [{
+            'fakeid': FIXTURE_FAKEID,
+            'nickname': FIXTURE_NICKNAME,
+            'alias': '',
+            'round_head_img': ''
+        }],
+        'total': 1
+    }
+
+
+def build_png(width=64, height=64, seed=0):
+    """生成一张PNG图片，用作桩服务器返回的图片内容
+
+    Args:
+        width: 宽度
+        height: 高度
+        seed: 随机种子
+
+    Returns:
+        bytes: PNG文件内容
+    """
+    rng = random.Random(seed)
+    raw = b''.join(b'\x00' + bytes(rng.randrange(256) for _ in range(width * 3)) for _ in range(height))
+
+    def _chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + _chunk(b'IDAT', zlib.compress(raw))
+            + _chunk(b'IEND', b''))
+
+
+def load_recorded_pages(fixtures_dir=None):
+    """加载录制的真实文章页面
+
+    将浏览器保存的文章页面（.html）放入 benchmarks/fixtures/ 目录即可参与解析基准测试。
+
+    Args:
+        fixtures_dir: 录制页面所在目录
+
+    Returns:
+        list: [(文件名, HTML文本)]
+    """
+    if fixtures_dir is None:
+        fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, '*.html'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
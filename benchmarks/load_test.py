@@ -0,0 +1,170 @@
+"""对模拟微信后台进行抓取并发压测
+
+在仓库根目录运行：
+
+    python -m benchmarks.load_test --searches 8 --download-threads 16 --rate-multiplier 100 --latency 80 --freq-rate 0.02
+
+--rate-multiplier 按倍数缩短 SearchThread 的批次间延时，100 即为线上抓取速率的 100 倍。
+指定 --base-url 时使用已启动的模拟服务，否则自动在本地启动一个。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from benchmarks import fixtures
+from benchmarks.mock_wechat_server import build_arg_parser, server_from_args
+from utils.article_downloader import ArticleDownloadManager
+from utils.fakeid_cache import FakeidCache
+from utils.metrics import get_metrics
+from utils.search_thread import SearchThread
+
+
+def run_searches(count, rate_multiplier, cache_path):
+    """并发运行多个 SearchThread，返回收集到的文章列表
+
+    Args:
+        count: 并发搜索数
+        rate_multiplier: 速率倍数
+        cache_path: fakeid缓存文件路径
+
+    Returns:
+        tuple: (文章列表, 失败信息列表)
+    """
+    articles = []
+    failures = []
+    lock = threading.Lock()
+    cache = FakeidCache(cache_path)
+
+    def _collect(items):
+        with lock:
+            articles.extend(items)
+
+    def _fail(message):
+        with lock:
+            failures.append(message)
+
+    workers = []
+    for index in range(count):
+        search = SearchThread(fixtures.FIXTURE_NICKNAME, {'token': f'load{index}', 'cookie': ''},
+                              fakeid_cache=cache)
+        low, high = search.batch_delay
+        search.batch_delay = (low / rate_multiplier, high / rate_multiplier)
+        search.search_success.connect(_collect)
+        search.search_failed.connect(_fail)
+        # 直接在Python线程中执行，避免依赖Qt事件循环
+        worker = threading.Thread(target=search.run)
+        worker.daemon = True
+        workers.append((search, worker))
+        worker.start()
+
+    for _, worker in workers:
+        worker.join()
+    return articles, failures
+
+
+def run_downloads(links, threads, timeout):
+    """使用 ArticleDownloadManager 下载文章
+
+    Args:
+        links: 文章链接列表
+        threads: 下载线程数
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        dict: 各状态的文章数
+    """
+    work_dir = tempfile.mkdtemp(prefix='mp_load_')
+    try:
+        manager = ArticleDownloadManager(save_dir=work_dir)
+        manager.max_threads = threads
+        for index, link in enumerate(links):
+            manager.add_article({'title': f'压测文章{index:05d}', 'link': link})
+
+        manager.start_download()
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            statuses = [manager.get_article_status(link)['status'] for link in links]
+            if not any(status in ('等待下载', '下载中...') for status in statuses):
+                break
+            time.sleep(0.1)
+        manager.stop_download()
+
+        summary = {}
+        for link in links:
+            status = manager.get_article_status(link)['status']
+            summary[status] = summary.get(status, 0) + 1
+        return summary
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = build_arg_parser(argparse.ArgumentParser(description='抓取并发压测'))
+    parser.add_argument('--base-url', help='已启动的模拟服务地址，不指定时自动启动')
+    parser.add_argument('--searches', type=int, default=4, help='并发 SearchThread 数量')
+    parser.add_argument('--rate-multiplier', type=float, default=100, help='相对线上抓取速率的倍数')
+    parser.add_argument('--download-threads', type=int, default=8, help='下载线程数')
+    parser.add_argument('--max-downloads', type=int, default=200, help='最多下载的文章数')
+    parser.add_argument('--timeout', type=float, default=600, help='下载阶段最长等待时间（秒）')
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+    else:
+        server = server_from_args(args).start()
+        base_url = server.base_url
+
+    previous_base_url = os.environ.get('MP_BASE_URL')
+    os.environ['MP_BASE_URL'] = base_url
+    cache_dir = tempfile.mkdtemp(prefix='mp_load_')
+    metrics = get_metrics()
+    metrics.reset()
+    report = {'base_url': base_url, 'searches': args.searches, 'rate_multiplier': args.rate_multiplier}
+    try:
+        print(f'开始压测列表翻页: {args.searches} 个并发搜索')
+        start = time.perf_counter()
+        articles, failures = run_searches(args.searches, args.rate_multiplier,
+                                          os.path.join(cache_dir, 'fakeid_cache.json'))
+        elapsed = time.perf_counter() - start
+        report['search'] = {
+            'articles': len(articles),
+            'failures': failures,
+            'elapsed_sec': round(elapsed, 3),
+            'articles_per_sec': round(len(articles) / elapsed, 2)
+        }
+
+        links = list(dict.fromkeys(article['链接'] for article in articles))[:args.max_downloads]
+        print(f'开始压测文章下载: {len(links)} 篇, {args.download_threads} 个线程')
+        start = time.perf_counter()
+        summary = run_downloads(links, args.download_threads, args.timeout)
+        elapsed = time.perf_counter() - start
+        report['download'] = {
+            'articles': len(links),
+            'threads': args.download_threads,
+            'statuses': summary,
+            'elapsed_sec': round(elapsed, 3),
+            'articles_per_sec': round(summary.get('下载成功', 0) / elapsed, 2)
+        }
+    finally:
+        if previous_base_url is None:
+            os.environ.pop('MP_BASE_URL', None)
+        else:
+            os.environ['MP_BASE_URL'] = previous_base_url
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if server:
+            report['server'] = {'requests': server.request_counts, 'injected': server.event_counts}
+            server.stop()
+
+    report['metrics'] = metrics.snapshot()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""本地模拟微信后台，用于压测抓取并发
+
+在仓库根目录运行：
+
+    python -m benchmarks.mock_wechat_server --port 8900 --latency 80 --jitter 40 --error-rate 0.01 --freq-rate 0.02
+
+然后设置环境变量 MP_BASE_URL=http://127.0.0.1:8900（或在 config.json 中配置 MP_BASE_URL），
+SearchThread 即会请求模拟服务，列表中的文章链接和图片地址也都指向模拟服务。
+"""
+import sys
+import time
+import random
+import argparse
+import threading
+
+from benchmarks.stub_server import StubWeChatHandler, StubWeChatServer
+
+
+# 微信接口触发频率限制时返回的错误码
+FREQ_CONTROL_RET = 200013
+
+# 触发频率限制时文章页面返回的验证页
+FREQ_CONTROL_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>验证</title></head>
+<body><div class="weui-msg"><h2 class="weui-msg__title">环境异常</h2>
+<p class="weui-msg__desc">当前环境异常，完成验证后即可继续访问。</p></div></body></html>'''.encode('utf-8')
+
+
+class RateLimiter:
+    """令牌桶限流，模拟微信按请求速率触发频率限制"""
+
+    def __init__(self, rate, burst=None):
+        """初始化限流器
+
+        Args:
+            rate: 每秒允许的请求数，0 表示不限流
+            burst: 桶容量，默认等于 rate
+        """
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """是否允许本次请求"""
+        if not self.rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class MockWeChatHandler(StubWeChatHandler):
+    """在桩服务器基础上注入延迟、错误和频率限制"""
+
+    def do_GET(self):
+        stub = self.stub
+        path = self.path.split('?', 1)[0]
+        kind = 'image' if path.startswith('/mmbiz_') else 'article' if path.startswith('/s/') else 'api'
+
+        # 模拟网络和服务端处理延迟
+        delay = stub.latency + random.uniform(0, stub.jitter)
+        if kind == 'image':
+            delay += stub.image_latency
+        if delay > 0:
+            time.sleep(delay)
+
+        # 随机服务端错误
+        if random.random() < stub.error_rate:
+            stub.count_event('http_error')
+            self.send_error(503)
+            return
+
+        # 频率限制：超过速率上限或按概率随机触发
+        if kind != 'image' and (not stub.limiter.allow() or random.random() < stub.freq_rate):
+            stub.count_event('freq_control')
+            if kind == 'api':
+                self._send_json({'base_resp': {'ret': FREQ_CONTROL_RET, 'err_msg': 'freq control'}})
+            else:
+                self._send_body(FREQ_CONTROL_PAGE, 'text/html; charset=utf-8')
+            return
+
+        super().do_GET()
+
+
+class MockWeChatServer(StubWeChatServer):
+    """可配置延迟、错误率和频率限制的模拟微信后台"""
+
+    def __init__(self, total_articles=1000, latency=0.0, jitter=0.0, image_latency=0.0,
+                 error_rate=0.0, freq_rate=0.0, rate_limit=0, **kwargs):
+        """初始化模拟服务
+
+        Args:
+            total_articles: 列表接口返回的文章总数
+            latency: 每个请求的固定延迟（秒）
+            jitter: 额外的随机延迟上限（秒）
+            image_latency: 图片请求额外延迟（秒）
+            error_rate: 返回 HTTP 503 的概率
+            freq_rate: 随机返回频率限制的概率
+            rate_limit: 接口和文章页每秒允许的请求数，超过后返回频率限制，0 表示不限
+            **kwargs: 传递给 StubWeChatServer 的其他参数
+        """
+        kwargs.setdefault('handler_class', MockWeChatHandler)
+        super().__init__(total_articles=total_articles, **kwargs)
+        self.latency = latency
+        self.jitter = jitter
+        self.image_latency = image_latency
+        self.error_rate = error_rate
+        self.freq_rate = freq_rate
+        self.limiter = RateLimiter(rate_limit)
+        self.event_counts = {}
+
+    def count_event(self, name):
+        """统计注入的错误和限流次数"""
+        with self._lock:
+            self.event_counts[name] = self.event_counts.get(name, 0) + 1
+
+
+def build_arg_parser(parser=None):
+    """添加模拟服务的命令行参数"""
+    parser = parser or argparse.ArgumentParser(description='本地模拟微信后台')
+    parser.add_argument('--total-articles', type=int, default=1000, help='列表接口返回的文章总数')
+    parser.add_argument('--latency', type=float, default=0, help='固定延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=0, help='随机延迟上限（毫秒）')
+    parser.add_argument('--image-latency', type=float, default=0, help='图片额外延迟（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0, help='HTTP 503 概率')
+    parser.add_argument('--freq-rate', type=float, default=0, help='随机频率限制概率')
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒请求上限，超出返回频率限制')
+    return parser
+
+
+def server_from_args(args, port=0):
+    """根据命令行参数创建模拟服务"""
+    return MockWeChatServer(
+        total_articles=args.total_articles,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        image_latency=args.image_latency / 1000,
+        error_rate=args.error_rate,
+        freq_rate=args.freq_rate,
+        rate_limit=args.rate_limit,
+        port=port
+    )
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    parser.add_argument('--port', type=int, default=8900, help='监听端口')
+    args = parser.parse_args(argv)
+
+    server = server_from_args(args, port=args.port).start()
+    print(f'模拟服务已启动: {server.base_url}')
+    print(f'设置 MP_BASE_URL={server.base_url} 后即可让抓取请求指向模拟服务')
+    try:
+        while True:
+            time.sleep(10)
+            print(f'请求数: {server.request_counts}  注入事件: {server.event_counts}')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
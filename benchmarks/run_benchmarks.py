@@ -0,0 +1,272 @@
+"""离线性能基准测试
+
+在仓库根目录运行：
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json
+
+所有网络请求都发往本地桩服务器，不会访问微信服务器。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+
+from bs4 import BeautifulSoup
+
+from benchmarks import fixtures
+from benchmarks.stub_server import StubWeChatServer
+from utils.article_downloader import WeChatArticleDownloader, ArticleDownloadManager
+from utils.html_stream import extract_article_html, ArticleHTMLExtractor
+from utils.fakeid_cache import FakeidCache
+from utils.search_thread import SearchThread
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# 与 WeChatArticleDownloader._fetch_article_html 相同的读取块大小
+CHUNK_SIZE = 16384
+
+# 下载管理器中表示已结束的状态
+FINISHED_STATUSES = ('下载成功', '下载失败', '已取消')
+
+
+def bench_parse_convert(iterations=3, pages=20):
+    """解析与Markdown转换吞吐量（不涉及网络）
+
+    与 get_article_content 相同：按块流式提取标题和正文区域，只解析正文。
+
+    Args:
+        iterations: 重复轮数
+        pages: 每轮生成的文章数，另加 benchmarks/fixtures/ 中的录制页面
+
+    Returns:
+        dict: 测试结果
+    """
+    corpus = [fixtures.build_article_html(seed, 'http://127.0.0.1')[1] for seed in range(pages)]
+    corpus += [html for _, html in fixtures.load_recorded_pages()]
+    corpus = [html.encode('utf-8') for html in corpus]
+    total_bytes = sum(len(data) for data in corpus)
+
+    work_dir = tempfile.mkdtemp(prefix='mp_bench_')
+    try:
+        downloader = WeChatArticleDownloader(save_dir=work_dir)
+        parse_times = []
+        convert_times = []
+        for _ in range(iterations):
+            for data in corpus:
+                start = time.perf_counter()
+                chunks = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+                _, content_html, _ = extract_article_html(chunks, extractor=ArticleHTMLExtractor())
+                content = BeautifulSoup(content_html, 'html.parser').find('div') if content_html else None
+                parse_times.append(time.perf_counter() - start)
+                if content is None:
+                    continue
+
+                start = time.perf_counter()
+                downloader._preprocess_content(content)
+                # 模拟图片已下载到本地，使转换流程包含图片处理
+                for index, img in enumerate(content.find_all('img')):
+                    img['src'] = f'./images/bench_{index:03d}.jpg'
+                downloader._convert_to_markdown('基准测试', content)
+                convert_times.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    total_time = sum(parse_times) + sum(convert_times)
+    return {
+        'pages': len(parse_times),
+        'pages_per_sec': round(len(parse_times) / total_time, 2),
+        'mb_per_sec': round(total_bytes * iterations / total_time / 1024 / 1024, 3),
+        'parse_ms_median': round(statistics.median(parse_times) * 1000, 3),
+        'convert_ms_median': round(statistics.median(convert_times) * 1000, 3) if convert_times else 0.0
+    }
+
+
+def bench_download_manager(server, articles=30, threads=3, timeout=300):
+    """ArticleDownloadManager 端到端吞吐量
+
+    Args:
+        server: 已启动的桩服务器
+        articles: 下载文章数
+        threads: 下载线程数
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        dict: 测试结果
+    """
+    work_dir = tempfile.mkdtemp(prefix='mp_bench_')
+    try:
+        manager = ArticleDownloadManager(save_dir=work_dir)
+        manager.max_threads = threads
+        links = [f'{server.base_url}/s/{index}' for index in range(articles)]
+        for index, link in enumerate(links):
+            manager.add_article({'title': f'基准测试文章{index:04d}', 'link': link})
+
+        images_before = server.request_counts.get('image', 0)
+        start = time.perf_counter()
+        manager.start_download()
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            statuses = [manager.get_article_status(link)['status'] for link in links]
+            if all(status in FINISHED_STATUSES or status.startswith('下载失败') for status in statuses):
+                break
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        manager.stop_download()
+
+        succeeded = sum(1 for link in links if manager.get_article_status(link)['status'] == '下载成功')
+        images = server.request_counts.get('image', 0) - images_before
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'articles': articles,
+        'threads': threads,
+        'succeeded': succeeded,
+        'elapsed_sec': round(elapsed, 3),
+        'articles_per_sec': round(succeeded / elapsed, 2),
+        'images_per_sec': round(images / elapsed, 2)
+    }
+
+
+def bench_search_paging(server, limit=0):
+    """SearchThread 文章列表翻页吞吐量
+
+    Args:
+        server: 已启动的桩服务器
+        limit: 文章数量限制，0 表示抓取全部
+
+    Returns:
+        dict: 测试结果
+    """
+    cache_dir = tempfile.mkdtemp(prefix='mp_bench_')
+    previous_base_url = os.environ.get('MP_BASE_URL')
+    os.environ['MP_BASE_URL'] = server.base_url
+    try:
+        thread = SearchThread(
+            fixtures.FIXTURE_NICKNAME,
+            {'token': 'benchmark', 'cookie': ''},
+            article_limit=limit,
+            fakeid_cache=FakeidCache(os.path.join(cache_dir, 'fakeid_cache.json'))
+        )
+        # 基准测试只关注翻页吞吐，不做批次间延时
+        thread.batch_delay = (0, 0)
+        received = []
+        failures = []
+        thread.search_success.connect(received.extend)
+        thread.search_failed.connect(failures.append)
+
+        pages_before = server.request_counts.get('appmsg', 0)
+        start = time.perf_counter()
+        # 直接在当前线程执行，避免依赖Qt事件循环
+        thread.run()
+        elapsed = time.perf_counter() - start
+        pages = server.request_counts.get('appmsg', 0) - pages_before
+    finally:
+        if previous_base_url is None:
+            os.environ.pop('MP_BASE_URL', None)
+        else:
+            os.environ['MP_BASE_URL'] = previous_base_url
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        'articles': len(received),
+        'pages': pages,
+        'failures': len(failures),
+        'elapsed_sec': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 2),
+        'articles_per_sec': round(len(received) / elapsed, 2)
+    }
+
+
+def compare_results(current, baseline, threshold=0.1):
+    """与基线结果对比吞吐量指标
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 判定为性能下降的比例
+
+    Returns:
+        list: 性能下降的指标 [(测试名, 指标名, 基线值, 当前值, 变化比例)]
+    """
+    regressions = []
+    for name, metrics in current['results'].items():
+        base_metrics = baseline.get('results', {}).get(name, {})
+        for key, value in metrics.items():
+            base_value = base_metrics.get(key)
+            if not key.endswith('_per_sec') or not base_value:
+                continue
+            change = (value - base_value) / base_value
+            marker = ''
+            if change < -threshold:
+                regressions.append((name, key, base_value, value, change))
+                marker = '  <-- 下降'
+            print(f'  {name}.{key}: {base_value} -> {value} ({change:+.1%}){marker}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='离线性能基准测试')
+    parser.add_argument('--iterations', type=int, default=3, help='解析测试重复轮数')
+    parser.add_argument('--articles', type=int, default=30, help='下载测试的文章数')
+    parser.add_argument('--threads', type=int, default=3, help='下载测试的线程数')
+    parser.add_argument('--list-size', type=int, default=500, help='翻页测试的文章总数')
+    parser.add_argument('--only', choices=['parse', 'download', 'search'], action='append',
+                        help='只运行指定测试，可重复')
+    parser.add_argument('--output', help='结果文件路径，默认写入 benchmarks/results/')
+    parser.add_argument('--compare', help='对比的基线结果文件')
+    parser.add_argument('--threshold', type=float, default=0.1, help='判定性能下降的比例')
+    args = parser.parse_args(argv)
+
+    selected = args.only or ['parse', 'download', 'search']
+    results = {}
+
+    if 'parse' in selected:
+        print('运行解析与转换基准测试...')
+        results['parse_convert'] = bench_parse_convert(args.iterations)
+
+    if 'download' in selected or 'search' in selected:
+        with StubWeChatServer(total_articles=args.list_size) as server:
+            if 'download' in selected:
+                print('运行下载管理器基准测试...')
+                results['download_manager'] = bench_download_manager(server, args.articles, args.threads)
+            if 'search' in selected:
+                print('运行列表翻页基准测试...')
+                results['search_paging'] = bench_search_paging(server)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'结果已保存: {output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f'与基线对比: {args.compare}')
+        regressions = compare_results(report, baseline, args.threshold)
+        if regressions:
+            print(f'发现 {len(regressions)} 项性能下降')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import fixtures
+
+
+class StubWeChatHandler(BaseHTTPRequestHandler):
+    """桩服务器请求处理，按路径返回固定的接口数据、文章页面和图片"""
+
+    # 由 StubWeChatServer 注入
+    stub = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path
+        self.stub.count_request(path)
+
+        if path == '/cgi-bin/searchbiz':
+            self._send_json(fixtures.build_search_result())
+        elif path == '/cgi-bin/appmsg':
+            offset = int(query.get('begin', ['0'])[0])
+            count = int(query.get('count', ['5'])[0])
+            self._send_json(fixtures.build_list_page(offset, count, self.stub.total_articles, self.stub.base_url))
+        elif path.startswith('/s/'):
+            self._send_body(self.stub.get_article(path[3:]), 'text/html; charset=utf-8')
+        elif path.startswith('/mmbiz_'):
+            self._send_body(self.stub.image_bytes, 'image/png')
+        else:
+            self.send_error(404)
+
+    def _send_json(self, data):
+        self._send_body(json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def _send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 不在控制台输出访问日志
+        pass
+
+
+class StubWeChatServer:
+    """本地桩服务器，模拟公众号列表接口、文章页面和图片服务"""
+
+    def __init__(self, total_articles=100, paragraphs=40, images=8, host='127.0.0.1', port=0,
+                 handler_class=StubWeChatHandler):
+        """初始化桩服务器
+
+        Args:
+            total_articles: 列表接口返回的文章总数
+            paragraphs: 每篇文章的段落数
+            images: 每篇文章的图片数
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            handler_class: 请求处理类
+        """
+        self.total_articles = total_articles
+        self.paragraphs = paragraphs
+        self.images = images
+        self.image_bytes = fixtures.build_png()
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.request_counts = {}
+
+        handler = type('BoundStubHandler', (handler_class,), {'stub': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.base_url = f'http://{host}:{self._server.server_address[1]}'
+        self._thread = None
+
+    def get_article(self, article_id):
+        """获取文章页面，同一篇文章只生成一次"""
+        with self._lock:
+            page = self._pages.get(article_id)
+            if page is None:
+                seed = int(article_id) if article_id.isdigit() else abs(hash(article_id)) % 10000
+                _, html = fixtures.build_article_html(seed, self.base_url, self.paragraphs, self.images)
+                page = self._pages[article_id] = html.encode('utf-8')
+            return page
+
+    def count_request(self, path):
+        """按接口类型统计请求数"""
+        if path.startswith('/s/'):
+            key = 'article'
+        elif path.startswith('/mmbiz_'):
+            key = 'image'
+        else:
+            key = path.rsplit('/', 1)[-1]
+        with self._lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def start(self):
+        """在后台线程启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QMessageBox
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
@@ -89,6 +90,8 @@ class IntegratedApp(QMainWindow):
 
 # 如果直接运行此文件，则启动集成应用
 if __name__ == "__main__":
+    # 打包后图片处理进程池需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = IntegratedApp()
     window.show()
@@ -0,0 +1,116 @@
+import threading
+from datetime import datetime, timedelta
+
+
+# 数据库激活函数名，定义见 supabase_functions.sql
+ACTIVATION_RPC = 'activate_user_with_code'
+
+
+class ActivationRPCUnavailable(Exception):
+    """数据库中未部署激活函数"""
+
+
+def is_missing_function(error):
+    """判断错误是否为数据库函数不存在（PostgREST 返回 PGRST202）"""
+    text = str(error)
+    return 'PGRST202' in text or 'Could not find the function' in text
+
+
+def activate_with_code(client, user_id, activation_code, mac_address=None):
+    """调用数据库激活函数，一次请求完成激活
+
+    Args:
+        client: Supabase 客户端，或提供相同 rpc 接口的 LocalActivationBackend
+        user_id: 用户ID
+        activation_code: 激活码
+        mac_address: 绑定的MAC地址，为空时保留原值
+
+    Returns:
+        dict: 激活结果 {'success', 'message', 'expiry_date'}
+
+    Raises:
+        ActivationRPCUnavailable: 数据库中未部署激活函数
+    """
+    try:
+        result = client.rpc(ACTIVATION_RPC, {
+            'p_user_id': user_id,
+            'p_code': activation_code,
+            'p_mac': mac_address or None,
+        }).execute()
+    except Exception as e:
+        if is_missing_function(e):
+            raise ActivationRPCUnavailable(str(e)) from e
+        raise
+
+    data = result.data or {}
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return {
+        'success': bool(data.get('success')),
+        'message': data.get('message', '激活失败'),
+        'expiry_date': data.get('expiry_date'),
+    }
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        return self
+
+
+class LocalActivationBackend:
+    """激活函数的本地替身，与数据库函数逻辑一致
+
+    在内存中保存用户和激活码，提供与 Supabase 客户端相同的 rpc 接口，
+    用于测试和离线调试：activate_with_code(LocalActivationBackend(...), ...)。
+    """
+
+    def __init__(self, users=None, codes=None):
+        """初始化
+
+        Args:
+            users: 用户记录列表
+            codes: 激活码记录列表
+        """
+        self.users = {user['id']: dict(user) for user in users or []}
+        self.codes = {code['code']: dict(code) for code in codes or []}
+        self._lock = threading.Lock()
+
+    def rpc(self, name, params):
+        if name != ACTIVATION_RPC:
+            raise Exception(f"PGRST202: Could not find the function public.{name}")
+        with self._lock:
+            return _Result(self._activate(params['p_user_id'], params['p_code'], params.get('p_mac')))
+
+    def _activate(self, user_id, activation_code, mac_address):
+        code = self.codes.get(activation_code)
+        if not code:
+            return {'success': False, 'message': '激活码不存在'}
+
+        status = code.get('activation_status') or ''
+        if status == '已激活':
+            return {'success': False, 'message': '激活码已被使用'}
+        if status == '已过期':
+            return {'success': False, 'message': '激活码已过期'}
+        if status not in ('', '未激活'):
+            return {'success': False, 'message': f'激活码状态异常: {status}'}
+
+        now = datetime.now()
+        if code.get('expiry_date') and datetime.fromisoformat(code['expiry_date']) < now:
+            code.update(activation_status='已过期', update_time=now.isoformat())
+            return {'success': False, 'message': '激活码已过期'}
+
+        user = self.users.get(user_id)
+        if not user:
+            return {'success': False, 'message': '用户不存在'}
+
+        expiry_date = (now + timedelta(days=int(code.get('valid_days') or 30))).isoformat()
+        code.update(user_email=user.get('email'), activation_status='已激活', activation_time=now.isoformat(),
+                    expiry_date=expiry_date, update_time=now.isoformat())
+        user.update(activation_code=activation_code, activation_status='已激活', expired_time=expiry_date,
+                    update_time=now.isoformat())
+        if mac_address:
+            user['mac'] = mac_address
+        return {'success': True, 'message': '激活成功', 'expiry_date': expiry_date}
@@ -1,18 +1,82 @@
 import os
 import sys
+import itertools
 from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTabWidget, QTableView, QHeaderView,
                              QLineEdit, QComboBox, QMessageBox, QGroupBox, QFormLayout,
-                             QDialog, QDateTimeEdit, QDialogButtonBox, QCheckBox)
+                             QDialog, QDateTimeEdit, QDialogButtonBox, QCheckBox, QFileDialog,
+                             QSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal, QDateTime
 from PyQt6.QtGui import QFont, QIcon
-import uuid
+import secrets
+import pandas as pd
 
 # 导入数据库相关模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.database import DatabaseManager
 from utils.style import get_flat_style
+from utils.db_executor import get_db_executor
+from models.admin_table_model import (PagedTableModel, ActionButtonDelegate, PaginationBar,
+                                      USER_COLUMNS, CODE_COLUMNS)
+
+# 用户列表文件的列名，支持中英文表头
+USER_LIST_FIELDS = {
+    'email': 'email', '邮箱': 'email',
+    'nickname': 'nickname', '昵称': 'nickname',
+    'password': 'password', '密码': 'password',
+    'role': 'role', '角色': 'role',
+    'expired_time': 'expired_time', '过期时间': 'expired_time',
+}
+
+
+def read_user_list(file_path):
+    """读取批量导入的用户列表
+
+    Args:
+        file_path: CSV或Excel文件路径
+
+    Returns:
+        list: 用户列表，未提供密码的用户生成随机密码并标记 generated_password
+    """
+    if file_path.lower().endswith('.xlsx'):
+        df = pd.read_excel(file_path, dtype=str, engine='openpyxl')
+    else:
+        df = pd.read_csv(file_path, dtype=str, encoding='utf-8-sig')
+    df = df.rename(columns=lambda name: USER_LIST_FIELDS.get(str(name).strip().lower(), name)).fillna('')
+    if 'email' not in df.columns or 'nickname' not in df.columns:
+        raise ValueError("文件需包含邮箱(email)和昵称(nickname)列")
+    
+    users = []
+    for record in df.to_dict('records'):
+        user = {field: str(record.get(field, '')).strip() for field in set(USER_LIST_FIELDS.values())}
+        if not user['email']:
+            continue
+        if not user['password']:
+            user['password'] = secrets.token_urlsafe(9)
+            user['generated_password'] = True
+        users.append(user)
+    return users
+
+
+# 单次批量生成激活码的最大数量
+MAX_CODE_BATCH = 50000
+
+
+def export_activation_codes(codes, duration, file_path):
+    """导出激活码，扩展名为 .csv 时导出CSV，否则导出Excel
+
+    Args:
+        codes: 激活码列表
+        duration: 有效期天数
+        file_path: 导出文件路径
+    """
+    df = pd.DataFrame({'激活码': codes, '有效期(天)': duration})
+    if file_path.lower().endswith('.csv'):
+        df.to_csv(file_path, index=False, encoding='utf-8-sig')
+    else:
+        df.to_excel(file_path, index=False, engine='openpyxl')
+
 
 class AdminLoginDialog(QDialog):
     """管理员登录对话框"""
@@ -253,6 +317,8 @@ class AdminPanel(QWidget):
         super().__init__(parent)
         self.db_manager = DatabaseManager()
         self.admin_info = None
+        # 批量生成激活码的任务编号，每批使用独立的任务类别，互不取代或合并
+        self._code_batches = itertools.count(1)
         
         # 应用扁平化样式
         self.setStyleSheet(get_flat_style())
@@ -323,6 +389,45 @@ class AdminPanel(QWidget):
         group_box.setLayout(layout)
         return group_box
     
+    def _create_table_view(self, model, on_edit, on_delete):
+        """创建分页表格视图，操作列由委托绘制
+
+        Args:
+            model: 表格模型
+            on_edit: 编辑回调，参数为记录ID
+            on_delete: 删除回调，参数为记录ID
+
+        Returns:
+            QTableView: 表格视图
+        """
+        table = QTableView()
+        table.setModel(model)
+        
+        # 操作列按钮由委托绘制，不为每行创建控件
+        delegate = ActionButtonDelegate(table)
+        delegate.edit_clicked.connect(lambda row: on_edit(model.row_id(row)))
+        delegate.delete_clicked.connect(lambda row: on_delete(model.row_id(row)))
+        table.setItemDelegateForColumn(0, delegate)
+        
+        table.setAlternatingRowColors(True)
+        table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        table.setTextElideMode(Qt.TextElideMode.ElideRight)
+        
+        # 点击表头由服务端排序
+        table.setSortingEnabled(True)
+        
+        # 固定行高和列宽，不按内容逐行计算尺寸
+        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        table.verticalHeader().setDefaultSectionSize(30)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setDefaultSectionSize(140)
+        header.setStretchLastSection(True)
+        table.setColumnWidth(0, 120)
+        return table
+    
     def _create_user_tab(self):
         """创建用户管理选项卡"""
         widget = QWidget()
@@ -334,11 +439,13 @@ class AdminPanel(QWidget):
         search_layout.addWidget(QLabel("邮箱:"))
         self.email_filter = QLineEdit()
         self.email_filter.setPlaceholderText("输入邮箱筛选")
+        self.email_filter.returnPressed.connect(self.search_users)
         search_layout.addWidget(self.email_filter)
         
         search_layout.addWidget(QLabel("昵称:"))
         self.nickname_filter = QLineEdit()
         self.nickname_filter.setPlaceholderText("输入昵称筛选")
+        self.nickname_filter.returnPressed.connect(self.search_users)
         search_layout.addWidget(self.nickname_filter)
         
         self.search_button = QPushButton("搜索")
@@ -347,30 +454,17 @@ class AdminPanel(QWidget):
         
         layout.addLayout(search_layout)
         
-        # 用户列表
-        self.user_table = QTableWidget()
-        self.user_table.setColumnCount(9)
-        self.user_table.setHorizontalHeaderLabels([
-            "操作", "邮箱", "昵称", "角色", "MAC地址", 
-            "激活码", "激活状态", "过期时间", "最后登录时间"
-        ])
-        self.user_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.user_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.horizontalHeader().setSectionResizeMode(8, QHeaderView.ResizeMode.ResizeToContents)
-        self.user_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.user_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        # 设置表格内容可选择和复制
-        self.user_table.setTextElideMode(Qt.TextElideMode.ElideNone)
-        self.user_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
-        
+        # 用户列表，只保存当前页
+        self.user_query = {'email': None, 'nickname': None, 'order_by': 'create_time', 'descending': True}
+        self.user_model = PagedTableModel(USER_COLUMNS, self)
+        self.user_model.sort_requested.connect(self._on_user_sort_requested)
+        self.user_table = self._create_table_view(self.user_model, self.edit_user, self.delete_user)
         layout.addWidget(self.user_table)
         
+        self.user_pager = PaginationBar()
+        self.user_pager.page_requested.connect(self.load_users_page)
+        layout.addWidget(self.user_pager)
+        
         # 按钮区域
         button_layout = QHBoxLayout()
         
@@ -378,8 +472,12 @@ class AdminPanel(QWidget):
         self.add_user_button.clicked.connect(self.add_user)
         button_layout.addWidget(self.add_user_button)
         
+        self.import_users_button = QPushButton("批量导入")
+        self.import_users_button.clicked.connect(self.import_users)
+        button_layout.addWidget(self.import_users_button)
+        
         self.refresh_button = QPushButton("刷新")
-        self.refresh_button.clicked.connect(self.refresh_users)
+        self.refresh_button.clicked.connect(lambda: self.refresh_users())
         button_layout.addWidget(self.refresh_button)
         
         layout.addLayout(button_layout)
@@ -396,42 +494,52 @@ class AdminPanel(QWidget):
         top_layout = QHBoxLayout()
         
         # 新增激活码按钮
-        add_code_btn = QPushButton("新增激活码")
-        add_code_btn.setFixedSize(120, 30)
-        add_code_btn.clicked.connect(self.generate_code)
-        top_layout.addWidget(add_code_btn)
+        self.add_code_button = QPushButton("新增激活码")
+        self.add_code_button.setFixedSize(120, 30)
+        self.add_code_button.clicked.connect(self.generate_code)
+        top_layout.addWidget(self.add_code_button)
         
         # 刷新按钮
         refresh_btn = QPushButton("刷新")
         refresh_btn.setFixedSize(80, 30)
-        refresh_btn.clicked.connect(self.refresh_codes)
+        refresh_btn.clicked.connect(lambda: self.refresh_codes())
         top_layout.addWidget(refresh_btn)
         
         top_layout.addStretch()
-        layout.addLayout(top_layout)
-        
-        # 激活码表格
-        self.code_table = QTableWidget()
-        self.code_table.setColumnCount(9)
-        self.code_table.setHorizontalHeaderLabels(["操作", "激活码", "用户邮箱", "激活状态", "有效期(天)", "过期时间", "激活时间", "创建时间", "更新时间"])
         
-        # 设置表格样式
-        self.code_table.setAlternatingRowColors(True)
-        self.code_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.code_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.code_table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
-        # 设置表格内容可选择和复制
-        self.code_table.setTextElideMode(Qt.TextElideMode.ElideNone)
+        # 筛选区域
+        top_layout.addWidget(QLabel("激活码/邮箱:"))
+        self.code_filter = QLineEdit()
+        self.code_filter.setPlaceholderText("输入激活码或邮箱筛选")
+        self.code_filter.returnPressed.connect(self.search_codes)
+        top_layout.addWidget(self.code_filter)
+        
+        top_layout.addWidget(QLabel("状态:"))
+        self.code_status_filter = QComboBox()
+        self.code_status_filter.addItem("全部", None)
+        for status in ("未激活", "已激活", "已过期"):
+            self.code_status_filter.addItem(status, status)
+        self.code_status_filter.currentIndexChanged.connect(lambda _: self.search_codes())
+        top_layout.addWidget(self.code_status_filter)
+        
+        search_btn = QPushButton("搜索")
+        search_btn.clicked.connect(self.search_codes)
+        top_layout.addWidget(search_btn)
         
-        # 设置列宽
-        self.code_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.code_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
-        self.code_table.setColumnWidth(0, 120)
+        layout.addLayout(top_layout)
         
+        # 激活码表格，只保存当前页
+        self.code_query = {'keyword': None, 'status': None, 'order_by': 'create_time', 'descending': True}
+        self.code_model = PagedTableModel(CODE_COLUMNS, self)
+        self.code_model.sort_requested.connect(self._on_code_sort_requested)
+        self.code_table = self._create_table_view(self.code_model, self.edit_code, self.delete_code)
         layout.addWidget(self.code_table)
         
-        # 添加到选项卡
-        self.tab_widget.addTab(code_tab, "激活码管理")
+        self.code_pager = PaginationBar()
+        self.code_pager.page_requested.connect(self.load_codes_page)
+        layout.addWidget(self.code_pager)
+        
+        return code_tab
     
     def handle_login(self):
         """处理登录"""
@@ -461,9 +569,15 @@ class AdminPanel(QWidget):
         # 禁用功能
         self.set_ui_enabled(False)
         
+        # 丢弃未返回的查询
+        get_db_executor().cancel('admin.users')
+        get_db_executor().cancel('admin.codes')
+        
         # 清空数据
-        self.user_table.setRowCount(0)
-        self.code_table.setRowCount(0)
+        self.user_model.clear()
+        self.code_model.clear()
+        self.user_pager.set_state(0, self.user_pager.page_size, 0)
+        self.code_pager.set_state(0, self.code_pager.page_size, 0)
     
     def set_ui_enabled(self, enabled):
         """设置界面启用状态"""
@@ -477,82 +591,60 @@ class AdminPanel(QWidget):
         self.refresh_users(email, nickname)
     
     def refresh_users(self, email=None, nickname=None):
-        """刷新用户列表"""
+        """刷新用户列表
+
+        传入筛选条件时从第一页开始查询，否则重新加载当前页。
+
+        Args:
+            email: 邮箱筛选条件
+            nickname: 昵称筛选条件
+        """
+        page = self.user_pager.page
+        if email is not None or nickname is not None:
+            self.user_query['email'] = email or None
+            self.user_query['nickname'] = nickname or None
+            page = 0
+        self.load_users_page(page, self.user_pager.page_size)
+    
+    def _on_user_sort_requested(self, order_by, descending):
+        """点击表头排序，从第一页重新查询"""
+        self.user_query['order_by'] = order_by
+        self.user_query['descending'] = descending
+        self.load_users_page(0, self.user_pager.page_size)
+    
+    def load_users_page(self, page, page_size):
+        """加载一页用户，在后台线程查询，新的查询会取代未返回的旧查询
+
+        Args:
+            page: 页码（从0开始）
+            page_size: 每页行数
+        """
         if not self.admin_info:
             return
-            
-        try:
-            result = self.db_manager.get_users(email, nickname)
-            
-            if result['success']:
-                self.display_users(result['users'])
-            else:
-                QMessageBox.warning(self, "获取用户失败", result['message'])
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"获取用户失败: {str(e)}")
+        
+        query = self.user_query
+        get_db_executor().submit(
+            'admin.users', self.db_manager.get_users_page, page, page_size,
+            query['email'], query['nickname'], query['order_by'], query['descending'],
+            on_success=lambda result: self._on_users_loaded(result, page, page_size),
+            on_error=lambda e: QMessageBox.critical(self, "错误", f"获取用户失败: {str(e)}")
+        )
     
-    def display_users(self, users):
-        """显示用户列表"""
-        self.user_table.setRowCount(0)
+    def _on_users_loaded(self, result, page, page_size):
+        """用户列表查询完成"""
+        if not self.admin_info:
+            return
+        if not result['success']:
+            QMessageBox.warning(self, "获取用户失败", result['message'])
+            return
         
-        for user in users:
-            row = self.user_table.rowCount()
-            self.user_table.insertRow(row)
-            
-            # 操作按钮
-            action_widget = QWidget()
-            action_layout = QHBoxLayout(action_widget)
-            action_layout.setContentsMargins(0, 0, 0, 0)
-            
-            edit_button = QPushButton("✎")  # 使用编辑图标
-            edit_button.setProperty("user_id", user['id'])
-            edit_button.clicked.connect(lambda _, btn=edit_button: self.edit_user(btn.property("user_id")))
-            edit_button.setFixedSize(45, 20)  
-            edit_button.setFont(QFont("微软雅黑", 8))  
-            
-            delete_button = QPushButton("✖")  # 使用删除图标
-            delete_button.setProperty("user_id", user['id'])
-            delete_button.clicked.connect(lambda _, btn=delete_button: self.delete_user(btn.property("user_id")))
-            delete_button.setFixedSize(45, 20)  
-            delete_button.setFont(QFont("微软雅黑", 8))  
-            
-            action_layout.addWidget(edit_button)
-            action_layout.addWidget(delete_button)
-            
-            self.user_table.setCellWidget(row, 0, action_widget)
-            
-            # 用户信息
-            self.user_table.setItem(row, 1, QTableWidgetItem(user.get('email', '')))
-            self.user_table.setItem(row, 2, QTableWidgetItem(user.get('nickname', '')))
-            
-            # 角色
-            role_map = {"0": "管理员", "1": "普通用户", "2": "付费用户"}
-            role = role_map.get(user.get('role', '1'), "普通用户")
-            self.user_table.setItem(row, 3, QTableWidgetItem(role))
-            
-            self.user_table.setItem(row, 4, QTableWidgetItem(user.get('mac', '')))
-            self.user_table.setItem(row, 5, QTableWidgetItem(user.get('activation_code', '')))
-            self.user_table.setItem(row, 6, QTableWidgetItem(user.get('activation_status', '未激活')))
-            
-            # 格式化日期
-            expiry_date = user.get('expired_time', '')
-            if expiry_date:
-                try:
-                    date_obj = datetime.fromisoformat(expiry_date)
-                    expiry_date = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except:
-                    pass
-            self.user_table.setItem(row, 7, QTableWidgetItem(expiry_date))
-            
-            last_login = user.get('last_login_time', '')
-            if last_login:
-                try:
-                    date_obj = datetime.fromisoformat(last_login)
-                    last_login = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except:
-                    pass
-            self.user_table.setItem(row, 8, QTableWidgetItem(last_login))
+        total = result.get('total', 0)
+        if not result['users'] and page > 0 and total:
+            # 删除记录后当前页已超出范围，加载最后一页
+            self.load_users_page((total - 1) // page_size, page_size)
+            return
+        self.user_model.set_rows(result['users'])
+        self.user_pager.set_state(page, page_size, total)
     
     def add_user(self):
         """添加用户"""
@@ -560,10 +652,80 @@ class AdminPanel(QWidget):
         if dialog.exec():
             self.refresh_users()
     
+    def import_users(self):
+        """从CSV或Excel文件批量导入用户
+
+        文件需包含邮箱、昵称列，密码、角色、过期时间列可选，
+        未提供密码的用户自动生成随机密码，导入后可保存结果文件。
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择用户列表", "", "用户列表 (*.csv *.xlsx);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            users = read_user_list(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"读取用户列表失败: {str(e)}")
+            return
+        if not users:
+            QMessageBox.warning(self, "导入失败", "文件中没有可导入的用户")
+            return
+        
+        self.import_users_button.setEnabled(False)
+        get_db_executor().submit(
+            'admin.import_users', self.db_manager.register_users_by_admin, users,
+            on_success=lambda result: self._on_users_imported(result, users),
+            on_error=self._on_users_import_failed
+        )
+    
+    def _on_users_imported(self, result, users):
+        """批量导入完成，显示结果并可保存生成的密码和失败原因"""
+        self.import_users_button.setEnabled(True)
+        self.refresh_users()
+        
+        failed = {item['email']: item['message'] for item in result['failed']}
+        has_generated = any(user.get('generated_password') for user in users)
+        if not failed and not has_generated:
+            QMessageBox.information(self, "导入完成", result['message'])
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "导入完成",
+            f"{result['message']}\n是否保存导入结果（包含生成的密码和失败原因）？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        
+        save_path, _ = QFileDialog.getSaveFileName(self, "保存导入结果", "用户导入结果.csv", "CSV Files (*.csv)")
+        if not save_path:
+            return
+        rows = [{
+            '邮箱': user['email'],
+            '昵称': user['nickname'],
+            '密码': user['password'] if user.get('generated_password') else '',
+            '结果': failed.get(user['email'], '成功'),
+        } for user in users]
+        # 输入校验阶段失败的记录可能没有邮箱
+        rows.extend({'邮箱': email, '昵称': '', '密码': '', '结果': message}
+                    for email, message in failed.items() if email not in {user['email'] for user in users})
+        try:
+            pd.DataFrame(rows).to_csv(save_path, index=False, encoding='utf-8-sig')
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存导入结果失败: {str(e)}")
+    
+    def _on_users_import_failed(self, error):
+        self.import_users_button.setEnabled(True)
+        QMessageBox.critical(self, "错误", f"批量导入用户失败: {str(error)}")
+    
     def edit_user(self, user_id):
         """编辑用户"""
         try:
-            result = self.db_manager.get_user_by_id(user_id)
+            result = self.db_manager.get_user_by_id(user_id, use_cache=False)
             
             if result['success']:
                 dialog = UserEditDialog(self.db_manager, result['user'], self)
@@ -598,207 +760,82 @@ class AdminPanel(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"删除用户失败: {str(e)}")
     
-    def refresh_codes(self):
-        """刷新激活码列表"""
-        try:
-            result = self.db_manager.get_activation_codes()
-            
-            if not result['success']:
-                QMessageBox.warning(self, "获取失败", result.get('message', '获取激活码列表失败'))
-                return
-                
-            codes = result.get('codes', [])
-            
-            # 清空表格
-            self.code_table.setRowCount(0)
-            
-            # 填充数据
-            for row, code in enumerate(codes):
-                self.code_table.insertRow(row)
-                
-                # 操作按钮
-                operation_widget = QWidget()
-                operation_layout = QHBoxLayout(operation_widget)
-                operation_layout.setContentsMargins(5, 2, 5, 2)
-                operation_layout.setSpacing(5)
-                
-                edit_button = QPushButton("编辑")
-                edit_button.setFixedSize(50, 25)
-                edit_button.clicked.connect(lambda checked, code_id=code.get('id'): self.edit_code(code_id))
-                
-                delete_button = QPushButton("删除")
-                delete_button.setFixedSize(50, 25)
-                delete_button.clicked.connect(lambda checked, code_id=code.get('id'): self.delete_code(code_id))
-                
-                operation_layout.addWidget(edit_button)
-                operation_layout.addWidget(delete_button)
-                
-                self.code_table.setCellWidget(row, 0, operation_widget)
-                
-                # 其他数据
-                self.code_table.setItem(row, 1, QTableWidgetItem(code.get('code', '')))
-                self.code_table.setItem(row, 2, QTableWidgetItem(code.get('user_email', '')))
-                self.code_table.setItem(row, 3, QTableWidgetItem(code.get('activation_status', '未激活')))
-                self.code_table.setItem(row, 4, QTableWidgetItem(str(code.get('valid_days', ''))))
-                
-                # 格式化过期时间
-                expiry_date = code.get('expiry_date', '')
-                if expiry_date:
-                    try:
-                        date_obj = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-                        expiry_date = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"日期解析错误: {str(e)}")
-                self.code_table.setItem(row, 5, QTableWidgetItem(expiry_date))
-                
-                # 格式化激活时间
-                activation_time = code.get('activation_time', '')
-                if activation_time:
-                    try:
-                        date_obj = datetime.fromisoformat(activation_time.replace('Z', '+00:00'))
-                        activation_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"日期解析错误: {str(e)}")
-                self.code_table.setItem(row, 6, QTableWidgetItem(activation_time))
-                
-                # 格式化创建时间
-                create_time = code.get('create_time', '')
-                if create_time:
-                    try:
-                        date_obj = datetime.fromisoformat(create_time.replace('Z', '+00:00'))
-                        create_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"日期解析错误: {str(e)}")
-                self.code_table.setItem(row, 7, QTableWidgetItem(create_time))
-                
-                # 格式化更新时间
-                update_time = code.get('update_time', '')
-                if update_time:
-                    try:
-                        date_obj = datetime.fromisoformat(update_time.replace('Z', '+00:00'))
-                        update_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"日期解析错误: {str(e)}")
-                self.code_table.setItem(row, 8, QTableWidgetItem(update_time))
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"获取激活码列表失败: {str(e)}")
+    def search_codes(self):
+        """搜索激活码"""
+        keyword = self.code_filter.text().strip()
+        status = self.code_status_filter.currentData()
+        
+        self.refresh_codes(keyword, status or '')
+    
+    def refresh_codes(self, keyword=None, status=None):
+        """刷新激活码列表
+
+        传入筛选条件时从第一页开始查询，否则重新加载当前页。
+
+        Args:
+            keyword: 激活码或用户邮箱筛选条件
+            status: 激活状态筛选条件
+        """
+        page = self.code_pager.page
+        if keyword is not None or status is not None:
+            self.code_query['keyword'] = keyword or None
+            self.code_query['status'] = status or None
+            page = 0
+        self.load_codes_page(page, self.code_pager.page_size)
+    
+    def _on_code_sort_requested(self, order_by, descending):
+        """点击表头排序，从第一页重新查询"""
+        self.code_query['order_by'] = order_by
+        self.code_query['descending'] = descending
+        self.load_codes_page(0, self.code_pager.page_size)
     
-    def display_codes(self, codes):
-        """显示激活码列表"""
-        self.code_table.setRowCount(0)
+    def load_codes_page(self, page, page_size):
+        """加载一页激活码，在后台线程查询
+
+        Args:
+            page: 页码（从0开始）
+            page_size: 每页行数
+        """
+        if not self.admin_info:
+            return
         
-        for code in codes:
-            row = self.code_table.rowCount()
-            self.code_table.insertRow(row)
-            
-            # 操作按钮
-            btn_widget = QWidget()
-            btn_layout = QHBoxLayout(btn_widget)
-            btn_layout.setContentsMargins(5, 2, 5, 2)  
-            btn_layout.setSpacing(10)  
-            
-            edit_btn = QPushButton("✎")  # 使用编辑图标
-            edit_btn.setFixedSize(45, 20)  
-            edit_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #4CAF50;
-                    color: white;
-                    border-radius: 3px;
-                    font-weight: bold;
-                    font-size: 9pt;
-                    padding: 0px;
-                    margin: 0px;
-                }
-                QPushButton:hover {
-                    background-color: #45a049;
-                }
-            """)
-            edit_btn.clicked.connect(lambda checked, code_id=code.get('id'): self.edit_code(code_id))
-            edit_btn.setFont(QFont("微软雅黑", 8))  
-            
-            delete_btn = QPushButton("✖")  # 使用删除图标
-            delete_btn.setFixedSize(45, 20)  
-            delete_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #f44336;
-                    color: white;
-                    border-radius: 3px;
-                    font-weight: bold;
-                    font-size: 9pt;
-                    padding: 0px;
-                    margin: 0px;
-                }
-                QPushButton:hover {
-                    background-color: #d32f2f;
-                }
-            """)
-            delete_btn.clicked.connect(lambda checked, code_id=code.get('id'): self.delete_code(code_id))
-            delete_btn.setFont(QFont("微软雅黑", 8))  
-            
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            btn_widget.setLayout(btn_layout)
-            
-            self.code_table.setCellWidget(row, 0, btn_widget)
-            self.code_table.setItem(row, 1, QTableWidgetItem(code.get('code', '')))
-            self.code_table.setItem(row, 2, QTableWidgetItem(code.get('user_email', '')))
-            self.code_table.setItem(row, 3, QTableWidgetItem(code.get('activation_status', '未激活')))
-            self.code_table.setItem(row, 4, QTableWidgetItem(str(code.get('duration', ''))))
-            
-            # 格式化过期时间
-            expiry_date = code.get('expiry_date', '')
-            if expiry_date:
-                try:
-                    date_obj = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-                    expiry_date = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    print(f"日期解析错误: {str(e)}")
-            self.code_table.setItem(row, 5, QTableWidgetItem(expiry_date))
-            
-            # 格式化激活时间
-            activation_time = code.get('activation_time', '')
-            if activation_time:
-                try:
-                    date_obj = datetime.fromisoformat(activation_time.replace('Z', '+00:00'))
-                    activation_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    print(f"日期解析错误: {str(e)}")
-            self.code_table.setItem(row, 6, QTableWidgetItem(activation_time))
-            
-            # 格式化创建时间
-            create_time = code.get('create_time', '')
-            if create_time:
-                try:
-                    date_obj = datetime.fromisoformat(create_time.replace('Z', '+00:00'))
-                    create_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    print(f"日期解析错误: {str(e)}")
-            self.code_table.setItem(row, 7, QTableWidgetItem(create_time))
-            
-            # 格式化更新时间
-            update_time = code.get('update_time', '')
-            if update_time:
-                try:
-                    date_obj = datetime.fromisoformat(update_time.replace('Z', '+00:00'))
-                    update_time = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    print(f"日期解析错误: {str(e)}")
-            self.code_table.setItem(row, 8, QTableWidgetItem(update_time))
+        query = self.code_query
+        get_db_executor().submit(
+            'admin.codes', self.db_manager.get_activation_codes_page, page, page_size,
+            query['keyword'], query['status'], query['order_by'], query['descending'],
+            on_success=lambda result: self._on_codes_loaded(result, page, page_size),
+            on_error=lambda e: QMessageBox.critical(self, "错误", f"获取激活码列表失败: {str(e)}")
+        )
+    
+    def _on_codes_loaded(self, result, page, page_size):
+        """激活码列表查询完成"""
+        if not self.admin_info:
+            return
+        if not result['success']:
+            QMessageBox.warning(self, "获取失败", result.get('message', '获取激活码列表失败'))
+            return
+        
+        codes = result.get('codes', [])
+        total = result.get('total', 0)
+        if not codes and page > 0 and total:
+            # 删除记录后当前页已超出范围，加载最后一页
+            self.load_codes_page((total - 1) // page_size, page_size)
+            return
+        self.code_model.set_rows(codes)
+        self.code_pager.set_state(page, page_size, total)
     
     def generate_code(self):
-        """生成激活码"""
+        """生成激活码，数量大于1时批量生成并导出"""
         dialog = QDialog(self)
         dialog.setWindowTitle("新增激活码")
-        dialog.setFixedSize(400, 250)
+        dialog.setFixedSize(400, 280)
         
         layout = QVBoxLayout()
         
         form_layout = QFormLayout()
         
-        # 激活码自动生成
-        activation_code = str(uuid.uuid4()).replace('-', '')[:16].upper()
-        code_label = QLabel(activation_code)
+        # 激活码在保存时生成
+        code_label = QLabel("保存后自动生成")
         form_layout.addRow("激活码:", code_label)
         
         # 激活状态默认为未激活
@@ -810,8 +847,14 @@ class AdminPanel(QWidget):
         duration_input.setText("30")
         form_layout.addRow("有效期(天):", duration_input)
         
+        # 生成数量
+        count_input = QSpinBox()
+        count_input.setRange(1, MAX_CODE_BATCH)
+        count_input.setValue(1)
+        form_layout.addRow("数量:", count_input)
+        
         # 说明文字
-        note_label = QLabel("注意: 激活码在用户激活时才会设置过期时间，\n过期时间 = 激活时间 + 有效期天数")
+        note_label = QLabel("注意: 激活码在用户激活时才会设置过期时间，\n过期时间 = 激活时间 + 有效期天数\n批量生成后可导出为CSV或Excel文件")
         note_label.setStyleSheet("color: #666; font-size: 9pt;")
         form_layout.addRow("", note_label)
         
@@ -832,6 +875,11 @@ class AdminPanel(QWidget):
                 if duration <= 0:
                     QMessageBox.warning(self, "输入错误", "有效期必须大于0")
                     return
+                
+                count = count_input.value()
+                if count > 1:
+                    self._generate_codes_batch(count, duration)
+                    return
                     
                 result = self.db_manager.create_activation_code(duration)
                 
@@ -846,6 +894,49 @@ class AdminPanel(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"生成激活码失败: {str(e)}")
     
+    def _generate_codes_batch(self, count, duration):
+        """在后台线程批量生成激活码"""
+        self.admin_status_label.setText(f"正在生成 {count} 个激活码...")
+        self.add_code_button.setEnabled(False)
+        get_db_executor().submit(
+            f'admin.create_codes.{next(self._code_batches)}', self.db_manager.create_activation_codes,
+            count, duration,
+            on_success=lambda result: self._on_codes_generated(result, duration),
+            on_error=self._on_codes_generate_failed
+        )
+    
+    def _on_codes_generated(self, result, duration):
+        """批量生成完成，导出激活码"""
+        self.add_code_button.setEnabled(True)
+        if not self.admin_info:
+            return
+        self.admin_status_label.setText("已登录")
+        self.refresh_codes()
+        
+        codes = result.get('codes', [])
+        if not codes:
+            QMessageBox.warning(self, "生成失败", result['message'])
+            return
+        
+        save_path, _ = QFileDialog.getSaveFileName(
+            self, f"{result['message']}，导出激活码", f"激活码_{len(codes)}个_{duration}天.xlsx",
+            "Excel Files (*.xlsx);;CSV Files (*.csv)"
+        )
+        if not save_path:
+            return
+        try:
+            export_activation_codes(codes, duration, save_path)
+            QMessageBox.information(self, "导出成功", f"{result['message']}\n已导出到: {save_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"导出激活码失败: {str(e)}")
+    
+    def _on_codes_generate_failed(self, error):
+        self.add_code_button.setEnabled(True)
+        if not self.admin_info:
+            return
+        self.admin_status_label.setText("已登录")
+        QMessageBox.critical(self, "错误", f"生成激活码失败: {str(error)}")
+    
     def edit_code(self, code_id):
         """编辑激活码"""
         try:
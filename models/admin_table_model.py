@@ -0,0 +1,218 @@
+from datetime import datetime
+from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QLabel, QPushButton, QComboBox,
+                             QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+
+
+# 每页行数选项
+PAGE_SIZES = (50, 100, 200, 500)
+DEFAULT_PAGE_SIZE = 100
+
+# 角色显示名称
+ROLE_NAMES = {"0": "管理员", "1": "普通用户", "2": "付费用户"}
+
+
+def format_timestamp(value):
+    """将ISO格式时间转换为 YYYY-MM-DD HH:MM:SS，解析失败时原样返回"""
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return str(value)
+
+
+# 表格列定义：(表头, 排序字段, 取值函数)，排序字段为None的列不支持排序
+USER_COLUMNS = [
+    ("操作", None, None),
+    ("邮箱", 'email', lambda u: u.get('email', '')),
+    ("昵称", 'nickname', lambda u: u.get('nickname', '')),
+    ("角色", 'role', lambda u: ROLE_NAMES.get(u.get('role', '1'), "普通用户")),
+    ("MAC地址", 'mac', lambda u: u.get('mac', '')),
+    ("激活码", 'activation_code', lambda u: u.get('activation_code', '')),
+    ("激活状态", 'activation_status', lambda u: u.get('activation_status') or '未激活'),
+    ("过期时间", 'expired_time', lambda u: format_timestamp(u.get('expired_time'))),
+    ("最后登录时间", 'last_login_time', lambda u: format_timestamp(u.get('last_login_time'))),
+]
+
+CODE_COLUMNS = [
+    ("操作", None, None),
+    ("激活码", 'code', lambda c: c.get('code', '')),
+    ("用户邮箱", 'user_email', lambda c: c.get('user_email', '')),
+    ("激活状态", 'activation_status', lambda c: c.get('activation_status') or '未激活'),
+    ("有效期(天)", 'valid_days', lambda c: str(c.get('valid_days', c.get('duration', '')) or '')),
+    ("过期时间", 'expiry_date', lambda c: format_timestamp(c.get('expiry_date'))),
+    ("激活时间", 'activation_time', lambda c: format_timestamp(c.get('activation_time'))),
+    ("创建时间", 'create_time', lambda c: format_timestamp(c.get('create_time'))),
+    ("更新时间", 'update_time', lambda c: format_timestamp(c.get('update_time'))),
+]
+
+
+class PagedTableModel(QAbstractTableModel):
+    """分页表格模型
+
+    只保存当前页的数据，显示文本在加载时一次性生成；点击表头排序时
+    不在本地排序，而是发出 sort_requested 信号由服务端排序。
+    """
+
+    sort_requested = pyqtSignal(str, bool)  # 排序字段, 是否降序
+
+    def __init__(self, columns, parent=None):
+        """初始化模型
+
+        Args:
+            columns: 列定义列表 [(表头, 排序字段, 取值函数)]
+        """
+        super().__init__(parent)
+        self.columns = columns
+        self._rows = []
+        self._ids = []
+
+    def set_rows(self, records):
+        """替换当前页数据
+
+        Args:
+            records: 数据库记录列表
+        """
+        self.beginResetModel()
+        self._ids = [record.get('id') for record in records]
+        self._rows = [
+            tuple(getter(record) if getter else '' for _, _, getter in self.columns)
+            for record in records
+        ]
+        self.endResetModel()
+
+    def clear(self):
+        """清空数据"""
+        self.set_rows([])
+
+    def row_id(self, row):
+        """获取指定行记录的ID"""
+        if 0 <= row < len(self._ids):
+            return self._ids[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._rows[index.row()][index.column()] or None
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """请求服务端排序"""
+        field = self.columns[column][1] if 0 <= column < len(self.columns) else None
+        if field:
+            self.sort_requested.emit(field, order == Qt.SortOrder.DescendingOrder)
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """操作列委托，绘制编辑、删除按钮，不为每行创建控件"""
+
+    edit_clicked = pyqtSignal(int)    # 行号
+    delete_clicked = pyqtSignal(int)  # 行号
+
+    BUTTONS = ("编辑", "删除")
+
+    def _button_rects(self, rect):
+        margin = 3
+        width = (rect.width() - margin * (len(self.BUTTONS) + 1)) // len(self.BUTTONS)
+        return [
+            QRect(rect.left() + margin + i * (width + margin), rect.top() + margin, width, rect.height() - margin * 2)
+            for i in range(len(self.BUTTONS))
+        ]
+
+    def paint(self, painter, option, index):
+        style = QApplication.style()
+        for text, rect in zip(self.BUTTONS, self._button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.state = QStyle.StateFlag.State_Enabled
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            position = event.position().toPoint()
+            edit_rect, delete_rect = self._button_rects(option.rect)
+            if edit_rect.contains(position):
+                self.edit_clicked.emit(index.row())
+                return True
+            if delete_rect.contains(position):
+                self.delete_clicked.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class PaginationBar(QWidget):
+    """分页栏"""
+
+    page_requested = pyqtSignal(int, int)  # 页码（从0开始）, 每页行数
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.page = 0
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.total = 0
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.info_label = QLabel("共 0 条")
+        layout.addWidget(self.info_label)
+        layout.addStretch()
+
+        self.prev_button = QPushButton("上一页")
+        self.prev_button.clicked.connect(lambda: self.page_requested.emit(self.page - 1, self.page_size))
+        layout.addWidget(self.prev_button)
+
+        self.page_label = QLabel("1 / 1")
+        layout.addWidget(self.page_label)
+
+        self.next_button = QPushButton("下一页")
+        self.next_button.clicked.connect(lambda: self.page_requested.emit(self.page + 1, self.page_size))
+        layout.addWidget(self.next_button)
+
+        layout.addWidget(QLabel("每页:"))
+        self.page_size_combo = QComboBox()
+        for size in PAGE_SIZES:
+            self.page_size_combo.addItem(str(size), size)
+        self.page_size_combo.setCurrentIndex(PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+        self.page_size_combo.currentIndexChanged.connect(
+            lambda _: self.page_requested.emit(0, self.page_size_combo.currentData())
+        )
+        layout.addWidget(self.page_size_combo)
+
+        self.set_state(0, DEFAULT_PAGE_SIZE, 0)
+
+    @property
+    def page_count(self):
+        return max(1, (self.total + self.page_size - 1) // self.page_size)
+
+    def set_state(self, page, page_size, total):
+        """更新分页状态
+
+        Args:
+            page: 当前页码（从0开始）
+            page_size: 每页行数
+            total: 总行数
+        """
+        self.page, self.page_size, self.total = page, page_size, total
+        self.info_label.setText(f"共 {total} 条")
+        self.page_label.setText(f"{page + 1} / {self.page_count}")
+        self.prev_button.setEnabled(page > 0)
+        self.next_button.setEnabled(page + 1 < self.page_count)
@@ -25,12 +25,13 @@ class ArticleManager(QObject):
         """设置当前用户ID"""
         self.user_id = user_id
     
-    def save_article_to_db(self, article_data, local_file_path=None):
+    def save_article_to_db(self, article_data, local_file_path=None, content=None):
         """保存文章到数据库
         
         Args:
             article_data: 文章数据字典，包含标题、链接等信息
             local_file_path: 本地文件路径，用于读取文章内容
+            content: 文章内容，传入时不再读取本地文件
             
         Returns:
             bool: 是否保存成功
@@ -41,8 +42,9 @@ class ArticleManager(QObject):
         
         try:
             # 读取文章内容
-            content = ""
-            if local_file_path and os.path.exists(local_file_path):
+            if content is None:
+                content = ""
+            if not content and local_file_path and os.path.exists(local_file_path):
                 with open(local_file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
             
@@ -1,10 +1,17 @@
 import os
+import re
 import json
 import time
 import uuid
+import secrets
 from datetime import datetime, timedelta
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from utils.metrics import get_metrics, STAGE_DB_SAVE
+from utils.url_canonical import canonicalize_article_url, article_identity
+from models.activation_rpc import activate_with_code, ActivationRPCUnavailable, is_missing_function
+from models.entitlement_cache import get_entitlement_cache, is_admin_user
+from utils.device_fingerprint import get_device_mac
 
 # 加载环境变量
 load_dotenv()
@@ -13,6 +20,33 @@ load_dotenv()
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 
+# 批量操作每次请求处理的记录数，避免请求URL和请求体过大
+BULK_CHUNK_SIZE = 200
+
+# 管理后台列表只查询表格中显示的列
+USER_LIST_COLUMNS = 'id,email,nickname,role,mac,activation_code,activation_status,expired_time,last_login_time,create_time'
+CODE_LIST_COLUMNS = 'id,code,user_email,activation_status,valid_days,expiry_date,activation_time,create_time,update_time'
+
+# 允许排序的字段，防止任意字段进入查询
+USER_SORT_FIELDS = set(USER_LIST_COLUMNS.split(','))
+CODE_SORT_FIELDS = set(CODE_LIST_COLUMNS.split(','))
+
+# 激活码字符集，去掉易混淆的 0/O、1/I，16位共80位随机量，批量生成时碰撞概率可忽略
+ACTIVATION_CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+ACTIVATION_CODE_LENGTH = 16
+
+# 批量生成激活码时每次插入的行数
+CODE_INSERT_CHUNK_SIZE = 1000
+
+def new_activation_code():
+    """生成一个随机激活码"""
+    return ''.join(secrets.choice(ACTIVATION_CODE_ALPHABET) for _ in range(ACTIVATION_CODE_LENGTH))
+
+def _quote_filter_value(value):
+    """按PostgREST过滤语法给值加双引号，值中可以包含逗号和括号"""
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{value}"'
+
 class DatabaseManager:
     """数据库管理类，负责与Supabase的连接和数据操作"""
     
@@ -22,6 +56,14 @@ class DatabaseManager:
             raise ValueError("请在.env文件中设置SUPABASE_URL和SUPABASE_KEY")
             
         self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        # 已保存文章的标识 -> 文章ID，重复保存时不再查询
+        self._article_ids = {}
+        # 认证用户查找函数是否可用，未部署时退回到列出认证用户
+        self._auth_lookup_rpc = True
+        # 激活函数是否可用，未部署时退回到逐表更新
+        self._activation_rpc = True
+        # 会话内共享的用户记录缓存
+        self.entitlements = get_entitlement_cache()
         
     # ===== 用户管理相关方法 =====
     
@@ -38,15 +80,10 @@ class DatabaseManager:
             dict: 注册结果
         """
         try:
-            # 先检查邮箱是否已存在
-            existing_user_email = self.supabase.table('users').select('*').eq('email', email).execute()
-            if existing_user_email.data:
-                return {'success': False, 'message': '该邮箱已被注册'}
-            
-            # 检查昵称是否已存在（如果昵称需要唯一）
-            existing_user_nickname = self.supabase.table('users').select('*').eq('nickname', nickname).execute()
-            if existing_user_nickname.data:
-                return {'success': False, 'message': '该昵称已被使用'}
+            # 一次查询同时检查邮箱和昵称是否已存在
+            conflict = self._check_user_conflicts([email], [nickname]).get(email)
+            if conflict:
+                return {'success': False, 'message': conflict}
             
             # 创建用户认证
             try:
@@ -158,65 +195,29 @@ class DatabaseManager:
             dict: 注册结果
         """
         try:
-            # 先检查邮箱是否已存在于 users 表中
-            existing_user_email = self.supabase.table('users').select('*').eq('email', email).execute()
-            if existing_user_email.data:
-                return {'success': False, 'message': '该邮箱已被注册'}
-            
-            # 检查昵称是否已存在
-            existing_user_nickname = self.supabase.table('users').select('*').eq('nickname', nickname).execute()
-            if existing_user_nickname.data:
-                return {'success': False, 'message': '该昵称已被使用'}
+            # 一次查询同时检查邮箱和昵称是否已存在于 users 表中
+            conflict = self._check_user_conflicts([email], [nickname]).get(email)
+            if conflict:
+                return {'success': False, 'message': conflict}
             
             # 检查 Auth 系统中是否已存在该用户
             try:
-                # 尝试通过邮箱查找用户
-                auth_users = self.supabase.auth.admin.list_users()
-                existing_auth_user = None
+                user_id = self._find_auth_user_id(email)
                 
-                for user in auth_users:
-                    if user.email == email:
-                        existing_auth_user = user
-                        break
-                
-                if existing_auth_user:
+                if user_id:
                     # Auth 系统中已存在该用户，但 users 表中不存在
                     # 直接使用该用户的 ID 创建 users 表记录
-                    user_id = existing_auth_user.id
                     print(f"Auth 系统中已存在该用户，ID: {user_id}")
                 else:
-                    # 创建用户认证
-                    auth_response = self.supabase.auth.admin.create_user({
-                        'email': email,
-                        'password': password,
-                        'email_confirm': True  # 自动确认邮箱
-                    })
-                    
-                    if not auth_response.user:
+                    user_id = self._create_auth_user(email, password)
+                    if not user_id:
                         return {'success': False, 'message': '用户认证创建失败'}
-                    
-                    # 获取用户ID
-                    user_id = auth_response.user.id
             except Exception as auth_error:
                 print(f"检查或创建 Auth 用户时出错: {str(auth_error)}")
                 return {'success': False, 'message': f'用户认证操作失败: {str(auth_error)}'}
             
             # 创建用户记录
-            if not expired_time:
-                expired_time = (datetime.now() + timedelta(days=30)).isoformat()
-            
-            user_data = {
-                'id': user_id,
-                'email': email,
-                'nickname': nickname,
-                'mac': '',
-                'role': role,
-                'activation_status': '未激活',
-                'expired_time': expired_time,
-                'create_time': datetime.now().isoformat(),
-                'update_time': datetime.now().isoformat()
-            }
-            
+            user_data = self._new_user_record(user_id, email, nickname, role, expired_time)
             user_result = self.supabase.table('users').insert(user_data).execute()
             
             if not user_result.data:
@@ -239,6 +240,204 @@ class DatabaseManager:
             print(f"创建用户时发生错误: {str(e)}")
             return {'success': False, 'message': f'创建用户失败: {str(e)}'}
     
+    def register_users_by_admin(self, users, role='1', expired_time=None, chunk_size=BULK_CHUNK_SIZE):
+        """管理员批量创建用户
+        
+        每批用户只做一次重复检查查询、一次认证用户查找和一次批量插入，
+        单个用户失败不影响其他用户。
+        
+        Args:
+            users: 用户列表 [{'email', 'password', 'nickname', 可选 'role', 'expired_time'}]
+            role: 默认用户角色
+            expired_time: 默认过期时间，默认为30天后
+            chunk_size: 每批处理的用户数
+            
+        Returns:
+            dict: 创建结果，created 为创建成功的用户记录，failed 为 [{'email', 'message'}]
+        """
+        failed = []
+        pending = []
+        seen_emails = set()
+        seen_nicknames = set()
+        
+        # 校验输入，排除导入列表内部的重复
+        for item in users:
+            email = (item.get('email') or '').strip()
+            nickname = (item.get('nickname') or '').strip()
+            if not email or not nickname or not item.get('password'):
+                failed.append({'email': email, 'message': '邮箱、昵称和密码不能为空'})
+            elif email.lower() in seen_emails:
+                failed.append({'email': email, 'message': '导入列表中邮箱重复'})
+            elif nickname in seen_nicknames:
+                failed.append({'email': email, 'message': '导入列表中昵称重复'})
+            else:
+                seen_emails.add(email.lower())
+                seen_nicknames.add(nickname)
+                pending.append(dict(item, email=email, nickname=nickname))
+        
+        created = []
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                conflicts = self._check_user_conflicts(
+                    [item['email'] for item in chunk], [item['nickname'] for item in chunk])
+                auth_ids = self._find_auth_user_ids(
+                    [item['email'] for item in chunk if item['email'] not in conflicts])
+            except Exception as e:
+                print(f"批量检查用户时发生错误: {str(e)}")
+                failed.extend({'email': item['email'], 'message': f'检查用户失败: {str(e)}'} for item in chunk)
+                continue
+            
+            records = []
+            for item in chunk:
+                email = item['email']
+                if email in conflicts:
+                    failed.append({'email': email, 'message': conflicts[email]})
+                    continue
+                
+                # Auth 系统中已存在的用户直接使用其ID，认证用户只能逐个创建
+                user_id = auth_ids.get(email.lower())
+                if not user_id:
+                    try:
+                        user_id = self._create_auth_user(email, item['password'])
+                    except Exception as auth_error:
+                        failed.append({'email': email, 'message': f'用户认证操作失败: {str(auth_error)}'})
+                        continue
+                    if not user_id:
+                        failed.append({'email': email, 'message': '用户认证创建失败'})
+                        continue
+                
+                records.append(self._new_user_record(
+                    user_id, email, item['nickname'],
+                    item.get('role') or role, item.get('expired_time') or expired_time))
+            
+            if not records:
+                continue
+            try:
+                result = self.supabase.table('users').insert(records).execute()
+                created.extend(result.data or [])
+            except Exception as e:
+                # 认证用户保留，重新导入时会复用
+                print(f"批量创建用户记录时发生错误: {str(e)}")
+                failed.extend({'email': record['email'], 'message': f'创建用户记录失败: {str(e)}'} for record in records)
+        
+        return {
+            'success': bool(created) or not failed,
+            'message': f'成功创建 {len(created)} 个用户，失败 {len(failed)} 个',
+            'created': created,
+            'failed': failed
+        }
+    
+    def _new_user_record(self, user_id, email, nickname, role='1', expired_time=None):
+        """生成管理员创建的用户记录"""
+        now = datetime.now().isoformat()
+        return {
+            'id': user_id,
+            'email': email,
+            'nickname': nickname,
+            'mac': '',
+            'role': role,
+            'activation_status': '未激活',
+            'expired_time': expired_time or (datetime.now() + timedelta(days=30)).isoformat(),
+            'create_time': now,
+            'update_time': now
+        }
+    
+    def _create_auth_user(self, email, password):
+        """创建已确认邮箱的认证用户
+        
+        Returns:
+            str: 用户ID，创建失败时为None
+        """
+        auth_response = self.supabase.auth.admin.create_user({
+            'email': email,
+            'password': password,
+            'email_confirm': True  # 自动确认邮箱
+        })
+        return auth_response.user.id if auth_response.user else None
+    
+    def _check_user_conflicts(self, emails, nicknames):
+        """一次查询检查邮箱和昵称是否已被使用
+        
+        Args:
+            emails: 邮箱列表
+            nicknames: 昵称列表，与邮箱一一对应
+            
+        Returns:
+            dict: 冲突的邮箱 -> 错误信息
+        """
+        pairs = list(zip(emails, nicknames))
+        filters = []
+        if any(email for email, _ in pairs):
+            filters.append(f'email.in.({",".join(_quote_filter_value(email) for email, _ in pairs if email)})')
+        if any(nickname for _, nickname in pairs):
+            filters.append(f'nickname.in.({",".join(_quote_filter_value(nickname) for _, nickname in pairs if nickname)})')
+        if not filters:
+            return {}
+        result = self.supabase.table('users').select('email,nickname').or_(','.join(filters)).execute()
+        
+        used_emails = {row.get('email') for row in result.data}
+        used_nicknames = {row.get('nickname') for row in result.data}
+        conflicts = {}
+        for email, nickname in pairs:
+            if email in used_emails:
+                conflicts[email] = '该邮箱已被注册'
+            elif nickname in used_nicknames:
+                conflicts[email] = '该昵称已被使用'
+        return conflicts
+    
+    def _find_auth_user_id(self, email):
+        """按邮箱查找认证用户ID
+        
+        优先调用数据库函数 get_auth_user_id_by_email（见 supabase_functions.sql），
+        未部署时退回到列出认证用户后查找。
+        
+        Returns:
+            str: 用户ID，不存在时为None
+            
+        Raises:
+            Exception: 网络错误等查询失败，由调用方处理
+        """
+        if self._auth_lookup_rpc:
+            try:
+                result = self.supabase.rpc('get_auth_user_id_by_email', {'p_email': email}).execute()
+                return result.data or None
+            except Exception as e:
+                self._disable_auth_lookup_rpc(e)
+        return self._scan_auth_user_ids([email]).get(email.lower())
+    
+    def _find_auth_user_ids(self, emails):
+        """批量按邮箱查找认证用户ID
+        
+        Returns:
+            dict: 小写邮箱 -> 用户ID
+        """
+        if not emails:
+            return {}
+        if self._auth_lookup_rpc:
+            try:
+                result = self.supabase.rpc('get_auth_user_ids_by_emails', {'p_emails': list(emails)}).execute()
+                return {row['email'].lower(): row['id'] for row in result.data or []}
+            except Exception as e:
+                self._disable_auth_lookup_rpc(e)
+        return self._scan_auth_user_ids(emails)
+    
+    def _disable_auth_lookup_rpc(self, error):
+        """数据库函数未部署时改为列出认证用户查找，其他错误（如网络超时）继续抛出"""
+        if not is_missing_function(error):
+            raise error
+        print(f"认证用户查找函数不可用，改为列出认证用户查找: {str(error)}")
+        self._auth_lookup_rpc = False
+    
+    def _scan_auth_user_ids(self, emails):
+        """列出全部认证用户查找邮箱，仅在数据库函数未部署时使用"""
+        wanted = {email.lower() for email in emails}
+        found = {}
+        for user in self.supabase.auth.admin.list_users():
+            if user.email and user.email.lower() in wanted:
+                found[user.email.lower()] = user.id
+        return found
+    
     def login_user(self, email, password):
         """用户登录
         
@@ -269,6 +468,7 @@ class DatabaseManager:
                 return {'success': False, 'message': '用户数据不存在'}
             
             user = user_result.data[0]
+            self.entitlements.put(user)
             
             # 检查用户是否过期
             if user.get('expired_time'):
@@ -308,20 +508,8 @@ class DatabaseManager:
             bool: 是否是管理员
         """
         try:
-            user_result = self.supabase.table('users').select('*').eq('id', user_id).execute()
-            
-            if not user_result.data:
-                return False
-            
-            user = user_result.data[0]
-            
-            # 获取用户角色，并转换为字符串进行比较
-            role = user.get('role')
-            # 打印角色信息，便于调试
-            print(f"用户 {user_id} 的角色值: {role}, 类型: {type(role)}")
-            
-            # 同时处理字符串和数字类型的 role 值
-            return str(role) == '0'  # 0表示管理员
+            user = self.entitlements.get_user(user_id, self._load_user)
+            return is_admin_user(user)
             
         except Exception as e:
             print(f"检查管理员权限时出错: {str(e)}")
@@ -357,30 +545,75 @@ class DatabaseManager:
             print(f"获取用户列表时发生错误: {str(e)}")
             return {'success': False, 'message': f'获取用户列表失败: {str(e)}'}
     
-    def get_user_by_id(self, user_id):
+    def get_users_page(self, page=0, page_size=100, email=None, nickname=None,
+                       order_by='create_time', descending=True):
+        """分页获取用户列表，筛选、排序和分页均在服务端完成
+        
+        Args:
+            page: 页码（从0开始）
+            page_size: 每页行数
+            email: 邮箱筛选条件
+            nickname: 昵称筛选条件
+            order_by: 排序字段
+            descending: 是否降序
+            
+        Returns:
+            dict: 当前页用户列表和总行数
+        """
+        try:
+            query = self.supabase.table('users').select(USER_LIST_COLUMNS, count='exact')
+            
+            if email:
+                query = query.ilike('email', f'%{email}%')
+            
+            if nickname:
+                query = query.ilike('nickname', f'%{nickname}%')
+            
+            if order_by not in USER_SORT_FIELDS:
+                order_by = 'create_time'
+            start = max(0, page) * page_size
+            result = query.order(order_by, desc=descending).range(start, start + page_size - 1).execute()
+            
+            return {
+                'success': True,
+                'users': result.data,
+                'total': result.count if result.count is not None else len(result.data)
+            }
+            
+        except Exception as e:
+            print(f"获取用户列表时发生错误: {str(e)}")
+            return {'success': False, 'message': f'获取用户列表失败: {str(e)}'}
+    
+    def get_user_by_id(self, user_id, use_cache=True):
         """根据ID获取用户
         
         Args:
             user_id: 用户ID
+            use_cache: 是否使用会话缓存，False 时总是重新查询
             
         Returns:
             dict: 用户信息结果
         """
         try:
-            result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+            user = self.entitlements.get_user(user_id, self._load_user, use_cache)
             
-            if not result.data:
+            if not user:
                 return {'success': False, 'message': '用户不存在'}
             
             return {
                 'success': True,
-                'user': result.data[0]
+                'user': user
             }
             
         except Exception as e:
             print(f"获取用户信息时发生错误: {str(e)}")
             return {'success': False, 'message': f'获取用户信息失败: {str(e)}'}
     
+    def _load_user(self, user_id):
+        """从数据库读取用户记录，不存在时返回None"""
+        result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+        return result.data[0] if result.data else None
+    
     def update_user(self, user_id, nickname=None, password=None, role=None, expired_time=None):
         """更新用户信息
         
@@ -436,12 +669,12 @@ class DatabaseManager:
                     return {'success': False, 'message': f'更新密码失败: {str(pw_error)}'}
             
             # 获取更新后的用户信息
-            updated_user = self.supabase.table('users').select('*').eq('id', user_id).execute()
+            updated_user = self.entitlements.get_user(user_id, self._load_user, use_cache=False)
             
             return {
                 'success': True,
                 'message': '更新成功',
-                'user': updated_user.data[0] if updated_user.data else None
+                'user': updated_user
             }
             
         except Exception as e:
@@ -466,6 +699,7 @@ class DatabaseManager:
             
             # 删除用户表记录
             self.supabase.table('users').delete().eq('id', user_id).execute()
+            self.entitlements.invalidate(user_id)
             
             # 删除认证用户
             try:
@@ -539,7 +773,7 @@ class DatabaseManager:
         """
         try:
             # 生成激活码
-            activation_code = str(uuid.uuid4()).replace('-', '')[:16].upper()
+            activation_code = new_activation_code()
             
             # 获取当前时间
             current_time = datetime.now().isoformat()
@@ -565,6 +799,57 @@ class DatabaseManager:
             print(f"创建激活码时发生错误: {str(e)}")
             return {'success': False, 'message': f'创建激活码失败: {str(e)}'}
     
+    def create_activation_codes(self, count, duration_days=30, chunk_size=CODE_INSERT_CHUNK_SIZE):
+        """批量创建通用激活码
+        
+        激活码在本地生成，按批插入；与已有激活码重复的行被忽略并重新生成。
+        
+        Args:
+            count: 激活码数量
+            duration_days: 有效期天数
+            chunk_size: 每次插入的行数
+            
+        Returns:
+            dict: 创建结果，codes 为创建成功的激活码列表
+        """
+        created = []
+        try:
+            for start in range(0, count, chunk_size):
+                remaining = min(chunk_size, count - start)
+                for _ in range(3):
+                    current_time = datetime.now().isoformat()
+                    batch = {new_activation_code() for _ in range(remaining)}
+                    rows = [{
+                        'code': code,
+                        'activation_status': '未激活',
+                        'valid_days': duration_days,
+                        'create_time': current_time,
+                        'update_time': current_time
+                    } for code in batch]
+                    
+                    result = self.supabase.table('activation_codes').upsert(
+                        rows, on_conflict='code', ignore_duplicates=True
+                    ).execute()
+                    inserted = [row['code'] for row in result.data or []]
+                    created.extend(inserted)
+                    remaining -= len(inserted)
+                    if remaining <= 0:
+                        break
+        
+        except Exception as e:
+            print(f"批量创建激活码时发生错误: {str(e)}")
+            return {
+                'success': bool(created),
+                'message': f'已创建 {len(created)} 个激活码，其余创建失败: {str(e)}',
+                'codes': created
+            }
+        
+        return {
+            'success': len(created) == count,
+            'message': f'成功创建 {len(created)} 个激活码' + ('' if len(created) == count else f'，{count - len(created)} 个未能创建'),
+            'codes': created
+        }
+    
     def get_activation_codes(self):
         """获取激活码列表
         
@@ -583,9 +868,53 @@ class DatabaseManager:
             print(f"获取激活码列表时发生错误: {str(e)}")
             return {'success': False, 'message': f'获取激活码列表失败: {str(e)}'}
     
+    def get_activation_codes_page(self, page=0, page_size=100, keyword=None, status=None,
+                                  order_by='create_time', descending=True):
+        """分页获取激活码列表，筛选、排序和分页均在服务端完成
+        
+        Args:
+            page: 页码（从0开始）
+            page_size: 每页行数
+            keyword: 激活码或用户邮箱筛选条件
+            status: 激活状态筛选条件
+            order_by: 排序字段
+            descending: 是否降序
+            
+        Returns:
+            dict: 当前页激活码列表和总行数
+        """
+        try:
+            query = self.supabase.table('activation_codes').select(CODE_LIST_COLUMNS, count='exact')
+            
+            if keyword:
+                # 逗号和括号是 or 过滤语法的分隔符
+                keyword = re.sub(r'[,()]', '', keyword)
+                query = query.or_(f'code.ilike.%{keyword}%,user_email.ilike.%{keyword}%')
+            
+            if status:
+                query = query.eq('activation_status', status)
+            
+            if order_by not in CODE_SORT_FIELDS:
+                order_by = 'create_time'
+            start = max(0, page) * page_size
+            result = query.order(order_by, desc=descending).range(start, start + page_size - 1).execute()
+            
+            return {
+                'success': True,
+                'codes': result.data,
+                'total': result.count if result.count is not None else len(result.data)
+            }
+            
+        except Exception as e:
+            print(f"获取激活码列表时发生错误: {str(e)}")
+            return {'success': False, 'message': f'获取激活码列表失败: {str(e)}'}
+    
     def activate_user(self, user_id, activation_code, mac_address=None):
         """激活用户
         
+        通过数据库函数 activate_user_with_code 在一次请求、一个事务内完成激活，
+        函数未部署时退回到逐表查询和更新。
+        
         Args:
             user_id: 用户ID
             activation_code: 激活码
@@ -594,6 +923,24 @@ class DatabaseManager:
         Returns:
             dict: 激活结果
         """
+        if self._activation_rpc:
+            try:
+                result = activate_with_code(self.supabase, user_id, activation_code, mac_address)
+                self.entitlements.invalidate(user_id)
+                return result
+            except ActivationRPCUnavailable as e:
+                print(f"激活函数未部署，改为逐表更新: {str(e)}")
+                self._activation_rpc = False
+            except Exception as e:
+                print(f"激活用户时发生错误: {str(e)}")
+                return {'success': False, 'message': f'激活失败: {str(e)}'}
+        
+        result = self._activate_user_legacy(user_id, activation_code, mac_address)
+        self.entitlements.invalidate(user_id)
+        return result
+    
+    def _activate_user_legacy(self, user_id, activation_code, mac_address=None):
+        """逐表查询和更新激活用户，用于未部署激活函数的数据库"""
         try:
             # 先检查用户是否存在
             user_result = self.supabase.table('users').select('*').eq('id', user_id).execute()
@@ -648,7 +995,8 @@ class DatabaseManager:
             return {
                 'success': True,
                 'message': '激活成功',
-                'expired_time': code.get('expiry_date')
+                'expired_time': code.get('expiry_date'),
+                'expiry_date': code.get('expiry_date')
             }
             
         except Exception as e:
@@ -755,6 +1103,7 @@ class DatabaseManager:
                         'expired_time': None,
                         'update_time': datetime.now().isoformat()
                     }).eq('email', code.get('user_email')).execute()
+                    self.entitlements.invalidate_email(code.get('user_email'))
             
             # 删除激活码
             result = self.supabase.table('activation_codes').delete().eq('id', code_id).execute()
@@ -788,36 +1137,51 @@ class DatabaseManager:
             dict: 保存结果
         """
         try:
-            # 检查文章是否已存在
-            existing = self.supabase.table('articles').select('id').eq('article_url', article_data['article_url']).execute()
-            
-            if existing.data:
-                # 更新文章
-                article_id = existing.data[0]['id']
-                self.supabase.table('articles').update({
-                    'title': article_data['title'],
-                    'content': article_data['content'],
-                    'read_count': article_data['read_count'],
-                    'update_time': datetime.now().isoformat()
-                }).eq('id', article_id).execute()
+            with get_metrics().timer(STAGE_DB_SAVE):
+                # 按规范化链接识别文章，同一文章的不同链接只保存一行
+                raw_url = article_data['article_url']
+                article_url = canonicalize_article_url(raw_url)
+                identity = article_identity(raw_url)
+                article_id = self._article_ids.get(identity)
                 
-                return {'success': True, 'message': '文章更新成功', 'article_id': article_id}
-            else:
-                # 添加文章
-                result = self.supabase.table('articles').insert({
-                    'account_name': article_data['account_name'],
-                    'category': article_data.get('category', '未分类'),
-                    'title': article_data['title'],
-                    'content': article_data['content'],
-                    'publish_time': article_data['publish_time'],
-                    'read_count': article_data['read_count'],
-                    'article_url': article_data['article_url'],
-                    'user_id': article_data['user_id'],
-                    'create_time': datetime.now().isoformat(),
-                    'update_time': datetime.now().isoformat()
-                }).execute()
+                if article_id is None:
+                    # 检查文章是否已存在（兼容以原始链接保存的旧记录）
+                    existing = self.supabase.table('articles').select('id').in_(
+                        'article_url', list({article_url, raw_url})
+                    ).execute()
+                    if existing.data:
+                        article_id = existing.data[0]['id']
+            
+                if article_id is not None:
+                    # 更新文章
+                    self.supabase.table('articles').update({
+                        'title': article_data['title'],
+                        'content': article_data['content'],
+                        'read_count': article_data['read_count'],
+                        'article_url': article_url,
+                        'update_time': datetime.now().isoformat()
+                    }).eq('id', article_id).execute()
+                    self._article_ids[identity] = article_id
+                
+                    return {'success': True, 'message': '文章更新成功', 'article_id': article_id}
+                else:
+                    # 添加文章
+                    result = self.supabase.table('articles').insert({
+                        'account_name': article_data['account_name'],
+                        'category': article_data.get('category', '未分类'),
+                        'title': article_data['title'],
+                        'content': article_data['content'],
+                        'publish_time': article_data['publish_time'],
+                        'read_count': article_data['read_count'],
+                        'article_url': article_url,
+                        'user_id': article_data['user_id'],
+                        'create_time': datetime.now().isoformat(),
+                        'update_time': datetime.now().isoformat()
+                    }).execute()
                 
-                return {'success': True, 'message': '文章保存成功', 'article_id': result.data[0]['id']}
+                    article_id = result.data[0]['id']
+                    self._article_ids[identity] = article_id
+                    return {'success': True, 'message': '文章保存成功', 'article_id': article_id}
                 
         except Exception as e:
             return {'success': False, 'message': f'保存文章失败: {str(e)}'}
@@ -913,10 +1277,7 @@ class DatabaseManager:
         Returns:
             str: MAC地址
         """
-        import uuid
-        mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff) 
-                         for elements in range(0, 8*6, 8)][::-1])
-        return mac
+        return get_device_mac()
         
     def _refresh_supabase_client(self):
         """刷新Supabase客户端连接"""
@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.user_manager import LoginDialog, ActivationDialog
 from models.article_manager import ArticleManager
 from models.database import DatabaseManager
+from utils.db_executor import get_db_executor
 
 class DatabaseIntegrationUI(QWidget):
     """数据库集成界面，提供用户管理和文章数据库功能"""
@@ -285,12 +286,12 @@ class DatabaseIntegrationUI(QWidget):
             return
             
         try:
-            # 获取最新的用户信息
+            # 获取最新的用户信息，激活等修改操作会使缓存失效
             db_manager = DatabaseManager()
-            user_data = db_manager.supabase.table('users').select('*').eq('id', self.user_info['id']).execute()
+            user_data = db_manager.get_user_by_id(self.user_info['id'])
             
-            if user_data.data:
-                user = user_data.data[0]
+            if user_data['success']:
+                user = user_data['user']
                 self.user_info = {
                     'id': user['id'],
                     'email': user['email'],
@@ -320,13 +321,29 @@ class DatabaseIntegrationUI(QWidget):
             
         account_name = self.account_filter.text().strip()
         keyword = self.keyword_input.text().strip()
+        db_manager = self.article_manager.db_manager
+        user_id = self.user_info['id']
         
         if keyword:
             # 关键词搜索
-            self.article_manager.search_articles(keyword)
+            func, args = db_manager.search_articles, (user_id, keyword)
         else:
             # 按公众号筛选
-            self.article_manager.get_articles(account_name if account_name else None)
+            func, args = db_manager.get_articles, (user_id, account_name if account_name else None)
+        
+        # 在后台线程查询，新的搜索会取消尚未返回的旧搜索
+        get_db_executor().submit(
+            'articles.search', func, *args,
+            on_success=self._on_search_result,
+            on_error=lambda e: self._on_query_failed(f"搜索文章失败: {str(e)}")
+        )
+    
+    def _on_search_result(self, result):
+        """搜索完成"""
+        if result['success']:
+            self._on_query_success(result['articles'])
+        else:
+            self._on_query_failed(result['message'])
     
     def _on_query_success(self, articles):
         """查询成功回调"""
@@ -403,19 +420,32 @@ class DatabaseIntegrationUI(QWidget):
         QMessageBox.information(self, "功能开发中", "密码修改功能正在开发中")
     
     def test_db_connection(self):
-        """测试数据库连接"""
-        try:
-            db_manager = DatabaseManager()
-            # 简单查询测试连接
-            db_manager.supabase.table('users').select('count', count='exact').execute()
-            
-            self.db_status_label.setText("已连接")
-            self.db_status_label.setStyleSheet("color: green;")
-            
-        except Exception as e:
-            self.db_status_label.setText("连接失败")
-            self.db_status_label.setStyleSheet("color: red;")
-            QMessageBox.warning(self, "连接失败", f"数据库连接失败: {str(e)}")
+        """测试数据库连接，在后台线程执行"""
+        self.db_status_label.setText("连接中...")
+        self.db_status_label.setStyleSheet("color: #666666;")
+        get_db_executor().submit(
+            'db.test_connection', self._test_db_connection_task,
+            on_success=self._on_db_connected,
+            on_error=self._on_db_connection_failed
+        )
+    
+    @staticmethod
+    def _test_db_connection_task():
+        """简单查询测试连接（工作线程）"""
+        db_manager = DatabaseManager()
+        db_manager.supabase.table('users').select('count', count='exact').execute()
+        return True
+    
+    def _on_db_connected(self, _):
+        """数据库连接成功"""
+        self.db_status_label.setText("已连接")
+        self.db_status_label.setStyleSheet("color: green;")
+    
+    def _on_db_connection_failed(self, error):
+        """数据库连接失败"""
+        self.db_status_label.setText("连接失败")
+        self.db_status_label.setStyleSheet("color: red;")
+        QMessageBox.warning(self, "连接失败", f"数据库连接失败: {str(error)}")
     
     def is_auto_save_enabled(self):
         """检查是否启用自动保存"""
@@ -0,0 +1,115 @@
+import time
+import threading
+
+
+# 用户记录缓存时间（秒），过期后下次读取时重新查询
+DEFAULT_TTL = 120
+
+
+class EntitlementCache:
+    """用户权限缓存
+
+    会话内缓存 users 表的用户记录（角色、过期时间、激活状态等），
+    在有效期内的读取直接返回内存中的记录，过期或失效后从数据库重新读取。
+    修改用户、激活等操作完成后需调用 invalidate。
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        """初始化
+
+        Args:
+            ttl: 缓存时间（秒）
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_user(self, user_id, loader, use_cache=True):
+        """读取用户记录，缓存未命中时通过 loader 查询
+
+        Args:
+            user_id: 用户ID
+            loader: 查询函数，参数为用户ID，返回用户记录，不存在时返回None
+            use_cache: 是否使用缓存，False 时总是重新查询
+
+        Returns:
+            dict: 用户记录副本，不存在时为None
+        """
+        if use_cache:
+            user = self.peek(user_id)
+            if user is not None:
+                return user
+
+        user = loader(user_id)
+        if user:
+            self.put(user)
+        else:
+            self.invalidate(user_id)
+        return dict(user) if user else None
+
+    def peek(self, user_id):
+        """只从缓存读取用户记录，不查询数据库
+
+        Returns:
+            dict: 用户记录副本，未缓存或已过期时为None
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if not entry:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return dict(user)
+
+    def put(self, user):
+        """缓存用户记录
+
+        Args:
+            user: 用户记录，需包含 id
+        """
+        if not user or not user.get('id'):
+            return
+        with self._lock:
+            self._entries[user['id']] = (time.monotonic() + self.ttl, dict(user))
+
+    def invalidate(self, user_id=None):
+        """使缓存失效
+
+        Args:
+            user_id: 用户ID，为None时清空全部缓存
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def invalidate_email(self, email):
+        """按邮箱使缓存失效，用于只知道邮箱的更新（如删除激活码）"""
+        if not email:
+            return
+        with self._lock:
+            for user_id, (_, user) in list(self._entries.items()):
+                if user.get('email') == email:
+                    del self._entries[user_id]
+
+
+def is_admin_user(user):
+    """用户是否是管理员，同时处理字符串和数字类型的 role 值"""
+    return bool(user) and str(user.get('role')) == '0'  # 0表示管理员
+
+
+_entitlement_cache = None
+
+def get_entitlement_cache():
+    """获取全局用户权限缓存
+
+    Returns:
+        EntitlementCache: 缓存实例
+    """
+    global _entitlement_cache
+    if _entitlement_cache is None:
+        _entitlement_cache = EntitlementCache()
+    return _entitlement_cache
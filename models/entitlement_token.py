@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import base64
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.exceptions import InvalidSignature
+from utils.device_fingerprint import normalize_mac
+
+
+# 数据库签发函数名，定义见 supabase_functions.sql
+ISSUE_TOKEN_RPC = 'issue_entitlement_token'
+
+# 本地缓存的授权令牌
+TOKEN_STORE_PATH = os.path.join(os.path.expanduser("~"), ".gzh_entitlement.json")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def load_public_key(value):
+    """解析签名公钥
+
+    Args:
+        value: 32字节 Ed25519 公钥的十六进制或 base64 文本
+
+    Returns:
+        Ed25519PublicKey: 公钥，未配置或格式错误时为None
+    """
+    if not value:
+        return None
+    try:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = base64.b64decode(value)
+        return Ed25519PublicKey.from_public_bytes(raw)
+    except Exception as e:
+        print(f"授权公钥格式错误: {str(e)}")
+        return None
+
+
+def verify_token(token, public_key, mac_address=None, now=None):
+    """验证授权令牌
+
+    令牌格式为 base64url(JSON载荷).base64url(Ed25519签名)，签名覆盖载荷原始字节。
+
+    Args:
+        token: 授权令牌
+        public_key: 签名公钥
+        mac_address: 当前设备MAC地址，必须与令牌绑定的设备一致
+        now: 当前时间戳，默认为当前时间
+
+    Returns:
+        dict: 令牌载荷，签名无效、已过期或设备不符时为None
+    """
+    if not token or public_key is None:
+        return None
+    try:
+        payload_part, signature_part = token.split('.')
+        payload_bytes = _b64decode(payload_part)
+        public_key.verify(_b64decode(signature_part), payload_bytes)
+        payload = json.loads(payload_bytes.decode('utf-8'))
+    except (ValueError, InvalidSignature):
+        return None
+
+    now = time.time() if now is None else now
+    if payload.get('exp', 0) <= now:
+        return None
+    bound_mac = normalize_mac(payload.get('mac'))
+    if not bound_mac or bound_mac != normalize_mac(mac_address):
+        return None
+    return payload
+
+
+def token_user(payload):
+    """将令牌载荷转换为与 users 表记录相同字段的用户信息"""
+    return {
+        'id': payload.get('uid'),
+        'email': payload.get('email', ''),
+        'nickname': payload.get('nickname', ''),
+        'role': payload.get('role', '1'),
+        'activation_code': payload.get('activation_code', ''),
+        'activation_status': payload.get('activation_status', ''),
+        'expired_time': payload.get('expired_time', ''),
+        'mac': payload.get('mac', ''),
+    }
+
+
+def load_token(path=TOKEN_STORE_PATH):
+    """读取本地缓存的令牌，不存在时为None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('token')
+    except (OSError, ValueError):
+        return None
+
+
+def save_token(token, path=TOKEN_STORE_PATH):
+    """保存令牌到本地，先写临时文件再替换"""
+    try:
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'token': token, 'saved_at': int(time.time())}, f)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        print(f"保存授权令牌时发生错误: {str(e)}")
+        return False
+
+
+def clear_token(path=TOKEN_STORE_PATH):
+    """删除本地令牌"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"删除授权令牌时发生错误: {str(e)}")
@@ -0,0 +1,188 @@
+-- 数据库函数，在 Supabase SQL 编辑器中执行
+
+-- ===== 认证用户查找，仅授权给 service_role，客户端匿名密钥无法调用 =====
+
+-- 按邮箱查找认证用户ID，走 auth.users 的邮箱索引，不再列出全部用户
+CREATE OR REPLACE FUNCTION public.get_auth_user_id_by_email(p_email TEXT)
+RETURNS UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = auth, public
+AS $$
+    SELECT id FROM auth.users WHERE lower(email) = lower(p_email) LIMIT 1;
+$$;
+
+-- 批量按邮箱查找认证用户ID，用于管理员批量导入用户
+CREATE OR REPLACE FUNCTION public.get_auth_user_ids_by_emails(p_emails TEXT[])
+RETURNS TABLE (email TEXT, id UUID)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = auth, public
+AS $$
+    SELECT u.email::TEXT, u.id FROM auth.users u
+    WHERE lower(u.email) = ANY (SELECT lower(e) FROM unnest(p_emails) AS e);
+$$;
+
+REVOKE ALL ON FUNCTION public.get_auth_user_id_by_email(TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.get_auth_user_ids_by_emails(TEXT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_auth_user_id_by_email(TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION public.get_auth_user_ids_by_emails(TEXT[]) TO service_role;
+
+-- ===== 激活 =====
+
+-- 使用激活码激活用户，一次请求、一个事务内完成：
+-- 校验激活码、绑定MAC地址、计算过期时间（激活时间 + 有效期天数）并更新两张表。
+-- 激活码行加锁，同一激活码被并发使用时只有一个请求成功。
+-- 返回 {"success": bool, "message": text, "expiry_date": text}
+CREATE OR REPLACE FUNCTION public.activate_user_with_code(p_user_id UUID, p_code TEXT, p_mac TEXT DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_code public.activation_codes%ROWTYPE;
+    v_email TEXT;
+    v_now TIMESTAMPTZ := now();
+    v_expiry TIMESTAMPTZ;
+BEGIN
+    SELECT * INTO v_code FROM public.activation_codes WHERE code = p_code FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'message', '激活码不存在');
+    END IF;
+
+    IF coalesce(v_code.activation_status, '') = '已激活' THEN
+        RETURN jsonb_build_object('success', false, 'message', '激活码已被使用');
+    ELSIF v_code.activation_status = '已过期' THEN
+        RETURN jsonb_build_object('success', false, 'message', '激活码已过期');
+    ELSIF coalesce(v_code.activation_status, '') NOT IN ('', '未激活') THEN
+        RETURN jsonb_build_object('success', false, 'message', '激活码状态异常: ' || v_code.activation_status);
+    END IF;
+
+    IF v_code.expiry_date IS NOT NULL AND v_code.expiry_date::TEXT <> ''
+       AND v_code.expiry_date::TIMESTAMPTZ < v_now THEN
+        UPDATE public.activation_codes
+           SET activation_status = '已过期', update_time = v_now
+         WHERE id = v_code.id;
+        RETURN jsonb_build_object('success', false, 'message', '激活码已过期');
+    END IF;
+
+    SELECT email INTO v_email FROM public.users WHERE id = p_user_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'message', '用户不存在');
+    END IF;
+
+    v_expiry := v_now + make_interval(days => coalesce(v_code.valid_days::INT, 30));
+
+    UPDATE public.activation_codes
+       SET user_email = v_email,
+           activation_status = '已激活',
+           activation_time = v_now,
+           expiry_date = v_expiry,
+           update_time = v_now
+     WHERE id = v_code.id;
+
+    UPDATE public.users
+       SET activation_code = p_code,
+           activation_status = '已激活',
+           expired_time = v_expiry,
+           mac = coalesce(nullif(p_mac, ''), mac),
+           update_time = v_now
+     WHERE id = p_user_id;
+
+    RETURN jsonb_build_object('success', true, 'message', '激活成功', 'expiry_date', v_expiry);
+END;
+$$;
+
+-- 客户端已能直接读写 users 和 activation_codes 表，授权给客户端使用的角色不会扩大权限
+REVOKE ALL ON FUNCTION public.activate_user_with_code(UUID, TEXT, TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.activate_user_with_code(UUID, TEXT, TEXT) TO anon, authenticated, service_role;
+
+-- ===== 离线授权令牌 =====
+
+-- 签名密钥保存在不对外暴露的 private 模式中，初始化一次：
+--   CREATE SCHEMA IF NOT EXISTS private;
+--   CREATE TABLE IF NOT EXISTS private.entitlement_keys (
+--       id INT PRIMARY KEY DEFAULT 1,
+--       public_key BYTEA NOT NULL,
+--       secret_key BYTEA NOT NULL
+--   );
+--   INSERT INTO private.entitlement_keys (public_key, secret_key)
+--   SELECT public, secret FROM pgsodium.crypto_sign_new_keypair();
+-- 然后将 SELECT encode(public_key, 'hex') FROM private.entitlement_keys 的结果
+-- 写入客户端 config.json 的 ENTITLEMENT_PUBLIC_KEY。
+
+-- 统一MAC地址格式为小写冒号分隔，与客户端 normalize_mac 一致
+CREATE OR REPLACE FUNCTION public.normalize_mac(p_mac TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT lower(replace(trim(coalesce(p_mac, '')), '-', ':'));
+$$;
+
+-- 为已激活且未过期的用户签发授权令牌：base64url(JSON载荷).base64url(Ed25519签名)
+-- 令牌有效期为账号过期时间与 p_valid_days 天中较早者，绑定设备MAC地址。
+-- 用户已绑定MAC地址时只为该设备签发，p_mac 不一致时拒绝；未绑定时使用 p_mac。
+-- 用户未激活或已过期时返回 NULL，客户端据此删除本地令牌。
+CREATE OR REPLACE FUNCTION public.issue_entitlement_token(p_user_id UUID, p_mac TEXT DEFAULT NULL, p_valid_days INT DEFAULT 7)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user public.users%ROWTYPE;
+    v_now TIMESTAMPTZ := now();
+    v_account_expiry TIMESTAMPTZ;
+    v_payload BYTEA;
+    v_secret BYTEA;
+    v_mac TEXT := public.normalize_mac(p_mac);
+BEGIN
+    IF v_mac !~ '^[0-9a-f]{2}(:[0-9a-f]{2}){5}$' THEN
+        RAISE EXCEPTION 'invalid device mac' USING ERRCODE = '22023';
+    END IF;
+
+    SELECT * INTO v_user FROM public.users WHERE id = p_user_id;
+    IF NOT FOUND OR v_user.activation_status IS DISTINCT FROM '已激活' THEN
+        RETURN NULL;
+    END IF;
+
+    IF v_user.expired_time IS NOT NULL AND v_user.expired_time::TEXT <> '' THEN
+        v_account_expiry := v_user.expired_time::TIMESTAMPTZ;
+        IF v_account_expiry <= v_now THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    IF coalesce(v_user.mac, '') <> '' AND public.normalize_mac(v_user.mac) <> v_mac THEN
+        RAISE EXCEPTION 'device mac mismatch' USING ERRCODE = '42501';
+    END IF;
+
+    SELECT secret_key INTO v_secret FROM private.entitlement_keys WHERE id = 1;
+
+    v_payload := convert_to(jsonb_build_object(
+        'uid', v_user.id,
+        'email', v_user.email,
+        'nickname', v_user.nickname,
+        'role', v_user.role,
+        'activation_code', v_user.activation_code,
+        'activation_status', v_user.activation_status,
+        'expired_time', v_user.expired_time,
+        'mac', v_mac,
+        'iat', extract(epoch FROM v_now)::BIGINT,
+        'exp', extract(epoch FROM least(coalesce(v_account_expiry, 'infinity'),
+                                        v_now + make_interval(days => p_valid_days)))::BIGINT
+    )::TEXT, 'UTF8');
+
+    RETURN rtrim(translate(encode(v_payload, 'base64'), E'+/\n', '-_'), '=')
+        || '.'
+        || rtrim(translate(encode(pgsodium.crypto_sign_detached(v_payload, v_secret), 'base64'), E'+/\n', '-_'), '=');
+END;
+$$;
+
+-- 令牌只包含用户本人的授权信息，授权范围与激活函数一致
+REVOKE ALL ON FUNCTION public.issue_entitlement_token(UUID, TEXT, INT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.issue_entitlement_token(UUID, TEXT, INT) TO anon, authenticated, service_role;
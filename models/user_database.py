@@ -1,7 +1,6 @@
 import uuid
 import bcrypt
 import getpass
-import platform
 import uuid
 import json
 import os
@@ -18,6 +17,10 @@ except ImportError:
     # 如果导入失败，尝试添加父目录到路径
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from utils.config_crypto import decrypt_config
+from models.activation_rpc import activate_with_code, ActivationRPCUnavailable
+from models.entitlement_cache import get_entitlement_cache
+from models import entitlement_token
+from utils.device_fingerprint import get_device_mac, mac_variants, UNKNOWN_MAC
 
 class UserDatabaseManager:
     """用户数据库管理器"""
@@ -32,6 +35,7 @@ class UserDatabaseManager:
         self.supabase_url = None
         self.supabase_key = None
         self.database_url = None
+        self.entitlement_public_key = None
         self.config_error = False
         
         try:
@@ -54,6 +58,8 @@ class UserDatabaseManager:
                         self.supabase_url = config.get('SUPABASE_URL')
                         self.supabase_key = config.get('SUPABASE_KEY')
                         self.database_url = config.get('DATABASE_URL')
+                        self.entitlement_public_key = entitlement_token.load_public_key(
+                            config.get('ENTITLEMENT_PUBLIC_KEY'))
                     if show_errors:
                         print("已从config.json加载并解密配置")
                 except Exception as e:
@@ -105,6 +111,11 @@ class UserDatabaseManager:
         
         # MAC地址存储路径
         self.mac_store_path = os.path.join(os.path.expanduser("~"), ".gzh_mac_store.json")
+        
+        # 激活函数是否可用，未部署时退回到逐表更新
+        self._activation_rpc = True
+        # 会话内共享的用户记录缓存
+        self.entitlements = get_entitlement_cache()
     
     def has_config_error(self):
         """检查是否存在配置错误
@@ -148,22 +159,8 @@ class UserDatabaseManager:
         return bcrypt.checkpw(password.encode(), hashed_password.encode())
     
     def _get_current_mac(self):
-        """获取当前MAC地址"""
-        try:
-            if platform.system() == 'Windows':
-                for line in os.popen("getmac /fo csv /nh"):
-                    mac = line.split(',')[0].strip('"')
-                    return mac
-            elif platform.system() == 'Darwin':  # macOS
-                for line in os.popen("ifconfig en0 | grep ether"):
-                    return line.strip().split()[1]
-            elif platform.system() == 'Linux':
-                for line in os.popen("ip link show | grep link/ether"):
-                    return line.strip().split()[1]
-            return "unknown"
-        except Exception as e:
-            print(f"获取MAC地址时发生错误: {str(e)}")
-            return "unknown"
+        """获取当前MAC地址，进程内只读取一次"""
+        return get_device_mac()
     
     def _save_mac_for_user(self, user_id, mac_address):
         """保存用户的MAC地址到本地
@@ -240,6 +237,7 @@ class UserDatabaseManager:
                 'last_login_ip': self._get_ip_address()
             }).eq('id', user_id).execute()
             
+            self.entitlements.put(user)
             return {'success': True, 'message': '登录成功', 'user': user}
             
         except Exception as e:
@@ -290,27 +288,33 @@ class UserDatabaseManager:
             print(f"注册用户时发生错误: {str(e)}")
             return {'success': False, 'message': f'注册失败: {str(e)}'}
     
-    def get_user_by_id(self, user_id):
+    def get_user_by_id(self, user_id, use_cache=True):
         """根据ID获取用户信息
         
         Args:
             user_id: 用户ID
+            use_cache: 是否使用会话缓存，False 时总是重新查询
             
         Returns:
             dict: 用户信息
         """
         try:
-            result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+            user = self.entitlements.get_user(user_id, self._load_user, use_cache)
             
-            if not result.data:
+            if not user:
                 return {'success': False, 'message': '用户不存在', 'user': {}}
             
-            return {'success': True, 'message': '获取成功', 'user': result.data[0]}
+            return {'success': True, 'message': '获取成功', 'user': user}
             
         except Exception as e:
             print(f"获取用户信息时发生错误: {str(e)}")
             return {'success': False, 'message': f'获取失败: {str(e)}', 'user': {}}
     
+    def _load_user(self, user_id):
+        """从数据库读取用户记录，不存在时返回None"""
+        result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+        return result.data[0] if result.data else None
+    
     def get_user_activation_info(self, user_id):
         """获取用户激活信息
         
@@ -322,13 +326,11 @@ class UserDatabaseManager:
         """
         try:
             # 先检查用户是否存在
-            user_result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+            user = self.entitlements.get_user(user_id, self._load_user)
             
-            if not user_result.data:
+            if not user:
                 return {'success': False, 'message': '用户不存在', 'data': {}}
             
-            user = user_result.data[0]
-            
             # 检查用户是否有激活码
             activation_code = user.get('activation_code')
             if not activation_code:
@@ -371,6 +373,9 @@ class UserDatabaseManager:
     def activate_user(self, user_id, activation_code, mac_address=None):
         """激活用户
         
+        通过数据库函数 activate_user_with_code 在一次请求、一个事务内完成激活，
+        函数未部署时退回到逐表查询和更新。
+        
         Args:
             user_id: 用户ID
             activation_code: 激活码
@@ -379,6 +384,24 @@ class UserDatabaseManager:
         Returns:
             dict: 激活结果
         """
+        if self._activation_rpc:
+            try:
+                result = activate_with_code(self.supabase, user_id, activation_code, mac_address)
+                self.entitlements.invalidate(user_id)
+                return result
+            except ActivationRPCUnavailable as e:
+                print(f"激活函数未部署，改为逐表更新: {str(e)}")
+                self._activation_rpc = False
+            except Exception as e:
+                print(f"激活用户时发生错误: {str(e)}")
+                return {'success': False, 'message': f'激活失败: {str(e)}'}
+        
+        result = self._activate_user_legacy(user_id, activation_code, mac_address)
+        self.entitlements.invalidate(user_id)
+        return result
+    
+    def _activate_user_legacy(self, user_id, activation_code, mac_address=None):
+        """逐表查询和更新激活用户，用于未部署激活函数的数据库"""
         try:
             # 先检查用户是否存在
             user_result = self.supabase.table('users').select('*').eq('id', user_id).execute()
@@ -503,6 +526,7 @@ class UserDatabaseManager:
             self.supabase.table('users').update({
                 'password': hashed_password
             }).eq('id', user_id).execute()
+            self.entitlements.invalidate(user_id)
             
             return {'success': True, 'message': '密码修改成功'}
             
@@ -519,9 +543,12 @@ class UserDatabaseManager:
         try:
             # 获取当前MAC地址
             current_mac = self._get_current_mac()
+            if current_mac == UNKNOWN_MAC:
+                return {'success': False, 'message': '无法识别当前设备', 'user': None}
             
             # 查询用户
-            result = self.supabase.table('users').select('*').eq('mac', current_mac).execute()
+            # 同时匹配旧版本保存的各种MAC地址格式
+            result = self.supabase.table('users').select('*').in_('mac', mac_variants(current_mac)).execute()
             
             if not result.data:
                 return {'success': False, 'message': '未找到匹配的设备', 'user': None}
@@ -534,12 +561,64 @@ class UserDatabaseManager:
                 'last_login_ip': self._get_ip_address()
             }).eq('id', user.get('id')).execute()
             
+            self.entitlements.put(user)
             return {'success': True, 'message': '自动登录成功', 'user': user}
             
         except Exception as e:
             print(f"自动登录时发生错误: {str(e)}")
             return {'success': False, 'message': f'自动登录失败: {str(e)}', 'user': None}
     
+    def load_offline_user(self):
+        """通过本地缓存的授权令牌离线登录，不访问网络
+        
+        Returns:
+            dict: 令牌中的用户信息，没有有效令牌时为None
+        """
+        payload = entitlement_token.verify_token(
+            entitlement_token.load_token(), self.entitlement_public_key, self._get_current_mac())
+        if not payload:
+            return None
+        user = entitlement_token.token_user(payload)
+        user['offline'] = True
+        return user
+    
+    def refresh_entitlement_token(self, user_id):
+        """向服务器申请新的授权令牌并保存到本地
+        
+        Returns:
+            dict: 结果，revoked 为 True 表示服务器拒绝签发（未激活或已过期），本地令牌已删除
+        """
+        if self.supabase is None or self.entitlement_public_key is None:
+            return {'success': False, 'message': '未配置离线授权', 'revoked': False}
+        
+        mac_address = self._get_current_mac()
+        if mac_address == UNKNOWN_MAC:
+            return {'success': False, 'message': '无法获取设备MAC地址', 'revoked': False}
+        try:
+            result = self.supabase.rpc(entitlement_token.ISSUE_TOKEN_RPC, {
+                'p_user_id': user_id,
+                'p_mac': mac_address,
+            }).execute()
+        except Exception as e:
+            print(f"获取授权令牌时发生错误: {str(e)}")
+            return {'success': False, 'message': f'获取授权令牌失败: {str(e)}', 'revoked': False}
+        
+        token = result.data
+        if not token:
+            entitlement_token.clear_token()
+            return {'success': False, 'message': '账号未激活或已过期', 'revoked': True}
+        
+        payload = entitlement_token.verify_token(token, self.entitlement_public_key, mac_address)
+        if not payload:
+            return {'success': False, 'message': '授权令牌验证失败，请检查公钥配置', 'revoked': False}
+        
+        entitlement_token.save_token(token)
+        return {'success': True, 'message': '授权令牌已更新', 'user': entitlement_token.token_user(payload)}
+    
+    def clear_entitlement_token(self):
+        """删除本地授权令牌，退出登录时调用"""
+        entitlement_token.clear_token()
+    
     def _get_ip_address(self):
         """获取当前IP地址"""
         try:
@@ -570,6 +649,7 @@ class UserDatabaseManager:
                 'activation_status': status,
                 'update_time': current_time
             }).eq('id', user_id).execute()
+            self.entitlements.invalidate(user_id)
             
             # 如果有激活码，也更新激活码表中的状态
             if activation_code:
@@ -1,6 +1,8 @@
 import sys
+import multiprocessing
 import os
 import time
+import re
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
                              QHeaderView, QFileDialog, QGroupBox, QCheckBox, QDialog, QMessageBox, QFrame, QStatusBar,
@@ -8,11 +10,14 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject
 from PyQt6.QtGui import QPixmap, QIcon, QFont, QImage
 from utils import get_wechat_login
+from utils.login_state import get_login_manager, STATE_VALIDATING, STATE_LOGGED_IN
+from utils.session_manager import get_session_manager
 import requests
 from utils.search_thread import SearchThread
 import pandas as pd
 import os.path
 from utils.article_downloader import ArticleDownloadManager, WeChatArticleDownloader
+from utils.metrics import start_metrics_exporter
 
 class SingleArticleDownloader(QObject):
     download_complete = pyqtSignal(str)
@@ -43,98 +48,6 @@ class SingleArticleDownloader(QObject):
         except Exception as e:
             self.download_error.emit(f"下载出错：{str(e)}")
 
-class LoginThread(QThread):
-    """登录线程，避免UI卡顿"""
-    login_success = pyqtSignal(dict)  # 登录成功信号
-    login_failed = pyqtSignal(str)    # 登录失败信号
-    qrcode_ready = pyqtSignal(bytes)  # 二维码准备好信号
-    status_update = pyqtSignal(str)   # 状态更新信号
-
-    def __init__(self):
-        super().__init__()
-        self.wechat_api = get_wechat_login()
-        
-    def run(self):
-        try:
-            # 检查是否已登录
-            session = requests.session()
-            cookie_path = self.wechat_api.cookie_path
-            
-            if os.path.exists(cookie_path):
-                self.status_update.emit("检查登录状态...")
-                # 尝试使用现有cookie登录
-                login_info = self.wechat_api.login()
-                self.login_success.emit(login_info)
-            else:
-                self.status_update.emit("需要扫码登录...")
-                # 获取二维码
-                session = requests.session()
-                session.get('https://mp.weixin.qq.com/', headers=self.wechat_api.headers)
-                session.post(
-                    'https://mp.weixin.qq.com/cgi-bin/bizlogin?action=startlogin',
-                    data='userlang=zh_CN&redirect_url=&login_type=3&sessionid={}&token=&lang=zh_CN&f=json&ajax=1'.format(
-                        int(time.time() * 1000)
-                    ), 
-                    headers=self.wechat_api.headers
-                )
-                
-                # 获取登录二维码
-                login_url = session.get(
-                    'https://mp.weixin.qq.com/cgi-bin/scanloginqrcode?action=getqrcode&random={}'.format(
-                        int(time.time() * 1000)
-                    )
-                )
-                
-                # 发送二维码信号
-                self.qrcode_ready.emit(login_url.content)
-                
-                # 轮询登录状态
-                date_url = 'https://mp.weixin.qq.com/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1'
-                while True:
-                    date = session.get(date_url).json()
-                    if date['status'] == 0:
-                        self.status_update.emit('二维码未失效，请扫码！')
-                    elif date['status'] == 6:
-                        self.status_update.emit('已扫码，请确认！')
-                    elif date['status'] == 1:
-                        self.status_update.emit('已确认，登录成功！')
-                        url = session.post(
-                            'https://mp.weixin.qq.com/cgi-bin/bizlogin?action=login',
-                            data='userlang=zh_CN&redirect_url=&cookie_forbidden=0&cookie_cleaned=1&plugin_used=0&login_type=3&token=&lang=zh_CN&f=json&ajax=1',
-                            headers=self.wechat_api.headers
-                        ).json()
-                        
-                        # 解析token
-                        from urllib.parse import urlparse, parse_qs
-                        token = parse_qs(urlparse(url['redirect_url']).query).get('token', [None])[0]
-                        session.get('https://mp.weixin.qq.com{}'.format(url['redirect_url']), headers=self.wechat_api.headers)
-                        
-                        # 保存cookies和token信息
-                        cookie = '; '.join([f"{name}={value}" for name, value in session.cookies.items()])
-                        
-                        # 确保目录存在
-                        os.makedirs(os.path.dirname(self.wechat_api.cookie_path), exist_ok=True)
-                        import pickle
-                        with open(self.wechat_api.cookie_path, 'wb') as f:
-                            pickle.dump(session.cookies, f)
-                            
-                        login_info = {'token': token, 'cookie': cookie}
-                        
-                        # 确保目录存在
-                        os.makedirs(os.path.dirname(self.wechat_api.cookie_json_path), exist_ok=True)
-                        import json
-                        with open(self.wechat_api.cookie_json_path, 'w') as f:
-                            json.dump(login_info, f, ensure_ascii=False)
-                            
-                        self.login_success.emit(login_info)
-                        break
-                        
-                    time.sleep(2)
-                    
-        except Exception as e:
-            self.login_failed.emit(str(e))
-
-
 class LoginDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -171,35 +84,38 @@ class LoginDialog(QDialog):
         
         self.setLayout(layout)
         
-        # 登录线程
-        self.login_thread = None
+        # 登录状态机
+        self.login_manager = get_login_manager()
+        self.login_manager.login_ready.connect(self.on_login_success)
+        self.login_manager.login_failed.connect(self.on_login_failed)
+        self.login_manager.qrcode_ready.connect(self.on_qrcode_ready)
+        self.login_manager.status_update.connect(self.on_status_update)
         
         # 开始登录流程
         self.start_login()
     
     def start_login(self):
-        """开始登录流程"""
-        if self.login_thread and self.login_thread.isRunning():
-            self.login_thread.terminate()
-            self.login_thread.wait()
-            
-        self.login_thread = LoginThread()
-        self.login_thread.login_success.connect(self.on_login_success)
-        self.login_thread.login_failed.connect(self.on_login_failed)
-        self.login_thread.qrcode_ready.connect(self.on_qrcode_ready)
-        self.login_thread.status_update.connect(self.on_status_update)
-        
+        """开始扫码登录，二维码状态和结果通过信号通知"""
         self.status_label.setText("正在登录...")
-        self.login_thread.start()
+        self.login_manager.start_qr_login()
+    
+    def disconnect_login_manager(self):
+        """断开与登录状态机的连接，对话框关闭后不再接收信号"""
+        for signal, slot in ((self.login_manager.login_ready, self.on_login_success),
+                             (self.login_manager.login_failed, self.on_login_failed),
+                             (self.login_manager.qrcode_ready, self.on_qrcode_ready),
+                             (self.login_manager.status_update, self.on_status_update)):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
     
     def on_login_success(self, login_info):
         """登录成功回调"""
         self.status_label.setText("登录成功！")
+        self.disconnect_login_manager()
         
-        # 保存登录信息以便在主窗口使用
-        if hasattr(self.parent(), 'login_info'):
-            self.parent().login_info = login_info
-            
+        # 主窗口通过 login_ready 信号保存登录信息
         self.accept()  # 关闭对话框并返回接受结果
     
     def on_login_failed(self, error_msg):
@@ -221,12 +137,20 @@ class LoginDialog(QDialog):
         """状态更新回调"""
         self.status_label.setText(status)
         
+    def stop_login(self):
+        """取消扫码登录，轮询线程在当前等待结束后退出"""
+        self.disconnect_login_manager()
+        if not self.login_manager.is_ready():
+            self.login_manager.cancel_qr_login()
+    
+    def reject(self):
+        """按 Esc 关闭对话框时同样取消扫码登录"""
+        self.stop_login()
+        super().reject()
+        
     def closeEvent(self, event):
         """重写关闭事件处理"""
-        # 终止登录线程
-        if self.login_thread and self.login_thread.isRunning():
-            self.login_thread.terminate()
-            self.login_thread.wait()
+        self.stop_login()
         
         # 隐藏对话框而不是退出应用
         self.hide()
@@ -361,6 +285,16 @@ class WechatCollectorUI(QMainWindow):
         self.is_logged_in = False
         self.login_info = None
         
+        # 公众号登录状态机，登录就绪后启用功能
+        self.login_manager = get_login_manager()
+        self.login_manager.state_changed.connect(self.on_wechat_login_state_changed)
+        self.login_manager.login_ready.connect(self.on_wechat_login_ready)
+        self.login_manager.login_required.connect(self.on_wechat_login_required)
+        
+        # 会话保活，登录失效时暂停采集并提示重新登录
+        self.session_manager = get_session_manager()
+        self.session_manager.session_expired.connect(self.on_wechat_session_expired)
+        
         # 搜索线程
         self.search_thread = None
         self.searching = False
@@ -1006,33 +940,61 @@ class WechatCollectorUI(QMainWindow):
         parent_layout.addWidget(control_group)
     
     def check_login_status(self):
-        """检查登录状态，如果未登录则显示登录对话框"""
-        # 获取微信登录API实例
-        wechat_api = get_wechat_login()
+        """检查登录状态，在后台验证本地cookies，不阻塞界面
         
-        # 检查cookie文件是否存在
-        if os.path.exists(wechat_api.cookie_path):
-            try:
-                # 尝试使用现有cookie登录
-                login_info = wechat_api.login()
-                self.is_logged_in = True
-                self.login_info = login_info  # 保存登录信息
-                self.login_status_label.setText("已登录")
-                self.login_button.setText("注销")
-                self.enable_all_features()
-                
-                # 获取并显示公众号信息
-                self.get_account_info()
-            except Exception as e:
-                self.is_logged_in = False
-                self.login_info = None
-                self.disable_all_features()
-                self.show_login_dialog()
-        else:
-            self.is_logged_in = False
-            self.login_info = None
+        验证通过时由 on_wechat_login_ready 启用功能，
+        本地没有有效登录时由 on_wechat_login_required 显示登录对话框。
+        """
+        if self.login_manager.is_ready():
+            self.on_wechat_login_ready(self.login_manager.login_info)
+            return
+        
+        self.is_logged_in = False
+        self.login_info = None
+        self.disable_all_features()
+        self.login_manager.validate()
+    
+    def on_wechat_login_state_changed(self, state):
+        """登录状态变化时更新状态标签"""
+        if state == STATE_VALIDATING:
+            self.login_status_label.setText("验证中...")
+            self.statusBar.showMessage("正在验证登录状态...")
+        elif state != STATE_LOGGED_IN and not self.is_logged_in:
+            self.login_status_label.setText("未登录")
+    
+    def on_wechat_login_ready(self, login_info):
+        """公众号登录就绪（本地cookies验证通过或扫码登录成功）"""
+        self.is_logged_in = True
+        self.login_info = login_info  # 保存登录信息
+        self.login_status_label.setText("已登录")
+        self.login_button.setText("注销")
+        self.statusBar.showMessage("公众号已登录", 3000)
+        self.enable_all_features()
+        
+        # 开始保活，恢复因登录失效暂停的采集
+        self.session_manager.set_login(login_info)
+        
+        # 获取并显示公众号信息
+        self.get_account_info()
+    
+    def on_wechat_login_required(self):
+        """本地没有有效的登录信息，显示扫码登录对话框"""
+        self.statusBar.showMessage("请扫码登录公众号")
+        self.show_login_dialog()
+    
+    def on_wechat_session_expired(self):
+        """登录在使用中失效（接口返回登录失效或保活检查失败），重新扫码登录"""
+        self.is_logged_in = False
+        self.login_info = None
+        self.login_manager.logout()
+        self.login_status_label.setText("登录已失效")
+        self.login_button.setText("登录")
+        
+        # 搜索线程在等待重新登录，保留停止按钮可用
+        if not self.searching:
             self.disable_all_features()
-            self.show_login_dialog()
+        self.statusBar.showMessage("公众号登录已失效，采集已暂停，请重新扫码登录")
+        self.show_login_dialog()
     
     def disable_all_features(self):
         """禁用所有功能"""
@@ -1084,16 +1046,9 @@ class WechatCollectorUI(QMainWindow):
     
     def show_login_dialog(self):
         """显示登录对话框"""
+        # 登录成功后由 on_wechat_login_ready 更新界面
         login_dialog = LoginDialog(self)
-        if login_dialog.exec() == QDialog.DialogCode.Accepted:
-            # 登录成功
-            self.is_logged_in = True
-            self.login_status_label.setText("已登录")
-            self.login_button.setText("注销")
-            self.enable_all_features()
-            
-            # 获取并显示公众号信息
-            self.get_account_info()
+        login_dialog.exec()
 
     
     def handle_login(self):
@@ -1107,12 +1062,8 @@ class WechatCollectorUI(QMainWindow):
             
             if reply == QMessageBox.StandardButton.Yes:
                 # 执行注销操作，删除cookie
-                wechat_api = get_wechat_login()
-                # 删除cookie文件
-                if os.path.exists(wechat_api.cookie_path):
-                    os.remove(wechat_api.cookie_path)
-                if os.path.exists(wechat_api.cookie_json_path):
-                    os.remove(wechat_api.cookie_json_path)
+                self.session_manager.clear()
+                self.login_manager.logout()
                     
                 self.is_logged_in = False
                 self.login_info = None
@@ -1134,19 +1085,14 @@ class WechatCollectorUI(QMainWindow):
             # 未登录状态，执行登录
             self.show_login_dialog()
             
-            # 登录成功后获取公众号信息
-            if self.is_logged_in:
-                self.get_account_info()
-            
     def get_account_info(self):
         """获取公众号信息（名称和头像）"""
         try:
-            # 获取登录信息
+            # 使用登录状态机提供的登录信息，不在界面线程中重新登录
             wechat_api = get_wechat_login()
-            login_info = wechat_api.login()
-            
-            # 保存登录信息供搜索使用
-            self.login_info = login_info
+            login_info = self.login_info
+            if not login_info:
+                return False
             
             # 设置请求头
             headers = {
@@ -1312,6 +1258,8 @@ class WechatCollectorUI(QMainWindow):
         self.search_thread.search_failed.connect(self.on_search_failed)
         self.search_thread.search_progress.connect(self.on_search_progress)
         self.search_thread.search_complete.connect(self.on_search_complete)
+        self.search_thread.search_paused.connect(self.on_search_paused)
+        self.search_thread.search_resumed.connect(self.on_search_resumed)
         self.search_thread.start()
     
     def stop_search(self):
@@ -1364,6 +1312,14 @@ class WechatCollectorUI(QMainWindow):
         self.searching = False
         self.statusBar.showMessage(f"搜索失败: {error_msg}")
     
+    def on_search_paused(self, message):
+        """登录失效，搜索暂停"""
+        self.statusBar.showMessage(message)
+    
+    def on_search_resumed(self):
+        """重新登录后继续搜索"""
+        self.statusBar.showMessage("已重新登录，继续搜索...")
+    
     def on_search_progress(self, current, total):
         """搜索进度回调"""
         self.statusBar.showMessage(f"已获取 {current}/{total} 篇文章")
@@ -1494,7 +1450,8 @@ class WechatCollectorUI(QMainWindow):
             if checkbox and checkbox.isChecked():
                 article_data = {
                     'title': self.article_table.item(row, 1).text(),
-                    'link': self.article_table.item(row, 4).text()
+                    'link': self.article_table.item(row, 4).text(),
+                    'publish_time': self.article_table.item(row, 2).text()
                 }
                 articles_to_download.append(article_data)
         
@@ -1520,15 +1477,19 @@ class WechatCollectorUI(QMainWindow):
                 return
         
         # 初始化下载管理器
-        self.download_manager = ArticleDownloadManager(save_dir=download_path)
+        # 归档输出时每个公众号一个归档文件
+        archive_name = re.sub(r'[\\/*?:"<>|]', '_', self.search_input.text().strip()) or None
+        self.download_manager = ArticleDownloadManager(save_dir=download_path, archive_name=archive_name)
         
         # 连接信号
         self.download_manager.download_status_changed.connect(self.update_download_status)
         self.download_manager.download_completed.connect(self.on_download_completed)
         
-        # 添加文章到下载队列
+        # 添加文章到下载队列，已下载且未更新的文章直接跳过
+        queued_count = 0
         for article in articles_to_download:
-            self.download_manager.add_article(article)
+            if self.download_manager.add_article(article):
+                queued_count += 1
         
         # 更新UI状态
         self.download_selected_btn.setEnabled(False)
@@ -1539,7 +1500,11 @@ class WechatCollectorUI(QMainWindow):
         self.download_manager.start_download()
         
         # 更新状态栏
-        self.statusBar.showMessage(f"开始下载 {len(articles_to_download)} 篇文章...")
+        skipped_count = len(articles_to_download) - queued_count
+        if skipped_count:
+            self.statusBar.showMessage(f"开始下载 {queued_count} 篇文章，跳过已下载的 {skipped_count} 篇...")
+        else:
+            self.statusBar.showMessage(f"开始下载 {queued_count} 篇文章...")
     
     def download_selected_articles(self):
         """下载选中的文章"""
@@ -1578,20 +1543,23 @@ class WechatCollectorUI(QMainWindow):
         # 统计下载结果
         success_count = 0
         fail_count = 0
+        skipped_count = 0
         
         for row in range(self.article_table.rowCount()):
             status_item = self.article_table.item(row, 6)
             if status_item and '成功' in status_item.text():
                 success_count += 1
+            elif status_item and '跳过' in status_item.text():
+                skipped_count += 1
             elif status_item and ('失败' in status_item.text() or '取消' in status_item.text()):
                 fail_count += 1
         
         # 更新状态栏
-        self.statusBar.showMessage(f"下载完成: {success_count}篇成功, {fail_count}篇失败")
+        self.statusBar.showMessage(f"下载完成: {success_count}篇成功, {fail_count}篇失败, {skipped_count}篇已存在")
         
         # 显示完成消息
         QMessageBox.information(self, "下载完成", 
-                               f"文章下载完成\n成功: {success_count}篇\n失败: {fail_count}篇\n\n文件保存在: {self.download_path_input.text()}")
+                               f"文章下载完成\n成功: {success_count}篇\n失败: {fail_count}篇\n已存在跳过: {skipped_count}篇\n\n文件保存在: {self.download_path_input.text()}")
     
     def download_single_article(self):
         """下载单篇文章"""
@@ -1651,6 +1619,8 @@ class WechatCollectorUI(QMainWindow):
     
 # 主程序
 if __name__ == "__main__":
+    # 打包后图片处理进程池需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     # 设置应用程序样式表，实现扁平化设计
@@ -1667,9 +1637,12 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"应用样式失败: {str(e)}")
     
+    # 按环境变量 MP_METRICS_PORT / MP_METRICS_SNAPSHOT 启动性能指标导出
+    start_metrics_exporter()
+    
     window = WechatCollectorUI()
     # 先显示主窗口，再检查登录状态
     window.show()
-    # 检查登录状态并可能显示登录对话框
+    # 在后台验证登录状态，需要扫码时再显示登录对话框
     window.check_login_status()
     sys.exit(app.exec())
\ No newline at end of file
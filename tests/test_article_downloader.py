@@ -0,0 +1,44 @@
+import os
+
+from utils.article_downloader import ArticleDownloadManager, WeChatArticleDownloader
+
+
+URL = 'https://mp.weixin.qq.com/s?__biz=MzA&mid=100&idx=1&sn=abc'
+TITLE = '测试文章'
+
+
+def _downloader(save_dir, monkeypatch, text):
+    downloader = WeChatArticleDownloader(save_dir, lazy_images=True, near_duplicate_policy='off',
+                                         front_matter=False)
+    content_html = f'<div id="js_content"><p>{text}</p></div>'
+    monkeypatch.setattr(downloader, '_fetch_article_html', lambda url: (TITLE, content_html))
+    return downloader
+
+
+def _read(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_updated_article_is_rewritten(tmp_path, monkeypatch):
+    save_dir = str(tmp_path)
+    success, file_path = _downloader(save_dir, monkeypatch, '第一版正文').download_article(URL, '2024-01-01')
+    assert success
+    assert '第一版正文' in _read(file_path)
+
+    # 发布时间不变时跳过
+    manager = ArticleDownloadManager(save_dir, lazy_images=True)
+    assert not manager.add_article({'title': TITLE, 'link': URL, 'publish_time': '2024-01-01'})
+
+    # 发布时间变化时重新下载并覆盖原文件
+    manager = ArticleDownloadManager(save_dir, lazy_images=True)
+    assert manager.add_article({'title': TITLE, 'link': URL, 'publish_time': '2024-02-01'})
+    article = manager.download_queue.get_nowait()
+    assert article['refresh']
+
+    success, new_path = _downloader(save_dir, monkeypatch, '第二版正文').download_article(
+        URL, article['publish_time'], refresh=article['refresh'])
+    assert success
+    assert os.path.abspath(new_path) == os.path.abspath(file_path)
+    assert '第二版正文' in _read(file_path)
+    assert manager.download_index.get(URL)['publish_time'] == '2024-02-01'
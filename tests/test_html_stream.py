@@ -0,0 +1,36 @@
+from utils.html_stream import extract_article_html
+
+
+PAGE = (
+    '<html><head><title>t</title></head><body>'
+    '<h1 class="rich_media_title">标题</h1>'
+    '<div class="rich_media_content" id="js_content">'
+    '<div style="margin: 0px; padding: 0px; max-width: 100%; box-sizing: border-box; '
+    'overflow-wrap: break-word;"><p>inner text</p></div>'
+    '<p>tail text</p>'
+    '</div>'
+    '<div class="after">after</div>'
+    '</body></html>'
+)
+
+
+def _split(text, position):
+    data = text.encode('utf-8')
+    return [data[:position], data[position:]]
+
+
+def test_chunk_boundary_inside_long_div_tag():
+    # 分块边界落在正文内较长的div开始标签中间
+    position = PAGE.encode('utf-8').index(b'box-sizing')
+    title, content_html, _ = extract_article_html(_split(PAGE, position))
+
+    assert title == '标题'
+    assert content_html.endswith('<p>tail text</p></div>')
+    assert 'after' not in content_html
+
+
+def test_every_chunk_boundary():
+    data = PAGE.encode('utf-8')
+    expected = extract_article_html([data])[1]
+    for position in range(1, len(data)):
+        assert extract_article_html(_split(PAGE, position))[1] == expected
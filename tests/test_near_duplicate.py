@@ -0,0 +1,22 @@
+import os
+
+from utils.near_duplicate import NearDuplicateIndex, simhash
+
+
+TEXT = '公众号文章正文内容，用于计算近似重复指纹。' * 20
+URL = 'https://mp.weixin.qq.com/s?__biz=MzA&mid=100&idx=1&sn=abc'
+
+
+def test_find_skips_the_same_article(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path))
+    fingerprint = simhash(TEXT)
+    markdown_path = os.path.join(str(tmp_path), '标题.md')
+    index.add(fingerprint, markdown_path, URL, '标题')
+
+    # 同一篇文章的另一种链接重新下载时不与自己匹配
+    assert index.find(fingerprint, URL + '&chksm=1&scene=27') is None
+    assert index.find(fingerprint, markdown_path=markdown_path) is None
+
+    match, distance = index.find(fingerprint, 'https://mp.weixin.qq.com/s/other')
+    assert match['markdown'] == '标题.md'
+    assert distance == 0
@@ -0,0 +1,15 @@
+from utils.url_canonical import ArticleDedupeIndex, article_identity, canonicalize_article_url
+
+
+LONG = 'https://mp.weixin.qq.com/s?__biz=MzA&mid=100&idx=1&sn=abc&chksm=x&scene=27'
+
+
+def test_missing_idx_is_first_article():
+    for url in ('https://mp.weixin.qq.com/s?__biz=MzA&mid=100&sn=abc',
+                'https://mp.weixin.qq.com/s?__biz=MzA&mid=100&idx=&sn=abc'):
+        assert article_identity(url) == article_identity(LONG) == 'MzA|100|1|abc'
+        assert canonicalize_article_url(url) == canonicalize_article_url(LONG)
+
+    index = ArticleDedupeIndex([LONG])
+    assert not index.add('http://mp.weixin.qq.com/s?__biz=MzA&amp;mid=100&amp;sn=abc')
+    assert index.add('https://mp.weixin.qq.com/s?__biz=MzA&mid=100&idx=2&sn=abc')
@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QMessageBox, 
                              QStatusBar, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QGroupBox, QFormLayout, QFrame,
@@ -15,6 +16,7 @@ from utils.db_article_downloader import DBArticleDownloadManager
 from models.user_database import UserDatabaseManager
 from models.user_manager import RegisterDialog
 from utils.config_manager import ConfigManager
+from utils.db_executor import get_db_executor
 
 class UserApp(QMainWindow):
     """用户版本的公众号采集助手"""
@@ -70,6 +72,10 @@ class UserApp(QMainWindow):
     
     def auto_show_login(self):
         """自动显示登录界面或尝试自动登录"""
+        # 有有效的本地授权令牌时直接进入，不等待网络，令牌在后台刷新
+        if self.user_center.try_offline_login():
+            return
+        
         # 检查是否配置了自动登录
         login_info = self.config_manager.get_login_info()
         
@@ -525,6 +531,55 @@ class UserCenterPanel(QWidget):
             # 自动登录失败，显示登录对话框
             self.show_login_dialog()
     
+    def try_offline_login(self):
+        """使用本地授权令牌离线登录
+        
+        Returns:
+            bool: 是否已登录
+        """
+        user = self.db_manager.load_offline_user()
+        if not user:
+            return False
+        
+        self.current_user = user
+        self.user_id = user.get('id')
+        self.update_ui_after_login()
+        self.login_status_changed.emit(True, user)
+        self.message_label.setText("已使用本地授权登录，正在后台验证...")
+        
+        self.refresh_entitlement()
+        return True
+    
+    def refresh_entitlement(self):
+        """在后台向服务器申请新的授权令牌，供下次启动离线验证"""
+        if not self.user_id:
+            return
+        get_db_executor().submit(
+            'user_center.entitlement', self.db_manager.refresh_entitlement_token, self.user_id,
+            on_success=lambda result, user_id=self.user_id: self._on_entitlement_refreshed(user_id, result)
+        )
+    
+    def _on_entitlement_refreshed(self, user_id, result):
+        """授权令牌刷新完成（界面线程）"""
+        if not self.current_user or user_id != self.user_id:
+            return
+        offline = self.current_user.get('offline')
+        
+        if result['success']:
+            if offline:
+                self.current_user.update(result['user'])
+                self.message_label.setText("本地授权已更新")
+        elif result['revoked'] and offline:
+            # 服务器已拒绝签发，离线登录失效，需要重新登录
+            self.current_user = None
+            self.reset_ui()
+            self.login_status_changed.emit(False, {})
+            self.message_label.setText("本地授权已失效，请重新登录")
+            QTimer.singleShot(0, self.show_login_dialog)
+        elif offline:
+            # 无法连接服务器，继续使用本地授权
+            self.message_label.setText("无法连接服务器，使用本地授权离线运行")
+    
     def show_login_dialog(self):
         """显示登录对话框"""
         login_dialog = LoginDialog(self)
@@ -543,11 +598,14 @@ class UserCenterPanel(QWidget):
         # 更新UI
         self.update_ui_after_login()
         
+        # 申请授权令牌，下次启动可离线验证
+        self.refresh_entitlement()
+        
         # 发送登录状态变化信号
         self.login_status_changed.emit(True, user_info)
     
     def check_activation_status(self):
-        """检查激活状态和过期时间"""
+        """检查激活状态和过期时间，在后台线程查询，返回后更新界面"""
         if not self.current_user:
             return
             
@@ -555,59 +613,76 @@ class UserCenterPanel(QWidget):
         activation_code = self.current_user.get('activation_code', '')
         if not activation_code:
             return
+        
+        get_db_executor().submit(
+            'user_center.activation_check', self._check_activation_status_task,
+            self.user_id, activation_code,
+            on_success=self._on_activation_checked
+        )
+    
+    def _check_activation_status_task(self, user_id, activation_code):
+        """查询激活信息，已过期时更新激活状态并重新获取用户信息（工作线程）
+        
+        Args:
+            user_id: 用户ID
+            activation_code: 激活码
             
-        result = self.db_manager.get_user_activation_info(self.user_id)
+        Returns:
+            dict: {'user_id': 用户ID, 'expired': 是否已更新为过期, 'user': 最新的用户信息，未变化时为None}
+        """
+        result = {'user_id': user_id, 'expired': False, 'user': None}
+        info = self.db_manager.get_user_activation_info(user_id)
+        if not info['success']:
+            return result
+        
+        data = info['data']
+        activation_status = data.get('activation_status', '')
+        expiry_date = data.get('expiry_date', '')
+        
+        # 只有已激活状态才需要检查是否过期（已过期状态不需要再检查）
+        if activation_status != '已激活' or not expiry_date:
+            return result
         
-        if result['success']:
-            data = result['data']
-            activation_status = data.get('activation_status', '')
-            expiry_date = data.get('expiry_date', '')
+        try:
+            # 将过期时间转换为datetime对象，处理不同格式的日期字符串
+            if 'T' in expiry_date:
+                # 处理带时区的ISO格式
+                if '+' in expiry_date:
+                    expiry_date = expiry_date.split('+')[0]
+                # 处理带毫秒的格式
+                if '.' in expiry_date:
+                    expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%dT%H:%M:%S.%f')
+                else:
+                    expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%dT%H:%M:%S')
+            else:
+                expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%d')
             
-            # 如果已经是过期状态，不需要再检查
-            if activation_status == '已过期':
-                return
+            # 检查是否过期
+            if datetime.now() > expiry_datetime:
+                # 已过期，更新激活状态
+                update_result = self.db_manager.update_activation_status(user_id, activation_code, '已过期')
+                result['expired'] = update_result['success']
                 
-            # 只有已激活状态才需要检查是否过期
-            if activation_status == '已激活' and expiry_date:
-                # 将过期时间转换为datetime对象
-                try:
-                    # 处理不同格式的日期字符串
-                    if 'T' in expiry_date:
-                        # 处理带时区的ISO格式
-                        if '+' in expiry_date:
-                            expiry_date = expiry_date.split('+')[0]
-                        # 处理带毫秒的格式
-                        if '.' in expiry_date:
-                            expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%dT%H:%M:%S.%f')
-                        else:
-                            expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%dT%H:%M:%S')
-                    else:
-                        expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%d')
-                        
-                    # 获取当前时间
-                    current_datetime = datetime.now()
-                    
-                    # 检查是否过期
-                    if current_datetime > expiry_datetime:
-                        # 已过期，更新激活状态
-                        update_result = self.db_manager.update_activation_status(
-                            self.user_id, 
-                            activation_code, 
-                            '已过期'
-                        )
-                        
-                        if update_result['success']:
-                            # 在状态栏显示提示
-                            self.parent().status_bar.showMessage("您的激活码已过期，请重新激活", 5000)
-                        
-                        # 重新获取用户信息
-                        updated_user = self.db_manager.get_user_by_id(self.user_id)
-                        if updated_user['success']:
-                            self.current_user = updated_user['user']
-                            # 更新UI
-                            self.update_ui_after_login()
-                except Exception as e:
-                    print(f"检查激活状态时发生错误: {str(e)}")
+                # 重新获取用户信息
+                updated_user = self.db_manager.get_user_by_id(user_id)
+                if updated_user['success']:
+                    result['user'] = updated_user['user']
+        except Exception as e:
+            print(f"检查激活状态时发生错误: {str(e)}")
+        return result
+    
+    def _on_activation_checked(self, result):
+        """激活状态检查完成（界面线程）"""
+        # 检查期间已退出或切换账号
+        if not self.current_user or result['user_id'] != self.user_id:
+            return
+        if result['expired']:
+            # 在状态栏显示提示
+            self.parent().status_bar.showMessage("您的激活码已过期，请重新激活", 5000)
+        if result['user']:
+            self.current_user = result['user']
+            # 更新UI
+            self.update_ui_after_login()
     
     def update_ui_after_login(self):
         """登录后更新UI"""
@@ -670,17 +745,28 @@ class UserCenterPanel(QWidget):
             
             if reply == QMessageBox.StandardButton.Yes:
                 self.current_user = None
+                self.db_manager.clear_entitlement_token()
+                get_db_executor().cancel('user_center.entitlement')
                 self.reset_ui()
                 self.login_status_changed.emit(False, {})
                 self.message_label.setText("已退出登录")
     
     def get_activation_info(self):
-        """获取用户激活信息"""
+        """获取用户激活信息，在后台线程查询，返回后更新界面"""
         if not self.user_id:
             return
         
-        # 获取激活信息
-        result = self.db_manager.get_user_activation_info(self.user_id)
+        user_id = self.user_id
+        get_db_executor().submit(
+            'user_center.activation_info', self.db_manager.get_user_activation_info, user_id,
+            on_success=lambda result: self._show_activation_info(user_id, result)
+        )
+    
+    def _show_activation_info(self, user_id, result):
+        """显示激活信息（界面线程）"""
+        # 查询期间已退出或切换账号
+        if user_id != self.user_id:
+            return
         
         if result['success']:
             data = result['data']
@@ -706,33 +792,7 @@ class UserCenterPanel(QWidget):
     
     def update_activation_info(self):
         """获取激活信息"""
-        if not self.user_id:
-            return
-        
-        # 获取激活信息
-        result = self.db_manager.get_user_activation_info(self.user_id)
-        
-        if result['success']:
-            data = result['data']
-            self.activation_code_label.setText(data.get('code', '未激活'))
-            self.activation_status_label.setText(data.get('activation_status', '未激活'))
-            
-            activation_time = data.get('activation_time', '')
-            if activation_time:
-                self.activation_time_label.setText(activation_time.split('T')[0])
-            else:
-                self.activation_time_label.setText('未激活')
-            
-            expiry_date = data.get('expiry_date', '')
-            if expiry_date:
-                self.expiry_date_label.setText(expiry_date.split('T')[0])
-            else:
-                self.expiry_date_label.setText('未激活')
-        else:
-            self.activation_code_label.setText('未激活')
-            self.activation_status_label.setText('未激活')
-            self.activation_time_label.setText('未激活')
-            self.expiry_date_label.setText('未激活')
+        self.get_activation_info()
     
     def activate_account(self):
         """激活账号"""
@@ -809,6 +869,9 @@ class UserCenterPanel(QWidget):
             if updated_user['success']:
                 self.current_user = updated_user['user']
                 self.login_status_changed.emit(True, self.current_user)
+            
+            # 激活后重新申请授权令牌
+            self.refresh_entitlement()
                 
             # 启用公众号采集页面的功能
             try:
@@ -1164,6 +1227,8 @@ class LoginDialog(QDialog):
 
 
 if __name__ == "__main__":
+    # 打包后图片处理进程池需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = UserApp()
     window.show()
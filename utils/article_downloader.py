@@ -1,6 +1,7 @@
 import os
 import re
 import time
+import itertools
 import threading
 import requests
 import logging
@@ -8,19 +9,84 @@ from queue import Queue, Empty
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from PyQt6.QtCore import QObject, pyqtSignal
+from utils.metrics import (get_metrics, STAGE_ARTICLE_FETCH, STAGE_PARSE, STAGE_CONVERT,
+                           STAGE_IMAGE_FETCH, STAGE_IMAGE_PROCESS, STAGE_DISK_WRITE)
+from utils.image_pipeline import (get_image_pipeline, sniff_image_format, format_from_url, get_extension,
+                                  FORMAT_EXTENSIONS)
+from utils.image_fetch_policy import get_image_fetch_policy
+from utils.image_index import ImageIndex
+from utils.image_backfill import ImageBackfillManager, PendingImageManifest, is_lazy_images_enabled
+from utils.atomic_writer import get_output_writer, get_output_format
+from utils.download_index import get_download_index, markdown_filename
+from utils.url_canonical import ArticleDedupeIndex
+from utils.html_stream import extract_article_html, ArticleHTMLExtractor
+from utils.near_duplicate import (get_near_duplicate_index, get_near_duplicate_policy, simhash,
+                                   POLICY_OFF, POLICY_FLAG, POLICY_LINK, POLICY_SKIP)
+from utils.image_layout import get_image_layout, sharded_basename, LAYOUT_SHARDED
+
+def is_front_matter_enabled():
+    """读取 config.json 中的 MARKDOWN_FRONT_MATTER 配置，默认写入YAML元数据
+    
+    Returns:
+        bool: 是否写入
+    """
+    try:
+        from utils.config_manager import ConfigManager
+        return bool(ConfigManager().get('MARKDOWN_FRONT_MATTER', True))
+    except Exception as e:
+        print(f"读取Markdown元数据配置失败: {str(e)}")
+        return True
+
 
 class WeChatArticleDownloader:
     """微信文章下载器，负责下载单篇文章"""
     
-    def __init__(self, save_dir="."):
+    def __init__(self, save_dir=".", image_pipeline=None, image_fetch_policy=None, lazy_images=None, writer=None,
+                 image_layout=None, near_duplicate_policy=None, front_matter=None):
         self.save_dir = save_dir
         self.images_dir = os.path.join(save_dir, "images")
         os.makedirs(self.images_dir, exist_ok=True)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
-        # 当前文章标题
+        # 当前文章标题和页面脚本中的元数据
         self.current_article_title = None
+        self.current_metadata = None
+        # Markdown文件头部是否写入YAML元数据
+        self.front_matter = is_front_matter_enabled() if front_matter is None else front_matter
+        # 输出写入器（目录或单文件归档），记录已完整写入的文件，重新运行时跳过
+        self.writer = writer or get_output_writer(save_dir)
+        # 本地已有完整Markdown时记录其路径，不再重复下载
+        self.existing_file_path = None
+        # 已下载文章索引，用于确认同名Markdown是否属于当前文章
+        self.download_index = get_download_index(save_dir)
+        # 当前文章的Markdown保存路径，同名文件属于其他文章时附加文章标识
+        self.markdown_path = None
+        # 性能指标
+        self.metrics = get_metrics()
+        # 图片后处理流水线（转码、缩放），未配置时不处理
+        self.image_pipeline = image_pipeline or get_image_pipeline()
+        # 图片获取策略（原图、限制宽度、WebP）
+        self.image_fetch_policy = image_fetch_policy or get_image_fetch_policy()
+        # 图片索引，记录每张图片的来源和获取方式
+        self.image_index = ImageIndex(self.images_dir)
+        # 图片目录布局：平铺（标题+序号命名）或按哈希分片
+        self.image_layout = image_layout or get_image_layout()
+        # 已下载图片的信息，文件名 -> {'format', 'bytes', 'future'}
+        self._downloaded_images = {}
+        # 延迟下载图片：先保存带远程图片地址的Markdown，图片由后台补全
+        self.lazy_images = is_lazy_images_enabled() if lazy_images is None else lazy_images
+        self.pending_manifest = PendingImageManifest(self.images_dir)
+        # 当前文章中待后台下载的图片
+        self._pending_images = []
+        # 近似重复文章检测（跳过、链接或标记转载的文章）
+        self.near_duplicate_policy = near_duplicate_policy or get_near_duplicate_policy()
+        self.near_duplicates = None
+        if self.near_duplicate_policy != POLICY_OFF:
+            self.near_duplicates = get_near_duplicate_index(save_dir)
+        # 当前文章的指纹和匹配到的已有文章 (索引记录, 汉明距离)
+        self._fingerprint = None
+        self.duplicate_match = None
         # 设置日志
         self._setup_logger()
         
@@ -44,23 +110,55 @@ class WeChatArticleDownloader:
         # 添加处理器到日志记录器
         self.logger.addHandler(console_handler)
         
-    def download_article(self, url):
+    def download_article(self, url, publish_time=None, refresh=False):
         """下载文章并保存为Markdown格式
         
+        保存成功后记入下载索引，再次下载同一篇文章时能识别出已保存的文件。
+        
         Args:
             url: 文章链接
+            publish_time: 发布时间，记入下载索引
+            refresh: 文章已更新，覆盖已完整保存的Markdown
             
         Returns:
             tuple: (是否成功, 文件路径)
         """
         try:
             # 获取文章内容
-            title, content = self.get_article_content(url)
+            title, content = self.get_article_content(url, refresh)
+            
+            if title and self.existing_file_path:
+                # 上次运行已完整保存
+                if not self.download_index.is_recorded(url, self.existing_file_path):
+                    self.download_index.record(url, title, self.existing_file_path, publish_time)
+                return True, self.existing_file_path
+            
+            if title and content is None and self.duplicate_match:
+                # 与已保存文章近似重复
+                success, file_path = self._save_duplicate(url, title)
+                if success and self.near_duplicate_policy == POLICY_LINK:
+                    self.download_index.record(url, title, file_path, publish_time)
+                return success, file_path
             
             if title and content:
                 # 保存为Markdown文件
-                file_path = self.save_to_markdown(title, content)
+                file_path = self.save_to_markdown(title, content, self.markdown_path)
                 if file_path:
+                    # 延迟模式下记录待下载图片，由后台补全
+                    if self._pending_images:
+                        for record in self._pending_images:
+                            record['markdown'] = file_path
+                        self.pending_manifest.append(self._pending_images)
+                        self._pending_images = []
+                    # 本篇文章的图片和Markdown一起落盘
+                    self.writer.commit()
+                    # 落盘成功后才记录指纹，写入失败的文章不会成为其他文章的重复对象
+                    if self.near_duplicates is not None:
+                        if self.duplicate_match and self.near_duplicate_policy == POLICY_FLAG:
+                            match, distance = self.duplicate_match
+                            self.near_duplicates.record_duplicate(file_path, url, title, match, distance, POLICY_FLAG)
+                        self.near_duplicates.add(self._fingerprint, file_path, url, title)
+                    self.download_index.record(url, title, file_path, publish_time)
                     return True, file_path
             
             return False, None
@@ -69,83 +167,127 @@ class WeChatArticleDownloader:
             self.logger.error(f"下载文章失败: {str(e)}")
             return False, None
     
-    def get_article_content(self, url):
+    def get_article_content(self, url, refresh=False):
         """获取文章内容并下载图片
         
         Args:
             url (str): 微信公众号文章URL
+            refresh (bool): 已完整保存时仍重新下载
             
         Returns:
             tuple: (标题, Markdown内容) 或 (None, None)
         """
         try:
-            # 获取页面内容
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.encoding = 'utf-8'
+            # 流式读取页面，只保留标题和正文区域
+            title, content_html = self._fetch_article_html(url)
+            if content_html is None and title is None:
+                return None, None
             
-            if response.status_code != 200:
-                self.logger.error(f"请求失败，状态码: {response.status_code}")
+            if not title:
+                self.logger.error("无法找到文章标题")
                 return None, None
-                
-            # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 获取文章标题
-            title_element = soup.find('h1', class_='rich_media_title')
-            if not title_element:
-                title_element = soup.find('h1', id='activity-name')
-            
-            if not title_element:
-                # 尝试从其他地方获取标题
-                title_match = re.search(r'var msg_title = "([^"]+)"', response.text)
-                if title_match:
-                    title = title_match.group(1)
-                else:
-                    self.logger.error("无法找到文章标题")
-                    return None, None
-            else:
-                title = title_element.get_text().strip()
             
             self.current_article_title = title
-            self.logger.info(f"[下载中]：{title}")
             
-            # 获取文章内容 - 尝试多种可能的选择器
-            content_element = soup.find('div', id='js_content')
-            if not content_element:
-                content_element = soup.find('div', class_='rich_media_content')
+            # 已完整保存过的文章直接跳过
+            self.existing_file_path = None
+            markdown_path = self._get_markdown_path(title)
+            if self.writer.is_complete(markdown_path) and not self.download_index.is_recorded(url, markdown_path):
+                # 同名文件属于其他文章，改用带文章标识的文件名
+                markdown_path = self._get_markdown_path(title, url)
+                self.logger.info(f"[同名]：{title} 已被其他文章使用，保存为 {markdown_path}")
+            self.markdown_path = markdown_path
+            if self.writer.is_complete(markdown_path) and not refresh:
+                self.existing_file_path = markdown_path
+                self.logger.info(f"[已存在]：{markdown_path}")
+                return title, None
             
-            if not content_element:
-                content_element = soup.find('div', class_='js_underline_content')
-                
-            if not content_element:
-                content_element = soup.find('div', class_=lambda c: c and ('rich_media_content' in c or 'js_underline_content' in c))
-                
-            if not content_element:
+            self.logger.info(f"[下载中]：{title}")
+            
+            if not content_html:
                 self.logger.error("无法找到文章内容区域")
                 return None, None
             
+            # 只解析正文区域
+            with self.metrics.timer(STAGE_PARSE):
+                soup = BeautifulSoup(content_html, 'html.parser')
+            content_html = None
+            content_element = soup.find('div')
+            
+            # 近似重复检测：在下载图片前按正文计算指纹，跳过或链接时不再下载图片
+            self._fingerprint = None
+            self.duplicate_match = None
+            if self.near_duplicates is not None:
+                self._fingerprint = simhash(content_element.get_text())
+                self.duplicate_match = self.near_duplicates.find(self._fingerprint, url, markdown_path)
+                if self.duplicate_match and self.near_duplicate_policy in (POLICY_SKIP, POLICY_LINK):
+                    self.metrics.inc('articles_near_duplicate')
+                    self.logger.info(f"[重复]：{title} 与 {self.duplicate_match[0]['markdown']} 内容重复")
+                    return title, None
+            
             # 预处理内容元素，保持原始结构
             self._preprocess_content(content_element)
             
             # 处理图片
             img_index = 0
+            processing_images = []
+            self._pending_images = []
             for img in content_element.find_all('img'):
                 # 获取图片URL
                 img_url = img.get('data-src') or img.get('src')
                 if img_url:
                     img_url = urljoin(url, img_url)
+                    # 按获取策略改写图片地址
+                    fetch_url, variant = self.image_fetch_policy.rewrite(img_url)
+                    
+                    if self.lazy_images:
+                        # 延迟模式：保留远程地址，记入待下载清单
+                        img['src'] = fetch_url
+                        if 'data-src' in img.attrs:
+                            del img['data-src']
+                        self._pending_images.append({
+                            'url': fetch_url,
+                            'source_url': img_url,
+                            'variant': variant,
+                            'index': img_index,
+                            'article': title
+                        })
+                        img_index += 1
+                        continue
                     
                     # 下载图片，使用序号
-                    local_filename = self.download_image(img_url, img_index)
+                    local_filename = self.download_image(fetch_url, img_index)
                     if local_filename:
                         # 更新图片链接为本地路径
                         img['src'] = f'./images/{local_filename}'
                         if 'data-src' in img.attrs:
                             del img['data-src']
                         img_index += 1
+                        info = self._downloaded_images.pop(local_filename, {})
+                        if info.get('skipped'):
+                            continue
+                        record = {
+                            'file': local_filename,
+                            'source_url': img_url,
+                            'fetch_url': fetch_url,
+                            'variant': variant,
+                            'fmt': info.get('format'),
+                            'size': info.get('bytes', 0),
+                            'article_title': title
+                        }
+                        if info.get('future'):
+                            processing_images.append((img, info['future'], record))
+                        else:
+                            self.image_index.append(**record)
+            
+            # 等待图片后处理完成，更新为处理后的文件名
+            self._apply_processed_images(processing_images)
             
             # 转换为Markdown格式
-            markdown_content = self._convert_to_markdown(title, content_element)
+            with self.metrics.timer(STAGE_CONVERT):
+                markdown_content = self._convert_to_markdown(title, content_element)
+            if self.front_matter and self.current_metadata:
+                markdown_content = self.current_metadata.to_front_matter() + markdown_content
             
             return title, markdown_content
             
@@ -153,6 +295,146 @@ class WeChatArticleDownloader:
             self.logger.error(f"获取文章内容失败: {str(e)}")
             return None, None
     
+    def _fetch_article_html(self, url):
+        """流式获取文章页，提取标题、正文区域和元数据后提前关闭连接
+        
+        页面中内联的脚本和样式不会整体保留在内存中，占用与正文大小成正比。
+        元数据（公众号名称、发布时间等）保存在 current_metadata 中。
+        
+        Args:
+            url: 文章链接
+            
+        Returns:
+            tuple: (标题, 正文HTML)，请求失败时为 (None, None)
+        """
+        self.current_metadata = None
+        with self.metrics.timer(STAGE_ARTICLE_FETCH):
+            response = requests.get(url, headers=self.headers, timeout=30, stream=True)
+            try:
+                self.metrics.observe_response(response)
+                if response.status_code != 200:
+                    self.metrics.inc_error(STAGE_ARTICLE_FETCH, response.status_code)
+                    self.logger.error(f"请求失败，状态码: {response.status_code}")
+                    return None, None
+                extractor = ArticleHTMLExtractor(url=url)
+                title, content_html, size = extract_article_html(response.iter_content(chunk_size=16384),
+                                                                 extractor=extractor)
+                self.current_metadata = extractor.metadata
+            finally:
+                # 提取完成后不再读取剩余页面
+                response.close()
+        self.metrics.add_bytes(STAGE_ARTICLE_FETCH, size)
+        return title, content_html
+    
+    def download_backfill_image(self, record):
+        """下载延迟模式下跳过的图片，供后台补全使用
+        
+        Args:
+            record: 待下载图片清单中的记录
+            
+        Returns:
+            str or None: 最终保存的图片文件名，下载失败则返回None
+        """
+        self.current_article_title = record.get('article')
+        local_filename = self.download_image(record['url'], record.get('index'))
+        if not local_filename:
+            return None
+        
+        info = self._downloaded_images.pop(local_filename, {})
+        if info.get('skipped'):
+            return local_filename
+        index_record = {
+            'file': local_filename,
+            'source_url': record.get('source_url', record['url']),
+            'fetch_url': record['url'],
+            'variant': record.get('variant', 'original'),
+            'fmt': info.get('format'),
+            'size': info.get('bytes', 0),
+            'article_title': record.get('article')
+        }
+        if info.get('future'):
+            # 借用一个临时元素接收处理后的链接
+            holder = {'src': f'./images/{local_filename}'}
+            self._apply_processed_images([(holder, info['future'], index_record)])
+            return holder['src'][len('./images/'):]
+        self.image_index.append(**index_record)
+        return local_filename
+    
+    def _save_duplicate(self, url, title):
+        """按处理方式保存近似重复的文章
+        
+        Args:
+            url: 文章链接
+            title: 文章标题
+            
+        Returns:
+            tuple: (是否成功, 文件路径)，跳过时返回已有文章的路径
+        """
+        match, distance = self.duplicate_match
+        original_path = os.path.join(self.near_duplicates.root_dir, match['markdown'])
+        if self.near_duplicate_policy == POLICY_SKIP:
+            self.near_duplicates.record_duplicate(None, url, title, match, distance, POLICY_SKIP)
+            return True, original_path
+        
+        # 只保存指向已有文章的Markdown
+        original_title = match.get('title') or os.path.splitext(os.path.basename(match['markdown']))[0]
+        content = (f"# {title}\n\n"
+                   f"> 本文与已保存的文章《{original_title}》内容重复，未重复下载。\n>\n"
+                   f"> 已有文章：[{original_title}](<./{match['markdown']}>)\n>\n"
+                   f"> 原文链接：{url}\n")
+        file_path = self.save_to_markdown(title, content, self.markdown_path)
+        if not file_path:
+            return False, None
+        self.writer.commit()
+        self.near_duplicates.record_duplicate(file_path, url, title, match, distance, POLICY_LINK)
+        return True, file_path
+    
+    def _is_renderable_image(self, img_src):
+        """判断图片链接是否输出到Markdown
+        
+        本地图片始终输出；延迟模式下远程图片也输出，由后台补全后改写为本地路径。
+        
+        Args:
+            img_src: 图片链接
+            
+        Returns:
+            bool: 是否输出
+        """
+        if not img_src:
+            return False
+        if img_src.startswith('./images/'):
+            return True
+        return self.lazy_images and img_src.startswith(('http://', 'https://'))
+    
+    def _apply_processed_images(self, processing_images):
+        """等待图片后处理任务完成并更新图片链接
+        
+        Args:
+            processing_images: [(img元素, Future, 图片索引记录)] 列表
+        """
+        for img, future, record in processing_images:
+            try:
+                file_path, elapsed = future.result()
+                self.metrics.observe(STAGE_IMAGE_PROCESS, elapsed)
+                # 保留分片子目录，只替换处理后的文件名
+                filename = '/'.join(filter(None, [os.path.dirname(record['file']), os.path.basename(file_path)]))
+                # 处理后的文件由子进程写入，补记到写入清单（归档输出时收入归档）
+                entry = self.writer.register(file_path, os.path.join(self.images_dir, filename))
+                img['src'] = f'./images/{filename}'
+                if filename != record['file']:
+                    record['file'] = filename
+                    record['fmt'] = os.path.splitext(filename)[1].lstrip('.')
+                record['size'] = entry['size']
+            except Exception as e:
+                # 处理失败时保留原图
+                self.metrics.inc_error(STAGE_IMAGE_PROCESS, type(e).__name__)
+                self.logger.error(f"处理图片失败 {img.get('src')}: {str(e)}")
+                original_path = os.path.join(self.images_dir, record['file'])
+                staging_path = self.writer.staging_path(original_path)
+                if staging_path != original_path and os.path.exists(staging_path):
+                    self.writer.register(staging_path, original_path)
+            self.image_index.append(**record)
+    
     def _preprocess_content(self, content_element):
         """预处理内容元素，保持原始结构
         
@@ -204,7 +486,7 @@ class WeChatArticleDownloader:
             # 处理图片节点
             if element.name == 'img':
                 img_src = element.get('src')
-                if img_src and img_src.startswith('./images/'):
+                if self._is_renderable_image(img_src):
                     markdown_content += f'![图片]({img_src})\n\n'
                 continue
             
@@ -216,7 +498,7 @@ class WeChatArticleDownloader:
                     # 段落中只有图片，单独处理每个图片
                     for img in images:
                         img_src = img.get('src')
-                        if img_src and img_src.startswith('./images/'):
+                        if self._is_renderable_image(img_src):
                             markdown_content += f'![图片]({img_src})\n\n'
                 else:
                     # 处理段落中的文本和内联元素
@@ -286,7 +568,7 @@ class WeChatArticleDownloader:
             elif child.name == 'img':
                 # 图片
                 img_src = child.get('src')
-                if img_src and img_src.startswith('./images/'):
+                if self._is_renderable_image(img_src):
                     result += f'![图片]({img_src})'
             elif child.name in ['strong', 'b']:
                 # 加粗
@@ -332,7 +614,7 @@ class WeChatArticleDownloader:
             has_img = False
             for img in li.find_all('img'):
                 img_src = img.get('src')
-                if img_src and img_src.startswith('./images/'):
+                if self._is_renderable_image(img_src):
                     # 计算嵌套层级
                     nesting_level = self._count_parents(list_element, ['ul', 'ol'])
                     result += f'{"    " * (nesting_level - 1)}![图片]({img_src})\n'
@@ -392,7 +674,7 @@ class WeChatArticleDownloader:
         # 处理引用中的图片
         for img in blockquote.find_all('img'):
             img_src = img.get('src')
-            if img_src and img_src.startswith('./images/'):
+            if self._is_renderable_image(img_src):
                 result += f'> ![图片]({img_src})\n>\n'
         
         # 处理引用中的文本
@@ -428,7 +710,7 @@ class WeChatArticleDownloader:
         if len(images) == 1 and len(list(element.stripped_strings)) == 0:
             img = images[0]
             img_src = img.get('src')
-            if img_src and img_src.startswith('./images/'):
+            if self._is_renderable_image(img_src):
                 return f'![图片]({img_src})\n\n'
         
         # 处理子元素
@@ -441,7 +723,7 @@ class WeChatArticleDownloader:
             elif child.name == 'img':
                 # 图片
                 img_src = child.get('src')
-                if img_src and img_src.startswith('./images/'):
+                if self._is_renderable_image(img_src):
                     result += f'![图片]({img_src})\n\n'
             elif child.name == 'p':
                 # 段落
@@ -487,69 +769,139 @@ class WeChatArticleDownloader:
         Returns:
             str or None: 保存的图片文件名，下载失败则返回None
         """
+        # 上次运行已完整下载的图片直接复用
+        existing_filename = self._find_complete_image(img_url, index)
+        if existing_filename:
+            self.metrics.inc('images_skipped')
+            self._downloaded_images[existing_filename] = {'skipped': True}
+            return existing_filename
+        
+        start = time.perf_counter()
         try:
             response = requests.get(img_url, stream=True, headers=self.headers, timeout=30)
+            self.metrics.observe_response(response)
             
             if response.status_code == 200:
-                # 使用文章标题和序号生成文件名
-                if self.current_article_title and index is not None:
-                    # 从文章标题中提取合法的文件名部分
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '_', self.current_article_title)
-                    filename = f'{safe_title}_{index:03d}.jpg'
+                chunks = response.iter_content(chunk_size=8192)
+                first_chunk = next((chunk for chunk in chunks if chunk), b'')
+                
+                # 根据文件头识别真实格式，识别失败时参考URL中的wx_fmt参数
+                image_format = sniff_image_format(first_chunk) or format_from_url(img_url)
+                ext = get_extension(image_format)
+                
+                basename = self._get_image_basename(img_url, index)
+                if basename:
+                    filename = f'{basename}.{ext}'
                 else:
                     # 从URL中提取文件名，如果没有则使用时间戳
                     filename = os.path.basename(img_url.split('?')[0])
-                    if not filename or len(filename) > 100 or not filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                        filename = f"img_{int(time.time() * 1000)}_{hash(img_url) % 10000}.jpg"
+                    if not filename or len(filename) > 100 or not filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.avif')):
+                        filename = f"img_{int(time.time() * 1000)}_{hash(img_url) % 10000}.{ext}"
+                    # 确保文件名是合法的
+                    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
                 
-                # 确保文件名是合法的
-                filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+                # 保存图片（分片布局下文件名含子目录）
+                file_path = os.path.join(self.images_dir, *filename.split('/'))
+                future = None
+                with self.metrics.timer(STAGE_DISK_WRITE):
+                    if self.image_pipeline.enabled:
+                        # 需要后处理的图片先写到磁盘（归档输出时为暂存目录），处理完再登记
+                        disk_path, size = self.writer.write_staging(file_path, itertools.chain([first_chunk], chunks))
+                    else:
+                        size = self.writer.write_stream(file_path, itertools.chain([first_chunk], chunks))['size']
                 
-                # 保存图片
-                file_path = os.path.join(self.images_dir, filename)
-                with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+                self.metrics.add_bytes(STAGE_IMAGE_FETCH, size)
+                self.metrics.inc('images_downloaded')
                 
+                # 提交后处理任务，在进程池中执行，不阻塞后续图片下载
+                if self.image_pipeline.enabled:
+                    future = self.image_pipeline.submit(disk_path)
+                self._downloaded_images[filename] = {
+                    'format': image_format,
+                    'bytes': size,
+                    'future': future
+                }
                 return filename
             else:
+                self.metrics.inc_error(STAGE_IMAGE_FETCH, response.status_code)
                 self.logger.error(f"下载图片失败，状态码: {response.status_code}, URL: {img_url}")
                 return None
         except Exception as e:
+            self.metrics.inc_error(STAGE_IMAGE_FETCH, type(e).__name__)
             self.logger.error(f"下载图片失败 {img_url}: {str(e)}")
             return None
+        finally:
+            self.metrics.observe(STAGE_IMAGE_FETCH, time.perf_counter() - start)
+    
+    def _get_image_basename(self, img_url, index):
+        """生成图片文件名（不含扩展名）
+        
+        分片布局按图片地址哈希命名，形如 ab/ab12cd34ef56ab78；
+        平铺布局使用文章标题和序号命名。
+        
+        Args:
+            img_url: 实际请求的图片地址
+            index: 图片序号
+            
+        Returns:
+            str or None: 文件名，无法生成时返回None
+        """
+        if self.image_layout == LAYOUT_SHARDED:
+            return sharded_basename(img_url)
+        if not self.current_article_title or index is None:
+            return None
+        # 从文章标题中提取合法的文件名部分
+        safe_title = re.sub(r'[<>:"/\\|?*]', '_', self.current_article_title)
+        return f'{safe_title}_{index:03d}'
+    
+    def _find_complete_image(self, img_url, index):
+        """查找已完整下载的同一张图片
+        
+        Args:
+            img_url: 实际请求的图片地址
+            index: 图片序号
+            
+        Returns:
+            str or None: 图片文件名（相对图片目录）
+        """
+        basename = self._get_image_basename(img_url, index)
+        if not basename:
+            return None
+        for ext in set(FORMAT_EXTENSIONS.values()):
+            filename = f'{basename}.{ext}'
+            if self.writer.is_complete(os.path.join(self.images_dir, *filename.split('/'))):
+                return filename
+        return None
     
-    def save_to_markdown(self, title, content):
+    def _get_markdown_path(self, title, url=None):
+        """获取文章对应的Markdown文件路径，提供链接时文件名附加文章标识"""
+        return os.path.join(self.save_dir, markdown_filename(title, url))
+    
+    def save_to_markdown(self, title, content, file_path=None):
         """保存内容为Markdown文件
         
         Args:
             title (str): 文章标题
             content (str): Markdown格式的文章内容
+            file_path (str): 保存路径，默认为标题对应的路径
             
         Returns:
             str or None: 保存的文件路径，保存失败则返回None
         """
         try:
             # 清理文件名中的非法字符
-            safe_title = self._clean_filename(title)
-            filename = f"{safe_title}.md"
-            file_path = os.path.join(self.save_dir, filename)
+            file_path = file_path or self._get_markdown_path(title)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 先写临时文件再重命名，中断时不会留下残缺的Markdown
+            with self.metrics.timer(STAGE_DISK_WRITE):
+                entry = self.writer.write_text(file_path, content)
+            self.metrics.add_bytes(STAGE_DISK_WRITE, entry['size'])
             
             self.logger.info(f"[已保存]：{file_path}")
             return file_path
         except Exception as e:
             self.logger.error(f"保存Markdown文件失败: {str(e)}")
             return None
-    
-    def _clean_filename(self, filename):
-        """清理文件名中的非法字符"""
-        # 替换Windows文件名中不允许的字符
-        invalid_chars = r'[\\/*?:"<>|]'
-        return re.sub(invalid_chars, '_', filename)
 
 
 class ArticleDownloadManager(QObject):
@@ -559,24 +911,68 @@ class ArticleDownloadManager(QObject):
     download_status_changed = pyqtSignal(str, dict)  # 文章链接, 状态信息
     download_completed = pyqtSignal()  # 所有下载完成
     
-    def __init__(self, save_dir="."):
+    def __init__(self, save_dir=".", lazy_images=None, archive_name=None, skip_existing=True):
         super().__init__()
         self.save_dir = save_dir
+        # 归档输出时的归档名称（通常为公众号名称）
+        self.archive_name = archive_name
         self.download_queue = Queue()
         self.download_threads = []
         self.is_downloading = False
         self.download_results = {}
         self.max_threads = 3
+        # 已下载文章索引，重新下载时跳过已完整保存且未更新的文章
+        self.skip_existing = skip_existing
+        self.download_index = get_download_index(save_dir)
+        self.skipped_count = 0
+        # 本次已加入队列的文章，同一文章的不同链接只下载一次
+        self.queued_articles = ArticleDedupeIndex()
+        # 延迟下载图片，文章下载完成后由后台补全
+        self.lazy_images = is_lazy_images_enabled() if lazy_images is None else lazy_images
+        # 输出相关配置只读取一次，传给每篇文章的下载器，避免每篇文章都读取并解密配置文件
+        self.output_format = get_output_format()
+        self.image_layout = get_image_layout()
+        self.near_duplicate_policy = get_near_duplicate_policy()
+        self.front_matter = is_front_matter_enabled()
+        self.image_backfill = None
+        self.download_completed.connect(self._start_image_backfill)
         
     def add_article(self, article_info):
         """添加文章到下载队列
         
         Args:
-            article_info: dict, 包含 'title', 'link' 字段
+            article_info: dict, 包含 'title', 'link' 字段，可选 'publish_time' 字段
+            
+        Returns:
+            bool: 是否加入队列，重复或已下载的文章返回False
         """
+        link = article_info['link']
+        if not self.queued_articles.add(link):
+            get_metrics().inc('articles_deduplicated')
+            if link not in self.download_results:
+                # 同一文章的其他链接，已加入或已完成的同一链接保持原状态
+                self.download_results[link] = {'status': '重复文章，跳过', 'file_path': None}
+                self.download_status_changed.emit(link, self.download_results[link])
+            return False
+        if self.skip_existing:
+            existing_path = self.download_index.find_existing(
+                link, article_info.get('title'), article_info.get('publish_time'),
+                writer=self.get_writer()
+            )
+            if existing_path:
+                self.skipped_count += 1
+                get_metrics().inc('articles_skipped')
+                self.download_results[link] = {'status': '已下载，跳过', 'file_path': existing_path}
+                self.download_status_changed.emit(link, self.download_results[link])
+                return False
+            if self.download_index.get(link):
+                # 已下载过但发布时间变化（文章已更新），覆盖已保存的文件
+                article_info = dict(article_info, refresh=True)
+        
         self.download_queue.put(article_info)
-        self.download_results[article_info['link']] = {'status': '等待下载', 'file_path': None}
-        self.download_status_changed.emit(article_info['link'], self.download_results[article_info['link']])
+        self.download_results[link] = {'status': '等待下载', 'file_path': None}
+        self.download_status_changed.emit(link, self.download_results[link])
+        return True
         
     def start_download(self):
         """开始下载队列中的文章"""
@@ -637,17 +1033,30 @@ class ArticleDownloadManager(QObject):
                 self.download_status_changed.emit(article['link'], self.download_results[article['link']])
                 
                 # 创建下载器实例，直接使用主下载目录
-                downloader = WeChatArticleDownloader(save_dir=self.save_dir)
+                downloader = WeChatArticleDownloader(
+                    save_dir=self.save_dir,
+                    lazy_images=self.lazy_images,
+                    writer=self.get_writer(),
+                    image_layout=self.image_layout,
+                    near_duplicate_policy=self.near_duplicate_policy,
+                    front_matter=self.front_matter
+                )
                 
                 # 下载文章
-                success, file_path = downloader.download_article(article['link'])
+                success, file_path = downloader.download_article(article['link'], article.get('publish_time'),
+                                                                 refresh=article.get('refresh', False))
                 
                 # 更新下载状态
+                get_metrics().inc('articles_downloaded' if success else 'articles_failed')
                 if success:
                     self.download_results[article['link']] = {
                         'status': '下载成功',
                         'file_path': file_path
                     }
+                    try:
+                        self._on_article_downloaded(article, file_path, downloader.current_metadata)
+                    except Exception as e:
+                        print(f"文章下载后处理失败: {str(e)}")
                 else:
                     self.download_results[article['link']] = {
                         'status': '下载失败',
@@ -666,6 +1075,43 @@ class ArticleDownloadManager(QObject):
             finally:
                 self.download_queue.task_done()
                 
+    def _on_article_downloaded(self, article, file_path, metadata):
+        """单篇文章下载成功后调用，在下载线程中执行，子类重写以保存到数据库等
+        
+        Args:
+            article: 加入队列时的文章信息
+            file_path: Markdown文件路径（归档输出时为归档成员），内容通过 read_article 读取
+            metadata: 页面中提取的 ArticleMetadata，未取得时为None
+        """
+        pass
+    
+    def get_writer(self):
+        """当前保存目录对应的输出写入器（保存目录可能在创建后修改）"""
+        return get_output_writer(self.save_dir, self.archive_name, self.output_format)
+    
+    def read_article(self, file_path):
+        """读取已保存的Markdown内容，目录输出和归档输出均适用
+        
+        Args:
+            file_path: download_results 中记录的文件路径
+            
+        Returns:
+            str: Markdown内容
+        """
+        return self.get_writer().read_text(file_path)
+    
+    def _start_image_backfill(self):
+        """文章下载完成后启动图片补全"""
+        if not self.lazy_images:
+            return
+        if self.image_backfill is None or self.image_backfill.save_dir != self.save_dir:
+            self.image_backfill = ImageBackfillManager(
+                self.save_dir, is_busy=lambda: self.is_downloading,
+                writer=self.get_writer()
+            )
+        if self.image_backfill.pending_count():
+            self.image_backfill.start()
+    
     def get_article_status(self, article_link):
         """获取文章的下载状态"""
         return self.download_results.get(article_link, {'status': '未知', 'file_path': None})
@@ -0,0 +1,127 @@
+import re
+import html
+import time
+from dataclasses import dataclass, asdict
+
+
+# 页面脚本中的元数据变量，一次扫描提取全部，形如：
+#   var msg_title = '标题'.html(false);
+#   var nickname = htmlDecode("公众号");
+#   var biz = "" || "MzA5MDAwMDAwMA==";
+#   var ct = "1700000000";
+_META_VARIABLES = ('msg_title', 'msg_desc', 'msg_cdn_url', 'msg_source_url', 'nickname', 'author',
+                   'ct', 'biz', 'mid', 'idx', 'sn', 'user_name')
+META_PATTERN = re.compile(
+    r'var\s+(' + '|'.join(_META_VARIABLES) + r')\s*=\s*'
+    r'(?:""\s*\|\|\s*)?(?:htmlDecode\(\s*)?'
+    r'(?:"([^"\n]*)"|\'([^\'\n]*)\'|(\d+))'
+)
+
+# 脚本变量 -> ArticleMetadata 字段
+_FIELD_NAMES = {
+    'msg_title': 'title',
+    'msg_desc': 'description',
+    'msg_cdn_url': 'cover_url',
+    'msg_source_url': 'source_url',
+    'nickname': 'account_name',
+    'user_name': 'account_id',
+    'ct': 'publish_timestamp',
+}
+
+# 跨块匹配时保留的上一块末尾长度
+META_LOOKBEHIND = 2048
+
+
+@dataclass
+class ArticleMetadata:
+    """文章元数据，来自文章页脚本中的变量"""
+    title: str = ''
+    account_name: str = ''
+    account_id: str = ''
+    author: str = ''
+    description: str = ''
+    cover_url: str = ''
+    source_url: str = ''
+    publish_timestamp: int = 0
+    biz: str = ''
+    mid: str = ''
+    idx: str = ''
+    sn: str = ''
+    url: str = ''
+
+    @property
+    def publish_time(self):
+        """发布时间，格式与文章列表一致（YYYY-MM-DD HH:MM:SS），未知时为空"""
+        if not self.publish_timestamp:
+            return ''
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.publish_timestamp))
+
+    def is_complete(self):
+        """标题、公众号名称和发布时间是否都已取得"""
+        return bool(self.title and self.account_name and self.publish_timestamp)
+
+    def update_from_text(self, text):
+        """从页面文本中提取元数据，已有的字段不覆盖
+
+        Args:
+            text: 页面文本（可以是一部分）
+        """
+        for match in META_PATTERN.finditer(text):
+            name = _FIELD_NAMES.get(match.group(1), match.group(1))
+            if getattr(self, name):
+                continue
+            value = next((group for group in match.groups()[1:] if group is not None), '')
+            if name == 'publish_timestamp':
+                if value.isdigit():
+                    self.publish_timestamp = int(value)
+            elif value:
+                setattr(self, name, html.unescape(value).strip())
+
+    def to_front_matter(self):
+        """生成Markdown文件头部的YAML元数据
+
+        Returns:
+            str: 以 --- 包围的元数据块，没有任何字段时为空字符串
+        """
+        values = {
+            'title': self.title,
+            'account': self.account_name,
+            'author': self.author,
+            'publish_time': self.publish_time,
+            'description': self.description,
+            'cover': self.cover_url,
+            'url': self.url,
+            'source_url': self.source_url,
+        }
+        lines = [f'{key}: {_yaml_quote(value)}' for key, value in values.items() if value]
+        if not lines:
+            return ''
+        return '---\n' + '\n'.join(lines) + '\n---\n\n'
+
+    def to_dict(self):
+        """转换为字典，包含格式化的发布时间"""
+        data = asdict(self)
+        data['publish_time'] = self.publish_time
+        return data
+
+
+def _yaml_quote(value):
+    """按YAML双引号字符串转义"""
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+    return f'"{value}"'
+
+
+def extract_metadata(text, url=''):
+    """从完整页面文本中提取文章元数据
+
+    Args:
+        text: 页面文本
+        url: 文章链接
+
+    Returns:
+        ArticleMetadata: 文章元数据
+    """
+    metadata = ArticleMetadata(url=url)
+    metadata.update_from_text(text)
+    return metadata
+
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+# 清单文件名，位于输出根目录下
+MANIFEST_FILENAME = '.manifest.jsonl'
+
+# 默认每写入多少个文件执行一次批量fsync
+DEFAULT_FSYNC_BATCH = 32
+
+
+class AtomicFileWriter:
+    """原子文件写入器
+
+    先写入临时文件再重命名为目标文件，中断时不会留下看似完整的残缺文件。
+    已重命名的文件按批次fsync，落盘后才把大小和SHA-256记入清单；
+    重新运行时只有清单中记录且大小一致的文件才被视为已完成。
+    """
+
+    def __init__(self, root_dir, fsync_batch=DEFAULT_FSYNC_BATCH):
+        """初始化写入器
+
+        Args:
+            root_dir: 输出根目录，清单中的路径相对该目录
+            fsync_batch: 每批fsync的文件数，1 表示每个文件写完立即落盘
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.fsync_batch = max(1, int(fsync_batch))
+        self.manifest_path = os.path.join(self.root_dir, MANIFEST_FILENAME)
+        self._lock = threading.RLock()
+        self._pending = []
+        self._entries = self._load_manifest()
+
+    def _load_manifest(self):
+        """加载清单，同一文件的多条记录以最后一条为准"""
+        entries = {}
+        if not os.path.exists(self.manifest_path):
+            return entries
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 忽略写入中断产生的残缺行
+                        continue
+                    entries[entry['path']] = entry
+        except Exception as e:
+            print(f"加载写入清单失败: {str(e)}")
+        return entries
+
+    def _relpath(self, path):
+        """转换为清单中使用的相对路径"""
+        return os.path.relpath(os.path.abspath(path), self.root_dir).replace(os.sep, '/')
+
+    def _abspath(self, path):
+        return path if os.path.isabs(path) else os.path.join(self.root_dir, path)
+
+    def exists(self, path):
+        """文件是否存在（不检查是否完整）"""
+        return os.path.exists(self._abspath(path))
+
+    def is_complete(self, path, verify_hash=False):
+        """文件是否已完整写入
+
+        Args:
+            path: 文件路径
+            verify_hash: 是否重新计算SHA-256校验内容
+
+        Returns:
+            bool: 清单中有记录且磁盘文件大小（及哈希）一致时返回True
+        """
+        path = self._abspath(path)
+        with self._lock:
+            entry = self._entries.get(self._relpath(path))
+        if not entry:
+            return False
+        try:
+            if os.path.getsize(path) != entry['size']:
+                return False
+        except OSError:
+            return False
+        if verify_hash:
+            return self._hash_file(path) == entry['sha256']
+        return True
+
+    def get_entry(self, path):
+        """获取清单中的记录
+
+        Returns:
+            dict or None: 包含 path、size、sha256、time 的记录
+        """
+        with self._lock:
+            entry = self._entries.get(self._relpath(self._abspath(path)))
+            return dict(entry) if entry else None
+
+    def write_bytes(self, path, data):
+        """原子写入二进制内容
+
+        Returns:
+            dict: 写入记录（size、sha256）
+        """
+        return self.write_stream(path, [data])
+
+    def write_text(self, path, text, encoding='utf-8'):
+        """原子写入文本内容
+
+        Returns:
+            dict: 写入记录（size、sha256）
+        """
+        return self.write_stream(path, [text.encode(encoding)])
+
+    def write_stream(self, path, chunks):
+        """将分块内容流式写入临时文件，完成后重命名为目标文件
+
+        Args:
+            path: 目标文件路径
+            chunks: 字节块迭代器
+
+        Returns:
+            dict: 写入记录（size、sha256）
+        """
+        path = self._abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self._add_pending(path, size, digest.hexdigest())
+
+    def read_bytes(self, path):
+        """读取文件内容"""
+        with open(self._abspath(path), 'rb') as f:
+            return f.read()
+
+    def read_text(self, path, encoding='utf-8'):
+        """读取文本文件"""
+        return self.read_bytes(path).decode(encoding)
+
+    def staging_path(self, path):
+        """需要在磁盘上处理的文件直接写到目标位置"""
+        return self._abspath(path)
+
+    def write_staging(self, path, chunks):
+        """写入供子进程处理的文件，目录输出时即为原子写入目标文件
+
+        Returns:
+            tuple: (磁盘文件路径, 大小)
+        """
+        entry = self.write_stream(path, chunks)
+        return self._abspath(path), entry['size']
+
+    def register(self, disk_path, path=None):
+        """登记由其他方式生成的文件（如子进程转码后的图片）
+
+        Args:
+            disk_path: 已存在的文件路径
+            path: 目标路径，目录输出时与 disk_path 相同，忽略
+
+        Returns:
+            dict: 写入记录（size、sha256）
+        """
+        disk_path = self._abspath(disk_path)
+        return self._add_pending(disk_path, os.path.getsize(disk_path), self._hash_file(disk_path))
+
+    def _add_pending(self, path, size, sha256):
+        entry = {
+            'path': self._relpath(path),
+            'size': size,
+            'sha256': sha256,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self._pending.append((path, entry))
+            if len(self._pending) >= self.fsync_batch:
+                self.commit()
+        return entry
+
+    def commit(self):
+        """将本批文件和所在目录fsync落盘，然后写入清单"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+
+            directories = set()
+            committed = []
+            for path, entry in pending:
+                try:
+                    _fsync_file(path)
+                    directories.add(os.path.dirname(path))
+                    committed.append(entry)
+                except OSError:
+                    # 文件已被删除或替换（如转码后删除原图），不记入清单
+                    continue
+            for directory in directories:
+                _fsync_dir(directory)
+
+            if not committed:
+                return
+            try:
+                os.makedirs(self.root_dir, exist_ok=True)
+                with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                    for entry in committed:
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                for entry in committed:
+                    self._entries[entry['path']] = entry
+            except Exception as e:
+                print(f"写入清单失败: {str(e)}")
+
+    def close(self):
+        """提交剩余文件"""
+        self.commit()
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _fsync_file(path):
+    """将文件内容刷入磁盘"""
+    # Windows 上 fsync 需要可写句柄
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory):
+    """将目录项刷入磁盘，保证重命名持久化（Windows 不支持，忽略）"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_atomic_writer(root_dir):
+    """获取输出目录对应的写入器，同一目录在进程内共用一个实例
+
+    Args:
+        root_dir: 输出根目录
+
+    Returns:
+        AtomicFileWriter: 写入器
+    """
+    key = os.path.abspath(root_dir)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = AtomicFileWriter(key)
+        return writer
+
+
+# 输出格式
+OUTPUT_FORMAT_FILES = 'files'  # 每篇文章一个Markdown文件，图片单独保存
+OUTPUT_FORMAT_PACK = 'pack'    # 文章和图片追加到单个归档文件
+
+def get_output_format():
+    """读取 config.json 中的 OUTPUT_FORMAT 配置
+
+    每次调用都会读取配置文件，批量下载时应读取一次后传给 get_output_writer。
+
+    Returns:
+        str: 输出格式（files/pack）
+    """
+    try:
+        from utils.config_manager import ConfigManager
+        return ConfigManager().get('OUTPUT_FORMAT', OUTPUT_FORMAT_FILES)
+    except Exception as e:
+        print(f"读取输出格式配置失败: {str(e)}")
+        return OUTPUT_FORMAT_FILES
+
+
+def get_output_writer(root_dir, archive_name=None, output_format=None):
+    """获取输出目录对应的写入器
+
+    Args:
+        root_dir: 输出根目录
+        archive_name: 归档名称（通常为公众号名称），仅归档输出使用
+        output_format: 输出格式（files/pack），默认读取 config.json 中的 OUTPUT_FORMAT
+
+    Returns:
+        AtomicFileWriter or PackArchiveWriter: 写入器
+    """
+    if output_format is None:
+        output_format = get_output_format()
+
+    if output_format != OUTPUT_FORMAT_PACK:
+        return get_atomic_writer(root_dir)
+
+    from utils.pack_archive import PackArchiveWriter
+    archive_name = archive_name or 'articles'
+    key = (os.path.abspath(root_dir), archive_name)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = PackArchiveWriter(root_dir, archive_name)
+        return writer
@@ -1,10 +1,10 @@
 import os
 import sys
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
 # 导入原有的下载器和数据库管理器
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.article_downloader import ArticleDownloadManager, WeChatArticleDownloader
+from utils.article_downloader import ArticleDownloadManager
 from models.article_manager import ArticleManager
 
 class DBArticleDownloadManager(ArticleDownloadManager):
@@ -14,8 +14,8 @@ class DBArticleDownloadManager(ArticleDownloadManager):
     db_save_success = pyqtSignal(dict)  # 数据库保存成功信号
     db_save_failed = pyqtSignal(str)    # 数据库保存失败信号
     
-    def __init__(self, save_to_db=False, user_id=None):
-        super().__init__()
+    def __init__(self, save_to_db=False, user_id=None, save_dir=".", **kwargs):
+        super().__init__(save_dir=save_dir, **kwargs)
         self.save_to_db = save_to_db
         self.article_manager = ArticleManager(user_id)
         
@@ -31,35 +31,32 @@ class DBArticleDownloadManager(ArticleDownloadManager):
         """设置是否保存到数据库"""
         self.save_to_db = save_to_db
     
-    def download_article(self, article_info):
-        """下载文章并可选保存到数据库
+    def _on_article_downloaded(self, article, file_path, metadata):
+        """文章下载成功后保存到数据库
+        
+        列表页信息中缺少的公众号名称、发布时间等由文章页中的元数据补全，
+        单篇链接下载时也能保存完整的记录。
         
         Args:
-            article_info: 文章信息字典
-            
-        Returns:
-            tuple: (是否成功, 文件路径)
+            article: 加入队列时的文章信息
+            file_path: Markdown文件路径
+            metadata: 文章元数据
         """
-        # 调用父类方法下载文章
-        success, file_path = super().download_article(article_info)
+        if not self.save_to_db or not file_path:
+            return
         
-        # 如果下载成功且需要保存到数据库
-        if success and self.save_to_db and file_path:
-            # 获取公众号名称
-            account_name = self.current_account_name
-            if not account_name and 'account_name' in article_info:
-                account_name = article_info['account_name']
-            elif not account_name and '公众号名称' in article_info:
-                account_name = article_info['公众号名称']
-            
-            # 添加公众号名称到文章信息
-            if account_name and 'account_name' not in article_info:
-                article_info['account_name'] = account_name
-            
-            # 保存到数据库
-            self.article_manager.save_article_to_db(article_info, file_path)
+        article_data = dict(article)
+        if metadata:
+            article_data.setdefault('account_name', metadata.account_name)
+            if metadata.publish_time:
+                article_data.setdefault('publish_time', metadata.publish_time)
+            if metadata.title:
+                article_data.setdefault('title', metadata.title)
+        article_data.setdefault('article_url', article.get('link', ''))
         
-        return success, file_path
+        # 通过写入器读取内容，归档输出时文章不在磁盘上
+        content = self.read_article(file_path)
+        self.article_manager.save_article_to_db(article_data, content=content)
     
     def _on_db_save_success(self, result):
         """数据库保存成功回调"""
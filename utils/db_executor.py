@@ -0,0 +1,164 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+# 默认工作线程数，数据库请求以网络等待为主
+DEFAULT_MAX_WORKERS = 4
+
+
+class DBTaskHandle:
+    """数据库任务句柄，用于取消任务"""
+
+    def __init__(self, key, generation, args):
+        self.key = key
+        self.generation = generation
+        self.args = args
+        self.future = None
+        self.cancelled = False
+        self.callbacks = []
+
+    def cancel(self):
+        """取消任务：未开始的任务不再执行，已在执行的任务结果被丢弃"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        """任务是否已结束"""
+        return self.future is not None and self.future.done()
+
+
+class DBTaskExecutor(QObject):
+    """数据库任务执行器
+
+    在线程池中执行数据库调用，结果通过信号回到界面线程再调用回调，
+    界面不会因网络延迟卡顿。同一 key 的新任务会取代尚未返回的旧任务
+    （如新的搜索取消旧的搜索），参数相同的任务合并为一次调用。
+    """
+
+    # 内部信号：工作线程 -> 界面线程
+    _task_done = pyqtSignal(object, bool, object)  # 任务句柄, 是否成功, 结果或异常
+
+    # 对外信号
+    task_started = pyqtSignal(str)   # 任务key
+    task_finished = pyqtSignal(str)  # 任务key（成功、失败均触发，已取消的不触发）
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._latest = {}
+        self._task_done.connect(self._dispatch)
+
+    def submit(self, key, func, *args, on_success=None, on_error=None, **kwargs):
+        """提交数据库任务
+
+        Args:
+            key: 任务类别，同一类别只保留最新的任务
+            func: 在工作线程中执行的函数
+            *args, **kwargs: 函数参数
+            on_success: 成功回调，参数为函数返回值，在界面线程中调用
+            on_error: 失败回调，参数为异常，在界面线程中调用
+
+        Returns:
+            DBTaskHandle: 任务句柄
+        """
+        call_args = (func, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            previous = self._latest.get(key)
+            if previous and not previous.cancelled and not previous.done() and _same_call(previous.args, call_args):
+                # 相同的请求仍在进行中，合并回调，不重复调用
+                previous.callbacks.append((on_success, on_error))
+                return previous
+            if previous:
+                previous.cancel()
+            self._generation += 1
+            handle = DBTaskHandle(key, self._generation, call_args)
+            handle.callbacks.append((on_success, on_error))
+            self._latest[key] = handle
+
+        handle.future = self._pool.submit(self._run, handle, func, args, kwargs)
+        self.task_started.emit(key)
+        return handle
+
+    def _run(self, handle, func, args, kwargs):
+        if handle.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._task_done.emit(handle, False, e)
+        else:
+            self._task_done.emit(handle, True, result)
+
+    def _dispatch(self, handle, success, value):
+        """在界面线程中调用回调，丢弃已取消或已被新任务取代的结果"""
+        with self._lock:
+            if self._latest.get(handle.key) is handle:
+                del self._latest[handle.key]
+            elif not handle.cancelled:
+                # 已被新任务取代
+                handle.cancelled = True
+        if handle.cancelled:
+            return
+
+        for on_success, on_error in handle.callbacks:
+            try:
+                if success and on_success:
+                    on_success(value)
+                elif not success:
+                    if on_error:
+                        on_error(value)
+                    else:
+                        print(f"数据库任务 {handle.key} 失败: {str(value)}")
+            except Exception as e:
+                print(f"数据库任务 {handle.key} 回调出错: {str(e)}")
+        self.task_finished.emit(handle.key)
+
+    def is_running(self, key):
+        """指定类别是否有进行中的任务"""
+        with self._lock:
+            handle = self._latest.get(key)
+            return bool(handle and not handle.cancelled)
+
+    def cancel(self, key):
+        """取消指定类别的任务"""
+        with self._lock:
+            handle = self._latest.pop(key, None)
+        if handle:
+            handle.cancel()
+
+    def cancel_all(self):
+        """取消全部任务"""
+        with self._lock:
+            handles, self._latest = list(self._latest.values()), {}
+        for handle in handles:
+            handle.cancel()
+
+    def shutdown(self):
+        """取消全部任务并关闭线程池，不等待正在执行的调用"""
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _same_call(a, b):
+    try:
+        return a == b
+    except Exception:
+        return False
+
+
+_db_executor = None
+
+def get_db_executor():
+    """获取全局数据库任务执行器，需在界面线程中首次调用
+
+    Returns:
+        DBTaskExecutor: 任务执行器
+    """
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = DBTaskExecutor()
+    return _db_executor
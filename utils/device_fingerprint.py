@@ -0,0 +1,113 @@
+import os
+import re
+import sys
+import uuid
+import threading
+
+
+# Linux 网卡信息目录
+SYS_CLASS_NET = '/sys/class/net'
+
+UNKNOWN_MAC = 'unknown'
+
+_MAC_PATTERN = re.compile(r'^[0-9a-f]{2}(:[0-9a-f]{2}){5}$')
+
+_lock = threading.Lock()
+_device_mac = None
+
+
+def normalize_mac(mac):
+    """统一MAC地址格式为小写冒号分隔（aa:bb:cc:dd:ee:ff）
+
+    Args:
+        mac: 任意常见格式的MAC地址（冒号、短横线分隔，大小写均可）
+
+    Returns:
+        str: 统一格式的MAC地址，无法识别时原样返回（去掉首尾空白）
+    """
+    if not mac:
+        return ''
+    text = str(mac).strip()
+    candidate = text.replace('-', ':').lower()
+    return candidate if _MAC_PATTERN.match(candidate) else text
+
+
+def mac_variants(mac):
+    """MAC地址的各种历史存储格式，用于匹配旧版本保存的记录
+
+    旧版本在 Windows 上保存 getmac 的输出（AA-BB-CC-DD-EE-FF），
+    在 macOS 和 Linux 上保存 ifconfig / ip 的输出（aa:bb:cc:dd:ee:ff）。
+
+    Returns:
+        list: 去重后的格式列表，统一格式在前
+    """
+    canonical = normalize_mac(mac)
+    if not _MAC_PATTERN.match(canonical):
+        return [canonical] if canonical else []
+    variants = [canonical, canonical.upper().replace(':', '-'), canonical.upper()]
+    return list(dict.fromkeys(variants))
+
+
+def _read_linux_mac():
+    """从 /sys/class/net 读取网卡MAC地址，不启动子进程
+
+    优先选择物理网卡（有 device 目录），同类按接口序号排序，与 ip link 的顺序一致。
+    """
+    try:
+        names = os.listdir(SYS_CLASS_NET)
+    except OSError:
+        return None
+
+    candidates = []
+    for name in names:
+        base = os.path.join(SYS_CLASS_NET, name)
+        try:
+            with open(os.path.join(base, 'address'), 'r') as f:
+                address = normalize_mac(f.read())
+        except OSError:
+            continue
+        if not _MAC_PATTERN.match(address) or address == '00:00:00:00:00:00':
+            continue
+        try:
+            with open(os.path.join(base, 'ifindex'), 'r') as f:
+                ifindex = int(f.read().strip())
+        except (OSError, ValueError):
+            ifindex = sys.maxsize
+        physical = os.path.exists(os.path.join(base, 'device'))
+        candidates.append((not physical, ifindex, address))
+
+    return min(candidates)[2] if candidates else None
+
+
+def _read_node_mac():
+    """通过 uuid.getnode() 获取MAC地址（Windows 和 macOS 上调用系统接口）
+
+    无法获取硬件地址时 getnode 返回随机数（组播位为1），此时返回None。
+    """
+    node = uuid.getnode()
+    if (node >> 40) & 1:
+        return None
+    return ':'.join(f'{(node >> shift) & 0xff:02x}' for shift in range(40, -1, -8))
+
+
+def get_device_mac():
+    """获取本机MAC地址，每个进程只读取一次
+
+    Returns:
+        str: 小写冒号分隔的MAC地址，无法获取时为 'unknown'
+    """
+    global _device_mac
+    if _device_mac is not None:
+        return _device_mac
+    with _lock:
+        if _device_mac is None:
+            mac = None
+            try:
+                if sys.platform.startswith('linux'):
+                    mac = _read_linux_mac()
+                if not mac:
+                    mac = _read_node_mac()
+            except Exception as e:
+                print(f"获取MAC地址时发生错误: {str(e)}")
+            _device_mac = mac or UNKNOWN_MAC
+    return _device_mac
@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from utils.url_canonical import article_identity
+
+
+# 下载索引文件名，位于输出根目录下
+INDEX_FILENAME = '.downloads.jsonl'
+
+# 与下载器保存Markdown时一致的文件名非法字符
+_INVALID_FILENAME_CHARS = re.compile(r'[\\/*?:"<>|]')
+
+
+def markdown_filename(title, url=None):
+    """文章对应的Markdown文件名
+
+    Args:
+        title: 文章标题
+        url: 文章链接，提供时在文件名后附加文章标识的短哈希，用于区分同名文章
+
+    Returns:
+        str: 文件名
+    """
+    name = _INVALID_FILENAME_CHARS.sub('_', title)
+    if url:
+        name += '_' + hashlib.sha1(article_identity(url).encode('utf-8')).hexdigest()[:8]
+    return f"{name}.md"
+
+
+class DownloadIndex:
+    """已下载文章索引
+
+    以JSON Lines记录每篇文章的标识、标题、Markdown路径和发布时间。开始下载前
+    先查索引，已完整保存且发布时间未变的文章无需再请求文章页。
+    """
+
+    def __init__(self, save_dir):
+        """初始化下载索引
+
+        Args:
+            save_dir: 文章保存目录
+        """
+        self.save_dir = os.path.abspath(save_dir)
+        self.index_path = os.path.join(self.save_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        # Markdown相对路径 -> 记录，用于确认同名文件属于哪篇文章
+        self._paths = {entry['markdown']: entry for entry in self._entries.values()}
+
+    def _load(self):
+        """加载索引，同一文章的多条记录以最后一条为准"""
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 忽略写入中断产生的残缺行
+                        continue
+                    # 按链接重新计算标识，标识规则调整前写入的记录同样适用
+                    if entry.get('url'):
+                        entry['key'] = article_identity(entry['url'])
+                    entries[entry['key']] = entry
+        except Exception as e:
+            print(f"加载下载索引失败: {str(e)}")
+        return entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url):
+        """获取文章的索引记录
+
+        Returns:
+            dict or None: 包含 key、url、title、markdown、publish_time、time 的记录
+        """
+        with self._lock:
+            entry = self._entries.get(article_identity(url))
+            return dict(entry) if entry else None
+
+    def _relpath(self, markdown_path):
+        return os.path.relpath(os.path.abspath(markdown_path), self.save_dir).replace(os.sep, '/')
+
+    def is_recorded(self, url, markdown_path):
+        """Markdown文件是否记录为该文章保存的
+
+        按记录中的链接重新计算文章标识比较，标识规则调整前写入的记录同样适用。
+
+        Args:
+            url: 文章链接
+            markdown_path: Markdown文件路径
+
+        Returns:
+            bool: 是否为同一篇文章
+        """
+        with self._lock:
+            entry = self._paths.get(self._relpath(markdown_path))
+        return bool(entry) and article_identity(entry.get('url') or '') == article_identity(url)
+
+    def find_existing(self, url, title=None, publish_time=None, writer=None):
+        """查找已完整保存的文章
+
+        先按文章标识查找；没有记录时按标题对应的Markdown文件查找，但只有该文件的
+        索引记录属于同一篇文章时才视为已保存，同名的其他文章不会被跳过。
+        发布时间与记录不一致时视为文章已更新，需要重新下载。
+
+        Args:
+            url: 文章链接
+            title: 文章标题
+            publish_time: 发布时间，为空时不比较
+            writer: 输出写入器，用于确认Markdown已完整写入
+
+        Returns:
+            str or None: 已保存的Markdown路径
+        """
+        entry = self.get(url)
+        if entry:
+            if publish_time and entry.get('publish_time') and entry['publish_time'] != publish_time:
+                return None
+            markdown_path = os.path.join(self.save_dir, entry['markdown'])
+        elif title:
+            candidates = [os.path.join(self.save_dir, markdown_filename(title, with_url))
+                          for with_url in (None, url)]
+            markdown_path = next((path for path in candidates if self.is_recorded(url, path)), None)
+            if markdown_path is None:
+                return None
+        else:
+            return None
+
+        if writer is not None:
+            complete = writer.is_complete(markdown_path)
+        else:
+            complete = os.path.exists(markdown_path)
+        return markdown_path if complete else None
+
+    def record(self, url, title, markdown_path, publish_time=None):
+        """记录已下载的文章
+
+        Args:
+            url: 文章链接
+            title: 文章标题
+            markdown_path: Markdown文件路径
+            publish_time: 发布时间
+        """
+        entry = {
+            'key': article_identity(url),
+            'url': url,
+            'title': title,
+            'markdown': self._relpath(markdown_path),
+            'publish_time': publish_time,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        try:
+            with self._lock:
+                os.makedirs(self.save_dir, exist_ok=True)
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                self._entries[entry['key']] = entry
+                self._paths[entry['markdown']] = entry
+        except Exception as e:
+            print(f"写入下载索引失败: {str(e)}")
+
+
+_download_indexes = {}
+_download_indexes_lock = threading.Lock()
+
+def get_download_index(save_dir):
+    """获取保存目录对应的下载索引，同一目录在进程内共用一个实例
+
+    Args:
+        save_dir: 文章保存目录
+
+    Returns:
+        DownloadIndex: 下载索引
+    """
+    key = os.path.abspath(save_dir)
+    with _download_indexes_lock:
+        index = _download_indexes.get(key)
+        if index is None:
+            index = _download_indexes[key] = DownloadIndex(key)
+        return index
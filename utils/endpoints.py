@@ -0,0 +1,49 @@
+import os
+from urllib.parse import urlparse
+
+
+# 微信公众平台默认地址
+DEFAULT_MP_BASE_URL = 'https://mp.weixin.qq.com'
+
+# 配置文件中的接口地址键名
+CONFIG_KEY_MP_BASE_URL = 'MP_BASE_URL'
+
+_config_base_url = None
+
+
+def _get_config_base_url():
+    """读取 config.json 中配置的接口地址，只读取一次"""
+    global _config_base_url
+    if _config_base_url is None:
+        try:
+            from utils.config_manager import ConfigManager
+            _config_base_url = ConfigManager().get(CONFIG_KEY_MP_BASE_URL) or ''
+        except Exception as e:
+            print(f"读取接口地址配置失败: {str(e)}")
+            _config_base_url = ''
+    return _config_base_url
+
+
+def get_mp_base_url():
+    """获取微信公众平台接口地址
+
+    优先使用环境变量 MP_BASE_URL，其次使用 config.json 中的 MP_BASE_URL，
+    可指向本地模拟服务，用于基准测试和压测。
+
+    Returns:
+        str: 不带末尾斜杠的接口地址
+    """
+    base_url = os.environ.get('MP_BASE_URL') or _get_config_base_url() or DEFAULT_MP_BASE_URL
+    return base_url.rstrip('/')
+
+
+def get_mp_host(base_url=None):
+    """获取接口地址对应的Host请求头
+
+    Args:
+        base_url: 接口地址，默认使用 get_mp_base_url()
+
+    Returns:
+        str: Host请求头的值
+    """
+    return urlparse(base_url or get_mp_base_url()).netloc
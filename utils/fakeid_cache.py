@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import time
+import threading
+
+
+class FakeidCache:
+    """公众号名称到fakeid的持久化缓存，避免重复调用searchbiz接口"""
+
+    # 默认缓存有效期：30天
+    DEFAULT_TTL = 30 * 24 * 3600
+
+    def __init__(self, cache_path=None, ttl=DEFAULT_TTL):
+        """初始化缓存
+
+        Args:
+            cache_path: 缓存文件路径，默认为应用目录下的 cache/fakeid_cache.json
+            ttl: 缓存有效期（秒），0 或 None 表示永不过期
+        """
+        if cache_path is None:
+            # 获取应用程序根目录
+            if getattr(sys, 'frozen', False):
+                # 打包后的应用
+                base_dir = os.path.dirname(sys.executable)
+            else:
+                # 开发环境
+                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_path = os.path.join(base_dir, 'cache', 'fakeid_cache.json')
+
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        """从文件加载缓存
+
+        Returns:
+            dict: 缓存条目
+        """
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        return data
+        except Exception as e:
+            print(f"加载fakeid缓存失败: {str(e)}")
+        return {}
+
+    def _save(self):
+        """保存缓存到文件（先写临时文件再替换，避免写入中断损坏缓存）"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存fakeid缓存失败: {str(e)}")
+
+    @staticmethod
+    def _normalize(name):
+        """统一缓存键，忽略首尾空白和大小写"""
+        return (name or '').strip().lower()
+
+    def _is_expired(self, entry):
+        """判断缓存条目是否过期，手动指定的条目永不过期"""
+        if entry.get('manual'):
+            return False
+        if not self.ttl:
+            return False
+        return time.time() - entry.get('resolved_at', 0) > self.ttl
+
+    def get(self, gzh_name, allow_expired=False):
+        """获取公众号缓存信息
+
+        Args:
+            gzh_name: 公众号名称
+            allow_expired: 是否返回已过期的条目（重新解析失败时兜底使用）
+
+        Returns:
+            dict or None: 包含 fakeid、nickname、avatar 的字典，未命中或已过期返回None
+        """
+        with self._lock:
+            entry = self._entries.get(self._normalize(gzh_name))
+            if not entry or not entry.get('fakeid'):
+                return None
+            if not allow_expired and self._is_expired(entry):
+                return None
+            return dict(entry)
+
+    def get_fakeid(self, gzh_name):
+        """获取公众号fakeid
+
+        Args:
+            gzh_name: 公众号名称
+
+        Returns:
+            str or None: fakeid
+        """
+        entry = self.get(gzh_name)
+        return entry['fakeid'] if entry else None
+
+    def set(self, gzh_name, fakeid, nickname='', avatar='', manual=False):
+        """写入缓存
+
+        Args:
+            gzh_name: 公众号名称（搜索关键字）
+            fakeid: 公众号fakeid
+            nickname: 公众号昵称
+            avatar: 公众号头像URL
+            manual: 是否为手动指定，手动指定的条目不会过期也不会被自动解析覆盖
+        """
+        key = self._normalize(gzh_name)
+        if not key or not fakeid:
+            return
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing and existing.get('manual') and not manual:
+                return
+
+            self._entries[key] = {
+                'name': gzh_name.strip(),
+                'fakeid': fakeid,
+                'nickname': nickname or '',
+                'avatar': avatar or '',
+                'manual': bool(manual),
+                'resolved_at': time.time()
+            }
+            self._save()
+
+    def set_override(self, gzh_name, fakeid, nickname='', avatar=''):
+        """手动指定公众号的fakeid
+
+        Args:
+            gzh_name: 公众号名称
+            fakeid: 公众号fakeid
+            nickname: 公众号昵称
+            avatar: 公众号头像URL
+        """
+        self.set(gzh_name, fakeid, nickname, avatar, manual=True)
+
+    def remove(self, gzh_name):
+        """删除缓存条目（包括手动指定的条目）
+
+        Args:
+            gzh_name: 公众号名称
+
+        Returns:
+            bool: 是否删除成功
+        """
+        with self._lock:
+            if self._entries.pop(self._normalize(gzh_name), None) is None:
+                return False
+            self._save()
+            return True
+
+    def clear_expired(self):
+        """清理所有过期条目
+
+        Returns:
+            int: 清理的条目数
+        """
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if self._is_expired(entry)]
+            for key in expired:
+                del self._entries[key]
+            if expired:
+                self._save()
+            return len(expired)
+
+
+_fakeid_cache = None
+_fakeid_cache_lock = threading.Lock()
+
+def get_fakeid_cache():
+    """获取全局fakeid缓存实例
+
+    Returns:
+        FakeidCache: fakeid缓存实例
+    """
+    global _fakeid_cache
+    with _fakeid_cache_lock:
+        if _fakeid_cache is None:
+            _fakeid_cache = FakeidCache()
+        return _fakeid_cache
@@ -0,0 +1,176 @@
+import re
+import codecs
+import html
+from utils.article_meta import ArticleMetadata, META_LOOKBEHIND
+
+
+# 正文区域开始位置，与下载器原先依次尝试的选择器一致
+CONTENT_START = re.compile(
+    r'<div\b[^>]*?(?:\bid=["\']js_content["\']'
+    r'|\bclass=["\'][^"\']*\b(?:rich_media_content|js_underline_content)\b)[^>]*>',
+    re.IGNORECASE
+)
+
+# 正文中的div标签，用于找到正文区域的结束位置
+DIV_TAG = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+# 标题元素（正文之前），没有时使用页面脚本中的 msg_title 变量
+TITLE_ELEMENT = re.compile(
+    r'<h1\b[^>]*?(?:\bclass=["\'][^"\']*\brich_media_title\b|\bid=["\']activity-name["\'])[^>]*>(.*?)</h1>',
+    re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(r'<[^>]+>')
+
+# 正文之前只保留末尾这么多字符，用于匹配跨块边界的标签
+WINDOW_CHARS = 64 * 1024
+
+# 正文结束后继续查找脚本元数据的最大长度，超过后不再读取
+META_TAIL_CHARS = 256 * 1024
+
+
+class ArticleHTMLExtractor:
+    """流式提取文章页的标题、正文区域和脚本中的元数据
+
+    逐块接收页面文本，正文之前只保留有限长度的窗口，正文区域单独保存，
+    正文结束且已取得标题和元数据后即可停止读取，内存占用与正文大小成正比，
+    与页面中内联的脚本和样式无关。
+    """
+
+    def __init__(self, window_chars=WINDOW_CHARS, url=''):
+        """初始化提取器
+
+        Args:
+            window_chars: 正文之前保留的窗口大小（字符）
+            url: 文章链接，记入元数据
+        """
+        self.window_chars = window_chars
+        self.title = None
+        self.metadata = ArticleMetadata(url=url)
+        self._meta_tail = ''
+        self._after_chars = 0
+        self.content_html = None
+        self._buffer = ''
+        self._content = None
+        self._depth = 0
+        self._scan_pos = 0
+        self.done = False
+
+    def feed(self, text):
+        """接收一块页面文本
+
+        Args:
+            text: 解码后的文本
+
+        Returns:
+            bool: 是否已提取完成，可以停止读取
+        """
+        if self.done or not text:
+            return self.done
+
+        # 元数据变量可能出现在页面任意位置，逐块扫描，保留上一块末尾以匹配跨块的变量
+        scan = self._meta_tail + text
+        self.metadata.update_from_text(scan)
+        self._meta_tail = scan[-META_LOOKBEHIND:]
+
+        if self.content_html is not None:
+            self._after_chars += len(text)
+
+        if self._content is not None and self.content_html is None:
+            self._content += text
+            self._scan_content()
+        else:
+            self._buffer += text
+            self._scan_buffer()
+        if self.title is None and self.metadata.title:
+            self.title = self.metadata.title
+        self.done = self.content_html is not None and self.title is not None and (
+            self.metadata.is_complete() or self._after_chars > META_TAIL_CHARS)
+        return self.done
+
+    def _scan_buffer(self):
+        """在正文之前或之后的窗口中查找标题和正文开始位置"""
+        if self.title is None:
+            self._match_title(self._buffer)
+
+        if self.content_html is None:
+            match = CONTENT_START.search(self._buffer)
+            if match:
+                # 正文开始，之前的页面内容不再需要
+                self._content = self._buffer[match.start():]
+                self._buffer = ''
+                self._scan_pos = 0
+                self._scan_content()
+                return
+
+        if len(self._buffer) > self.window_chars:
+            self._buffer = self._buffer[-self.window_chars:]
+
+    def _scan_content(self):
+        """统计div嵌套深度，找到正文区域的结束位置"""
+        last_end = None
+        for match in DIV_TAG.finditer(self._content, self._scan_pos):
+            last_end = match.end()
+            self._depth += -1 if match.group(1) else 1
+            if self._depth == 0:
+                self.content_html = self._content[:match.end()]
+                # 正文之后的内容只用于查找脚本中的元数据
+                self._buffer = ''
+                self._content = None
+                return
+        # 新数据到达时从最后一个未闭合的'<'重新扫描，长标签被分块截断时也能完整匹配
+        start = self._scan_pos if last_end is None else last_end
+        start = max(start, self._content.rfind('>', start) + 1)
+        pos = self._content.find('<', start)
+        self._scan_pos = len(self._content) if pos == -1 else pos
+
+    def _match_title(self, text):
+        match = TITLE_ELEMENT.search(text)
+        if match:
+            title = html.unescape(_TAG.sub('', match.group(1))).strip()
+            if title:
+                self.title = title
+
+    def close(self):
+        """页面读取结束，正文未闭合时使用已读取的部分
+
+        Returns:
+            tuple: (标题, 正文HTML)，未找到时为None
+        """
+        if self.content_html is None and self._content is not None:
+            self.content_html = self._content
+            self._content = None
+        self._buffer = ''
+        self._meta_tail = ''
+        if self.title is None and self.metadata.title:
+            self.title = self.metadata.title
+        if not self.metadata.title and self.title:
+            self.metadata.title = self.title
+        return self.title, self.content_html
+
+
+def extract_article_html(chunks, encoding='utf-8', extractor=None):
+    """从字节块流中提取文章标题和正文区域
+
+    元数据通过 extractor.metadata 获取。
+
+    Args:
+        chunks: 页面字节块迭代器
+        encoding: 页面编码
+        extractor: 提取器实例，默认新建
+
+    Returns:
+        tuple: (标题, 正文HTML, 已读取字节数)
+    """
+    extractor = extractor or ArticleHTMLExtractor()
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    size = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        size += len(chunk)
+        if extractor.feed(decoder.decode(chunk)):
+            break
+    else:
+        extractor.feed(decoder.decode(b'', final=True))
+    title, content_html = extractor.close()
+    return title, content_html, size
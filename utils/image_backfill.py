@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.atomic_writer import get_output_writer
+
+
+# 待下载图片清单文件名，位于图片目录下
+PENDING_FILENAME = 'pending.jsonl'
+
+# 同一清单文件在进程内共用一把锁，下载线程追加与补全线程改写互斥
+_manifest_locks = {}
+_manifest_locks_guard = threading.Lock()
+
+
+def _get_manifest_lock(path):
+    with _manifest_locks_guard:
+        lock = _manifest_locks.get(path)
+        if lock is None:
+            lock = _manifest_locks[path] = threading.Lock()
+        return lock
+
+
+def is_lazy_images_enabled():
+    """读取 config.json 中的 LAZY_IMAGES 配置，决定是否延迟下载图片
+
+    Returns:
+        bool: 是否启用延迟下载
+    """
+    try:
+        from utils.config_manager import ConfigManager
+        return bool(ConfigManager().get('LAZY_IMAGES', False))
+    except Exception as e:
+        print(f"读取延迟下载配置失败: {str(e)}")
+        return False
+
+
+class PendingImageManifest:
+    """待下载图片清单，记录延迟模式下仍指向远程地址的图片"""
+
+    def __init__(self, images_dir):
+        """初始化清单
+
+        Args:
+            images_dir: 图片目录
+        """
+        self.images_dir = images_dir
+        self.manifest_path = os.path.join(images_dir, PENDING_FILENAME)
+        self._lock = _get_manifest_lock(os.path.abspath(self.manifest_path))
+
+    def append(self, records):
+        """追加待下载图片记录
+
+        Args:
+            records: 记录列表，每条包含 markdown、url、fetch_url、variant、index、article
+        """
+        if not records:
+            return
+        lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        try:
+            with self._lock:
+                os.makedirs(self.images_dir, exist_ok=True)
+                with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+        except Exception as e:
+            print(f"写入待下载图片清单失败: {str(e)}")
+
+    def _read(self):
+        records = []
+        if not os.path.exists(self.manifest_path):
+            return records
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 忽略写入中断产生的残缺行
+                    continue
+        return records
+
+    def load(self):
+        """读取全部待下载记录
+
+        Returns:
+            list: 记录列表
+        """
+        with self._lock:
+            return self._read()
+
+    def remove(self, done_keys):
+        """从清单中移除已完成的记录
+
+        Args:
+            done_keys: 已完成记录的 (markdown, url) 集合
+        """
+        if not done_keys:
+            return
+        with self._lock:
+            remaining = [r for r in self._read() if (r.get('markdown'), r.get('url')) not in done_keys]
+            if remaining:
+                tmp_path = f"{self.manifest_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for record in remaining:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                os.replace(tmp_path, self.manifest_path)
+            elif os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+
+
+class ImageBackfillManager(QObject):
+    """图片补全管理器，在后台低优先级地下载延迟模式下跳过的图片并改写Markdown链接"""
+
+    # 定义信号
+    backfill_progress = pyqtSignal(int, int)  # 已完成数量, 总数量
+    backfill_completed = pyqtSignal(int)      # 本次补全的图片数
+
+    def __init__(self, save_dir=".", delay=0.5, is_busy=None, writer=None):
+        """初始化补全管理器
+
+        Args:
+            save_dir: 文章保存目录
+            delay: 每张图片之间的间隔（秒），降低对前台下载的影响
+            is_busy: 返回前台是否繁忙的函数，繁忙时暂停补全
+            writer: 输出写入器，默认按配置获取
+        """
+        super().__init__()
+        self.save_dir = save_dir
+        self.writer = writer or get_output_writer(save_dir)
+        self.images_dir = os.path.join(save_dir, "images")
+        self.delay = delay
+        self.is_busy = is_busy
+        self.manifest = PendingImageManifest(self.images_dir)
+        self.running = False
+        self._thread = None
+
+    def pending_count(self):
+        """待下载图片数量"""
+        return len(self.manifest.load())
+
+    def start(self):
+        """启动后台补全线程"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._backfill_worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """停止补全，未完成的图片保留在清单中"""
+        self.running = False
+
+    def _backfill_worker(self):
+        """补全工作线程"""
+        # 延迟导入，避免与 article_downloader 循环引用
+        from utils.article_downloader import WeChatArticleDownloader
+
+        completed = 0
+        try:
+            records = self.manifest.load()
+            total = len(records)
+            downloader = WeChatArticleDownloader(save_dir=self.save_dir, lazy_images=False, writer=self.writer)
+
+            # 按Markdown文件分组，每篇文章下载完后改写一次链接
+            by_markdown = {}
+            for record in records:
+                by_markdown.setdefault(record['markdown'], []).append(record)
+
+            for markdown_path, items in by_markdown.items():
+                if not self.running:
+                    break
+                replacements = {}
+                done_keys = set()
+                for record in items:
+                    if not self.running:
+                        break
+                    # 前台下载时让出带宽
+                    while self.running and self.is_busy and self.is_busy():
+                        time.sleep(1)
+
+                    local_filename = downloader.download_backfill_image(record)
+                    if local_filename:
+                        replacements[record['url']] = f'./images/{local_filename}'
+                        done_keys.add((markdown_path, record['url']))
+                    completed += 1
+                    self.backfill_progress.emit(completed, total)
+                    time.sleep(self.delay)
+
+                if replacements:
+                    self._rewrite_links(markdown_path, replacements)
+                    self.manifest.remove(done_keys)
+        except Exception as e:
+            print(f"图片补全出错: {str(e)}")
+        finally:
+            self.running = False
+            self.backfill_completed.emit(completed)
+
+    def _rewrite_links(self, markdown_path, replacements):
+        """将Markdown中的远程图片地址替换为本地路径
+
+        Args:
+            markdown_path: Markdown文件路径
+            replacements: 远程地址 -> 本地路径
+        """
+        if not self.writer.exists(markdown_path):
+            return
+        content = self.writer.read_text(markdown_path)
+        for remote_url, local_path in replacements.items():
+            content = content.replace(f']({remote_url})', f']({local_path})')
+        # 通过写入器改写，同时更新清单中的大小和哈希
+        self.writer.write_text(markdown_path, content)
+        self.writer.commit()
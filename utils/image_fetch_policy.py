@@ -0,0 +1,119 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 图片获取策略
+POLICY_ORIGINAL = 'original'    # 按文章中的地址下载
+POLICY_MAX_WIDTH = 'max_width'  # 请求服务端缩小后的图片
+POLICY_WEBP = 'webp'            # 请求服务端转码的WebP图片
+
+POLICIES = (POLICY_ORIGINAL, POLICY_MAX_WIDTH, POLICY_WEBP)
+
+# 支持按URL参数获取缩略图的微信图片域名
+MMBIZ_HOSTS = ('mmbiz.qpic.cn', 'mmbiz.qlogo.cn')
+
+# 默认最大宽度，与公众号文章页默认加载的尺寸一致
+DEFAULT_MAX_WIDTH = 640
+
+
+class ImageFetchPolicy:
+    """图片获取策略，下载前改写微信图片地址以请求服务端生成的尺寸和格式
+
+    微信图片地址形如 https://mmbiz.qpic.cn/mmbiz_jpg/<id>/640?wx_fmt=jpeg，
+    最后一段路径为宽度（0 表示原图），tp=webp 参数请求WebP格式。
+    """
+
+    def __init__(self, policy=POLICY_ORIGINAL, max_width=DEFAULT_MAX_WIDTH, webp=False):
+        """初始化获取策略
+
+        Args:
+            policy: 策略名称（original/max_width/webp）
+            max_width: max_width 策略下的图片宽度
+            webp: max_width 策略下是否同时请求WebP格式
+        """
+        policy = (policy or POLICY_ORIGINAL).lower()
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的图片获取策略: {policy}")
+        self.policy = policy
+        self.max_width = int(max_width or DEFAULT_MAX_WIDTH)
+        self.webp = bool(webp) or policy == POLICY_WEBP
+
+    @classmethod
+    def from_config(cls, config):
+        """根据配置创建策略
+
+        读取 IMAGE_FETCH_POLICY、IMAGE_MAX_WIDTH、IMAGE_FETCH_WEBP 配置项。
+
+        Args:
+            config: ConfigManager 实例
+
+        Returns:
+            ImageFetchPolicy: 图片获取策略
+        """
+        return cls(
+            policy=config.get('IMAGE_FETCH_POLICY', POLICY_ORIGINAL),
+            max_width=config.get('IMAGE_MAX_WIDTH', DEFAULT_MAX_WIDTH),
+            webp=config.get('IMAGE_FETCH_WEBP', False)
+        )
+
+    @staticmethod
+    def is_mmbiz_url(img_url):
+        """是否为支持尺寸参数的微信图片地址"""
+        host = urlsplit(img_url).hostname or ''
+        return host in MMBIZ_HOSTS
+
+    def rewrite(self, img_url):
+        """按策略改写图片地址
+
+        Args:
+            img_url: 文章中的图片地址
+
+        Returns:
+            tuple: (实际请求的地址, 变体名称)，变体名称如 original、w640、webp、w640_webp
+        """
+        if self.policy == POLICY_ORIGINAL or not self.is_mmbiz_url(img_url):
+            return img_url, 'original'
+
+        parts = urlsplit(img_url)
+        path = parts.path
+        variant = []
+
+        if self.policy == POLICY_MAX_WIDTH:
+            segments = path.rstrip('/').split('/')
+            # 路径形如 /mmbiz_jpg/<id>/<width>，缺少宽度段时补上；
+            # 原地址已请求更小宽度时保留原宽度，宽度0表示原图
+            width = self.max_width
+            if len(segments) >= 4 and segments[-1].isdigit():
+                if int(segments[-1]) > 0:
+                    width = min(int(segments[-1]), self.max_width)
+                segments[-1] = str(width)
+            else:
+                segments.append(str(width))
+            path = '/'.join(segments)
+            variant.append(f'w{width}')
+
+        query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'tp']
+        if self.webp:
+            query.append(('tp', 'webp'))
+            variant.append('webp')
+
+        fetch_url = urlunsplit((parts.scheme, parts.netloc, path, urlencode(query), parts.fragment))
+        return fetch_url, '_'.join(variant) or 'original'
+
+
+_image_fetch_policy = None
+
+def get_image_fetch_policy():
+    """获取全局图片获取策略，读取 config.json 配置，未配置时按原地址下载
+
+    Returns:
+        ImageFetchPolicy: 图片获取策略
+    """
+    global _image_fetch_policy
+    if _image_fetch_policy is None:
+        try:
+            from utils.config_manager import ConfigManager
+            _image_fetch_policy = ImageFetchPolicy.from_config(ConfigManager())
+        except Exception as e:
+            print(f"读取图片获取策略配置失败: {str(e)}")
+            _image_fetch_policy = ImageFetchPolicy()
+    return _image_fetch_policy
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import threading
+
+
+# 索引文件名，位于图片目录下
+INDEX_FILENAME = 'index.jsonl'
+
+# 同一索引文件在进程内共用一把锁，多个下载线程可同时追加
+_index_locks = {}
+_index_locks_guard = threading.Lock()
+
+
+def _get_index_lock(path):
+    with _index_locks_guard:
+        lock = _index_locks.get(path)
+        if lock is None:
+            lock = _index_locks[path] = threading.Lock()
+        return lock
+
+
+class ImageIndex:
+    """图片索引，以JSON Lines格式记录每张本地图片的来源和获取方式"""
+
+    def __init__(self, images_dir):
+        """初始化图片索引
+
+        Args:
+            images_dir: 图片目录
+        """
+        self.images_dir = images_dir
+        self.index_path = os.path.join(images_dir, INDEX_FILENAME)
+        self._lock = _get_index_lock(os.path.abspath(self.index_path))
+
+    def append(self, file, source_url, fetch_url=None, variant='original', fmt=None, size=0, article_title=None):
+        """追加一条图片记录
+
+        Args:
+            file: 图片文件名（相对图片目录）
+            source_url: 文章中的原始图片地址
+            fetch_url: 实际请求的图片地址
+            variant: 获取方式，如 original、w640、webp、w640_webp
+            fmt: 保存的图片格式
+            size: 文件大小（字节）
+            article_title: 所属文章标题
+        """
+        record = {
+            'file': file,
+            'source_url': source_url,
+            'fetch_url': fetch_url or source_url,
+            'variant': variant,
+            'format': fmt,
+            'bytes': size,
+            'article': article_title,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        try:
+            with self._lock:
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        except Exception as e:
+            print(f"写入图片索引失败: {str(e)}")
+
+    def load(self):
+        """读取全部记录，同一文件的多条记录以最后一条为准
+
+        Returns:
+            dict: 文件名 -> 记录
+        """
+        records = {}
+        if not os.path.exists(self.index_path):
+            return records
+        with self._lock:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 忽略写入中断产生的残缺行
+                        continue
+                    records[record.get('file')] = record
+        return records
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+
+# 图片目录布局
+LAYOUT_FLAT = 'flat'        # 所有图片放在 images/ 下，文件名包含文章标题
+LAYOUT_SHARDED = 'sharded'  # 按哈希前缀分到 images/ab/ 子目录，文件名为16位哈希
+
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_SHARDED)
+
+# 图片目录中不参与迁移的元数据文件
+METADATA_FILES = ('index.jsonl', 'pending.jsonl')
+
+
+def get_image_layout():
+    """读取 config.json 中的 IMAGE_LAYOUT 配置
+
+    Returns:
+        str: 图片目录布局（flat/sharded）
+    """
+    try:
+        from utils.config_manager import ConfigManager
+        layout = ConfigManager().get('IMAGE_LAYOUT', LAYOUT_FLAT)
+    except Exception as e:
+        print(f"读取图片目录布局配置失败: {str(e)}")
+        layout = LAYOUT_FLAT
+    return layout if layout in LAYOUTS else LAYOUT_FLAT
+
+
+def sharded_basename(key):
+    """根据图片地址或内容生成分片文件名（不含扩展名）
+
+    Args:
+        key: 图片地址（str）或图片内容（bytes）
+
+    Returns:
+        str: 形如 ab/ab12cd34ef56ab78 的相对路径，同一输入始终得到同一名称
+    """
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    digest = hashlib.sha1(key).hexdigest()[:16]
+    return f'{digest[:2]}/{digest}'
+
+
+def _file_sha1_basename(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    name = digest.hexdigest()[:16]
+    return f'{name[:2]}/{name}'
+
+
+def plan_migration(save_dir):
+    """生成从平铺布局迁移到分片布局的文件对应关系
+
+    有图片索引记录的文件按下载地址命名（与新下载的图片一致），
+    其余文件按内容哈希命名。
+
+    Args:
+        save_dir: 文章保存目录
+
+    Returns:
+        dict: 旧文件名 -> 新文件名（均相对 images/ 目录）
+    """
+    from utils.image_index import ImageIndex
+
+    images_dir = os.path.join(save_dir, 'images')
+    if not os.path.isdir(images_dir):
+        return {}
+
+    records = ImageIndex(images_dir).load()
+    mapping = {}
+    for entry in sorted(os.scandir(images_dir), key=lambda e: e.name):
+        if not entry.is_file() or entry.name in METADATA_FILES or entry.name.endswith('.part'):
+            continue
+        record = records.get(entry.name)
+        if record and record.get('fetch_url'):
+            base = sharded_basename(record['fetch_url'])
+        else:
+            base = _file_sha1_basename(entry.path)
+        ext = os.path.splitext(entry.name)[1].lower() or '.jpg'
+        mapping[entry.name] = f'{base}{ext}'
+    return mapping
+
+
+def migrate_to_sharded(save_dir, dry_run=False):
+    """将已下载的平铺图片迁移为分片布局，并改写Markdown链接和图片索引
+
+    可重复执行，已迁移的文件不会再次处理。
+
+    Args:
+        save_dir: 文章保存目录
+        dry_run: 只输出计划，不修改文件
+
+    Returns:
+        dict: 迁移结果 {'moved': 图片数, 'markdown': 改写的Markdown数, 'mapping': 对应关系}
+    """
+    from utils.atomic_writer import get_atomic_writer
+
+    images_dir = os.path.join(save_dir, 'images')
+    mapping = plan_migration(save_dir)
+    result = {'moved': 0, 'markdown': 0, 'mapping': mapping}
+    if dry_run or not mapping:
+        return result
+
+    writer = get_atomic_writer(save_dir)
+
+    # 先改写Markdown链接，再移动图片；中途中断时重新执行即可继续
+    for entry in os.scandir(save_dir):
+        if not entry.is_file() or not entry.name.endswith('.md'):
+            continue
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        updated = content
+        for old_name, new_name in mapping.items():
+            updated = updated.replace(f'](./images/{old_name})', f'](./images/{new_name})')
+        if updated != content:
+            writer.write_text(entry.path, updated)
+            result['markdown'] += 1
+
+    for old_name, new_name in mapping.items():
+        old_path = os.path.join(images_dir, old_name)
+        new_path = os.path.join(images_dir, *new_name.split('/'))
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        if os.path.exists(new_path):
+            # 相同内容的图片已迁移过，删除重复文件
+            os.remove(old_path)
+        else:
+            os.replace(old_path, new_path)
+            writer.register(new_path)
+        result['moved'] += 1
+    writer.commit()
+
+    _rewrite_index(images_dir, mapping)
+    return result
+
+
+def _rewrite_index(images_dir, mapping):
+    """将图片索引中的文件名更新为分片布局"""
+    index_path = os.path.join(images_dir, METADATA_FILES[0])
+    if not os.path.exists(index_path):
+        return
+    lines = []
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            record['file'] = mapping.get(record.get('file'), record.get('file'))
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, index_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='将已下载的图片迁移为分片目录布局')
+    parser.add_argument('save_dir', help='文章保存目录（包含 images/ 子目录）')
+    parser.add_argument('--dry-run', action='store_true', help='只显示迁移计划')
+    args = parser.parse_args(argv)
+
+    result = migrate_to_sharded(args.save_dir, dry_run=args.dry_run)
+    if args.dry_run:
+        for old_name, new_name in result['mapping'].items():
+            print(f"{old_name} -> {new_name}")
+        print(f"共 {len(result['mapping'])} 张图片待迁移")
+    else:
+        print(f"已迁移 {result['moved']} 张图片，改写 {result['markdown']} 个Markdown文件")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
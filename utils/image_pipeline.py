@@ -0,0 +1,225 @@
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+# 图片格式对应的文件扩展名
+FORMAT_EXTENSIONS = {
+    'jpeg': 'jpg',
+    'png': 'png',
+    'gif': 'gif',
+    'webp': 'webp',
+    'bmp': 'bmp',
+    'avif': 'avif'
+}
+
+# 支持转码的目标格式
+TARGET_FORMATS = ('webp', 'avif', 'jpeg')
+
+
+def sniff_image_format(data):
+    """根据文件头识别图片真实格式
+
+    Args:
+        data: 图片文件开头的字节（至少16字节）
+
+    Returns:
+        str or None: 图片格式（jpeg/png/gif/webp/bmp/avif），无法识别返回None
+    """
+    if not data:
+        return None
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if data.startswith(b'BM'):
+        return 'bmp'
+    if data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis'):
+        return 'avif'
+    return None
+
+
+def format_from_url(img_url):
+    """从微信图片地址的 wx_fmt 参数推断格式
+
+    Args:
+        img_url: 图片地址
+
+    Returns:
+        str or None: 图片格式
+    """
+    if 'wx_fmt=' not in img_url:
+        return None
+    fmt = img_url.split('wx_fmt=', 1)[1].split('&', 1)[0].lower()
+    if fmt == 'jpg':
+        fmt = 'jpeg'
+    return fmt if fmt in FORMAT_EXTENSIONS else None
+
+
+def get_extension(fmt, default='jpg'):
+    """获取图片格式对应的扩展名"""
+    return FORMAT_EXTENSIONS.get(fmt, default)
+
+
+def process_image_file(file_path, target_format=None, max_dimension=0, quality=80):
+    """转码并缩放单张图片，在子进程中执行
+
+    动图保持原样；转码后体积反而变大且未缩放时保留原图。
+
+    Args:
+        file_path: 图片文件路径
+        target_format: 目标格式（webp/avif/jpeg），None 表示保持原格式
+        max_dimension: 最长边上限（像素），0 表示不缩放
+        quality: 有损压缩质量
+
+    Returns:
+        tuple: (处理后的文件路径, 耗时秒数)
+    """
+    start = time.perf_counter()
+    from PIL import Image
+
+    with open(file_path, 'rb') as f:
+        source_format = sniff_image_format(f.read(16))
+
+    with Image.open(file_path) as img:
+        if getattr(img, 'is_animated', False):
+            return file_path, time.perf_counter() - start
+
+        resize = bool(max_dimension) and max(img.size) > max_dimension
+        output_format = target_format or source_format or 'jpeg'
+        if not resize and output_format == source_format:
+            return file_path, time.perf_counter() - start
+
+        if resize:
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        else:
+            img.load()
+
+        if output_format == 'jpeg' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        elif img.mode == 'P':
+            img = img.convert('RGBA')
+
+        if output_format == 'avif':
+            # Pillow 需要 pillow-avif-plugin 才能保存AVIF
+            try:
+                import pillow_avif  # noqa: F401
+            except ImportError:
+                pass
+
+        output_path = f"{os.path.splitext(file_path)[0]}.{get_extension(output_format)}"
+        tmp_path = f"{output_path}.tmp"
+        try:
+            img.save(tmp_path, format=output_format.upper(), quality=quality)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    if not resize and os.path.getsize(tmp_path) >= os.path.getsize(file_path):
+        os.remove(tmp_path)
+        return file_path, time.perf_counter() - start
+
+    os.replace(tmp_path, output_path)
+    if output_path != file_path:
+        os.remove(file_path)
+    return output_path, time.perf_counter() - start
+
+
+class ImagePipeline:
+    """图片后处理流水线，在进程池中转码和缩放已下载的图片"""
+
+    def __init__(self, target_format=None, max_dimension=0, quality=80, workers=None):
+        """初始化流水线
+
+        Args:
+            target_format: 目标格式（webp/avif/jpeg），None 表示保持原格式
+            max_dimension: 最长边上限（像素），0 表示不缩放
+            quality: 有损压缩质量
+            workers: 进程数，默认由系统决定
+        """
+        target_format = (target_format or '').lower() or None
+        if target_format == 'jpg':
+            target_format = 'jpeg'
+        if target_format and target_format not in TARGET_FORMATS:
+            raise ValueError(f"不支持的图片格式: {target_format}")
+
+        self.target_format = target_format
+        self.max_dimension = int(max_dimension or 0)
+        self.quality = int(quality)
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """是否需要对图片做后处理"""
+        return bool(self.target_format or self.max_dimension)
+
+    def _get_executor(self):
+        """延迟创建进程池，无法创建时退回线程池"""
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                except Exception as e:
+                    print(f"创建图片处理进程池失败，改用线程池: {str(e)}")
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def submit(self, file_path):
+        """提交图片处理任务
+
+        Args:
+            file_path: 已下载的图片文件路径
+
+        Returns:
+            Future or None: 结果为 (处理后的文件路径, 耗时)，未启用时返回None
+        """
+        if not self.enabled:
+            return None
+        return self._get_executor().submit(
+            process_image_file, file_path, self.target_format, self.max_dimension, self.quality
+        )
+
+    def shutdown(self, wait=True):
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+_image_pipeline = None
+_image_pipeline_lock = threading.Lock()
+
+def get_image_pipeline():
+    """获取全局图片处理流水线
+
+    读取 config.json 中的 IMAGE_FORMAT、IMAGE_MAX_DIMENSION、IMAGE_QUALITY、IMAGE_WORKERS，
+    均未配置时返回未启用的流水线，图片按原样保存。
+
+    Returns:
+        ImagePipeline: 图片处理流水线
+    """
+    global _image_pipeline
+    with _image_pipeline_lock:
+        if _image_pipeline is None:
+            try:
+                from utils.config_manager import ConfigManager
+                config = ConfigManager()
+                _image_pipeline = ImagePipeline(
+                    target_format=config.get('IMAGE_FORMAT'),
+                    max_dimension=config.get('IMAGE_MAX_DIMENSION', 0),
+                    quality=config.get('IMAGE_QUALITY', 80),
+                    workers=config.get('IMAGE_WORKERS')
+                )
+            except Exception as e:
+                print(f"读取图片处理配置失败: {str(e)}")
+                _image_pipeline = ImagePipeline()
+        return _image_pipeline
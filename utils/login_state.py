@@ -0,0 +1,251 @@
+import threading
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from utils.wechat_login import (get_wechat_login, next_poll_interval, QR_STATUS_CONFIRMED,
+                                QR_STATUS_EXPIRED, QR_STATUS_SCANNED)
+
+
+# 登录状态
+STATE_LOGGED_OUT = 'logged_out'    # 未登录
+STATE_VALIDATING = 'validating'    # 正在后台验证本地cookies
+STATE_QR_WAITING = 'qr_waiting'    # 二维码已显示，等待扫码
+STATE_QR_SCANNED = 'qr_scanned'    # 已扫码，等待确认
+STATE_LOGGED_IN = 'logged_in'      # 已登录
+STATE_FAILED = 'failed'            # 登录出错
+
+# 二维码过期后自动刷新的次数，超过后需用户重新发起登录
+MAX_QR_REFRESH = 3
+
+
+class _ValidateWorker(QThread):
+    """后台验证本地保存的cookies"""
+    finished_with = pyqtSignal(object, str)  # 有效时为登录信息否则为None, 错误信息
+
+    def __init__(self, wechat_api):
+        super().__init__()
+        self.wechat_api = wechat_api
+
+    def run(self):
+        try:
+            session, login_info = self.wechat_api.load_cached_login()
+            if session is None or not self.wechat_api.check_session(session):
+                login_info = None
+            self.finished_with.emit(login_info, '')
+        except Exception as e:
+            self.finished_with.emit(None, str(e))
+
+
+class _QRLoginWorker(QThread):
+    """扫码登录：获取二维码并按状态调整轮询间隔，可随时取消"""
+    qrcode_ready = pyqtSignal(bytes)
+    qr_status = pyqtSignal(object)
+    login_success = pyqtSignal(dict)
+    login_failed = pyqtSignal(str)
+
+    def __init__(self, wechat_api):
+        super().__init__()
+        self.wechat_api = wechat_api
+        self._stop = threading.Event()
+
+    def stop(self):
+        """请求停止，正在等待的轮询立即结束"""
+        self._stop.set()
+
+    def run(self):
+        try:
+            refreshes = 0
+            while not self._stop.is_set():
+                session, qrcode = self.wechat_api.start_qr_session()
+                if self._stop.is_set():
+                    return
+                self.qrcode_ready.emit(qrcode)
+
+                status = self._poll(session)
+                if status == QR_STATUS_CONFIRMED:
+                    login_info = self.wechat_api.finish_qr_login(session)
+                    if not self._stop.is_set():
+                        self.login_success.emit(login_info)
+                    return
+                if status is None:
+                    return
+
+                # 二维码已过期，自动刷新
+                refreshes += 1
+                if refreshes > MAX_QR_REFRESH:
+                    self.login_failed.emit('二维码已过期，请重新登录')
+                    return
+        except Exception as e:
+            if not self._stop.is_set():
+                self.login_failed.emit(str(e))
+
+    def _poll(self, session):
+        """轮询直到确认登录或二维码过期
+
+        Returns:
+            int: QR_STATUS_CONFIRMED 或过期状态，已取消时为None
+        """
+        interval = None
+        last_status = None
+        while not self._stop.is_set():
+            status = self.wechat_api.ask_qr_status(session)
+            if status == QR_STATUS_CONFIRMED or status in QR_STATUS_EXPIRED:
+                return status
+            if status != last_status:
+                self.qr_status.emit(status)
+                last_status = status
+            interval = next_poll_interval(status, interval)
+            if self._stop.wait(interval):
+                break
+        return None
+
+
+class WeChatLoginManager(QObject):
+    """公众号登录状态机
+
+    validate() 在后台验证本地cookies，有效时发出 login_ready，
+    无效时发出 login_required；start_qr_login() 开始扫码登录，
+    二维码状态通过 status_update 通知，过期后自动刷新。
+    所有信号都在界面线程中发出，调用方法不会阻塞界面。
+    """
+
+    state_changed = pyqtSignal(str)    # 新状态
+    login_ready = pyqtSignal(dict)     # 登录信息 {'token', 'cookie'}
+    login_required = pyqtSignal()      # 本地没有有效登录，需要扫码
+    qrcode_ready = pyqtSignal(bytes)   # 二维码图片
+    status_update = pyqtSignal(str)    # 提示文本
+    login_failed = pyqtSignal(str)     # 错误信息
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.wechat_api = get_wechat_login()
+        self.state = STATE_LOGGED_OUT
+        self.login_info = None
+        self._qr_worker = None
+        # 运行中的工作线程，结束前保持引用
+        self._workers = set()
+
+    def is_ready(self):
+        """是否已登录"""
+        return self.state == STATE_LOGGED_IN and self.login_info is not None
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.state_changed.emit(state)
+
+    def validate(self):
+        """后台验证本地保存的登录信息，验证或扫码进行中时不重复发起"""
+        if self.state in (STATE_VALIDATING, STATE_QR_WAITING, STATE_QR_SCANNED):
+            return
+        if self.is_ready():
+            self.login_ready.emit(self.login_info)
+            return
+
+        self._set_state(STATE_VALIDATING)
+        self.status_update.emit("正在验证登录状态...")
+        worker = _ValidateWorker(self.wechat_api)
+        worker.finished_with.connect(self._on_validated)
+        self._start_worker(worker)
+
+    def _start_worker(self, worker):
+        self._workers.add(worker)
+        worker.finished.connect(lambda: self._workers.discard(worker))
+        worker.start()
+
+    def _on_validated(self, login_info, error):
+        if self.state != STATE_VALIDATING:
+            # 验证期间已开始扫码或已注销
+            return
+        if error:
+            print(f"验证登录状态失败: {error}")
+        if login_info:
+            self._on_logged_in(login_info)
+        else:
+            self._set_state(STATE_LOGGED_OUT)
+            self.login_required.emit()
+
+    def start_qr_login(self):
+        """开始扫码登录，已在进行中的扫码会被取消"""
+        self._stop_qr_worker()
+        self._set_state(STATE_QR_WAITING)
+        self.status_update.emit("正在获取二维码...")
+
+        worker = _QRLoginWorker(self.wechat_api)
+        worker.qrcode_ready.connect(self._on_qrcode_ready)
+        worker.qr_status.connect(self._on_qr_status)
+        worker.login_success.connect(self._on_qr_login_success)
+        worker.login_failed.connect(self._on_qr_login_failed)
+        self._qr_worker = worker
+        self._start_worker(worker)
+
+    def cancel_qr_login(self):
+        """取消扫码登录"""
+        self._stop_qr_worker()
+        if self.state in (STATE_QR_WAITING, STATE_QR_SCANNED):
+            self._set_state(STATE_LOGGED_OUT)
+
+    def _stop_qr_worker(self):
+        worker, self._qr_worker = self._qr_worker, None
+        if worker is not None:
+            worker.stop()
+
+    def _is_current_qr(self):
+        """信号是否来自当前的扫码线程，已取消的线程发出的信号直接丢弃"""
+        return self._qr_worker is not None and self.sender() is self._qr_worker
+
+    def _on_qrcode_ready(self, qrcode):
+        if not self._is_current_qr():
+            return
+        self._set_state(STATE_QR_WAITING)
+        self.qrcode_ready.emit(qrcode)
+        self.status_update.emit("二维码未失效，请扫码！")
+
+    def _on_qr_status(self, status):
+        if not self._is_current_qr():
+            return
+        if status in QR_STATUS_SCANNED:
+            self._set_state(STATE_QR_SCANNED)
+            self.status_update.emit("已扫码，请确认！")
+        else:
+            self._set_state(STATE_QR_WAITING)
+            self.status_update.emit("二维码未失效，请扫码！")
+
+    def _on_qr_login_success(self, login_info):
+        if not self._is_current_qr():
+            return
+        self._qr_worker = None
+        self.status_update.emit("已确认，登录成功！")
+        self._on_logged_in(login_info)
+
+    def _on_qr_login_failed(self, error):
+        if not self._is_current_qr():
+            return
+        self._qr_worker = None
+        self._set_state(STATE_FAILED)
+        self.login_failed.emit(error)
+
+    def _on_logged_in(self, login_info):
+        self.login_info = login_info
+        self._set_state(STATE_LOGGED_IN)
+        self.login_ready.emit(login_info)
+
+    def logout(self):
+        """注销：取消进行中的登录并删除本地cookies"""
+        self._stop_qr_worker()
+        self.wechat_api.clear_cached_login()
+        self.login_info = None
+        self._set_state(STATE_LOGGED_OUT)
+
+
+_login_manager = None
+
+def get_login_manager():
+    """获取全局公众号登录状态机，需在界面线程中首次调用
+
+    Returns:
+        WeChatLoginManager: 登录状态机
+    """
+    global _login_manager
+    if _login_manager is None:
+        _login_manager = WeChatLoginManager()
+    return _login_manager
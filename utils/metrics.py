@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 各阶段耗时直方图的分桶上限（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 抓取流程中的标准阶段名称
+STAGE_HTTP_TTFB = 'http_ttfb'          # 发出请求到收到响应头（包含DNS解析与建立连接）
+STAGE_SEARCH_GZH = 'search_gzh'        # 搜索公众号fakeid
+STAGE_PAGE_FETCH = 'page_fetch'        # 抓取文章列表分页
+STAGE_ARTICLE_FETCH = 'article_fetch'  # 下载文章HTML
+STAGE_PARSE = 'parse'                  # 解析HTML
+STAGE_CONVERT = 'convert'              # 转换为Markdown
+STAGE_IMAGE_FETCH = 'image_fetch'      # 下载单张图片
+STAGE_IMAGE_PROCESS = 'image_process'  # 图片转码与缩放（在进程池中执行）
+STAGE_DISK_WRITE = 'disk_write'        # 写入Markdown文件
+STAGE_DB_SAVE = 'db_save'              # 保存文章到数据库
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # 最后一个桶对应 +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        """记录一次观测值"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self):
+        """导出为字典，分桶计数为累计值"""
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            cumulative.append(['+Inf' if bound == float('inf') else bound, running])
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'buckets': cumulative
+        }
+
+
+class MetricsRegistry:
+    """抓取流程指标注册表，记录各阶段耗时、传输字节数和错误数"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._bytes = {}
+        self._errors = {}
+        self._counters = {}
+
+    def observe(self, stage, seconds):
+        """记录某阶段的一次耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒）
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """计时上下文管理器，代码块抛出异常时同时累加该阶段的错误数
+
+        Args:
+            stage: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc_error(stage, type(e).__name__)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe_response(self, response, stage=None):
+        """记录HTTP响应的首字节耗时和传输字节数
+
+        requests 不单独暴露DNS解析和建立连接的耗时，response.elapsed
+        为发出请求到解析完响应头的时间，统一记入 http_ttfb 阶段。
+
+        Args:
+            response: requests.Response 对象
+            stage: 统计字节数的阶段名称，流式下载时不传，由调用方通过 add_bytes 统计
+        """
+        elapsed = getattr(response, 'elapsed', None)
+        if elapsed is not None:
+            self.observe(STAGE_HTTP_TTFB, elapsed.total_seconds())
+        if stage:
+            self.add_bytes(stage, len(response.content or b''))
+
+    def add_bytes(self, stage, count):
+        """累加某阶段传输的字节数"""
+        with self._lock:
+            self._bytes[stage] = self._bytes.get(stage, 0) + count
+
+    def inc_error(self, stage, kind='error'):
+        """累加某阶段的错误数
+
+        Args:
+            stage: 阶段名称
+            kind: 错误类型（如异常类名或HTTP状态码）
+        """
+        key = (stage, str(kind))
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def inc(self, name, value=1):
+        """累加通用计数器（如下载文章数、图片数）"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self.started_at = time.time()
+            self._histograms.clear()
+            self._bytes.clear()
+            self._errors.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """导出当前指标快照
+
+        Returns:
+            dict: 指标快照
+        """
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime': round(time.time() - self.started_at, 3),
+                'stages': {stage: h.to_dict() for stage, h in self._histograms.items()},
+                'bytes': dict(self._bytes),
+                'errors': [
+                    {'stage': stage, 'kind': kind, 'count': count}
+                    for (stage, kind), count in self._errors.items()
+                ],
+                'counters': dict(self._counters)
+            }
+
+    def to_prometheus(self):
+        """导出为Prometheus文本格式
+
+        Returns:
+            str: Prometheus exposition 格式的指标文本
+        """
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP mpcrawler_stage_seconds Per-stage latency of the crawl pipeline.',
+            '# TYPE mpcrawler_stage_seconds histogram'
+        ]
+        for stage, data in sorted(snapshot['stages'].items()):
+            for bound, count in data['buckets']:
+                lines.append(f'mpcrawler_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'mpcrawler_stage_seconds_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'mpcrawler_stage_seconds_count{{stage="{stage}"}} {data["count"]}')
+
+        lines.append('# HELP mpcrawler_bytes_total Bytes transferred per stage.')
+        lines.append('# TYPE mpcrawler_bytes_total counter')
+        for stage, count in sorted(snapshot['bytes'].items()):
+            lines.append(f'mpcrawler_bytes_total{{stage="{stage}"}} {count}')
+
+        lines.append('# HELP mpcrawler_errors_total Errors per stage and kind.')
+        lines.append('# TYPE mpcrawler_errors_total counter')
+        for error in snapshot['errors']:
+            lines.append(f'mpcrawler_errors_total{{stage="{error["stage"]}",kind="{error["kind"]}"}} {error["count"]}')
+
+        lines.append('# HELP mpcrawler_events_total Generic crawl counters.')
+        lines.append('# TYPE mpcrawler_events_total counter')
+        for name, count in sorted(snapshot['counters'].items()):
+            lines.append(f'mpcrawler_events_total{{name="{name}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """指标HTTP接口：/metrics 返回Prometheus文本，/metrics.json 返回JSON快照"""
+
+    registry = None
+
+    def do_GET(self):
+        if self.path.startswith('/metrics.json'):
+            body = json.dumps(self.registry.snapshot(), ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        elif self.path.startswith('/metrics'):
+            body = self.registry.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 不在控制台输出访问日志
+        pass
+
+
+class MetricsExporter:
+    """指标导出器，提供HTTP接口和定期JSON快照两种导出方式"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._server = None
+        self._snapshot_thread = None
+        self._stop_event = threading.Event()
+
+    def start_http_server(self, port, host='127.0.0.1'):
+        """启动指标HTTP服务
+
+        Args:
+            port: 监听端口
+            host: 监听地址，默认仅本机访问
+
+        Returns:
+            bool: 是否启动成功
+        """
+        if self._server:
+            return True
+        try:
+            handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'registry': self.registry})
+            self._server = ThreadingHTTPServer((host, int(port)), handler)
+            thread = threading.Thread(target=self._server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            return True
+        except Exception as e:
+            print(f"启动指标服务失败: {str(e)}")
+            self._server = None
+            return False
+
+    def start_snapshot_writer(self, path, interval=60):
+        """定期将指标快照写入JSON文件
+
+        Args:
+            path: 快照文件路径
+            interval: 写入间隔（秒）
+        """
+        if self._snapshot_thread:
+            return
+        self._stop_event.clear()
+
+        def _loop():
+            while not self._stop_event.wait(interval):
+                self.write_snapshot(path)
+            # 停止时再写入一次，保证最后的数据落盘
+            self.write_snapshot(path)
+
+        self._snapshot_thread = threading.Thread(target=_loop)
+        self._snapshot_thread.daemon = True
+        self._snapshot_thread.start()
+
+    def write_snapshot(self, path):
+        """立即写入一次指标快照
+
+        Args:
+            path: 快照文件路径
+
+        Returns:
+            bool: 是否写入成功
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.registry.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"写入指标快照失败: {str(e)}")
+            return False
+
+    def stop(self):
+        """停止HTTP服务和快照线程"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._snapshot_thread:
+            self._stop_event.set()
+            self._snapshot_thread.join(timeout=5)
+            self._snapshot_thread = None
+
+
+_metrics = None
+_exporter = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """获取全局指标注册表
+
+    Returns:
+        MetricsRegistry: 指标注册表
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
+
+def start_metrics_exporter(port=None, snapshot_path=None, snapshot_interval=60):
+    """启动全局指标导出
+
+    未显式传入参数时读取环境变量 MP_METRICS_PORT、MP_METRICS_SNAPSHOT，
+    两者都未配置时不启动任何导出。
+
+    Args:
+        port: 指标HTTP服务端口
+        snapshot_path: JSON快照文件路径，传入 'default' 时使用 logs/metrics.json
+        snapshot_interval: 快照写入间隔（秒）
+
+    Returns:
+        MetricsExporter or None: 指标导出器
+    """
+    global _exporter
+    port = port or os.environ.get('MP_METRICS_PORT')
+    snapshot_path = snapshot_path or os.environ.get('MP_METRICS_SNAPSHOT')
+    if not port and not snapshot_path:
+        return None
+
+    if snapshot_path == 'default':
+        # 获取应用程序根目录
+        if getattr(sys, 'frozen', False):
+            # 打包后的应用
+            base_dir = os.path.dirname(sys.executable)
+        else:
+            # 开发环境
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        snapshot_path = os.path.join(base_dir, 'logs', 'metrics.json')
+
+    registry = get_metrics()
+    with _metrics_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(registry)
+    if port:
+        _exporter.start_http_server(port)
+    if snapshot_path:
+        _exporter.start_snapshot_writer(snapshot_path, snapshot_interval)
+    return _exporter
@@ -0,0 +1,281 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from utils.url_canonical import article_identity
+
+
+# 近似重复文章的处理方式
+POLICY_OFF = 'off'    # 不检测
+POLICY_FLAG = 'flag'  # 正常保存，记入重复文章清单
+POLICY_LINK = 'link'  # 只保存指向已有文章的Markdown，不下载图片
+POLICY_SKIP = 'skip'  # 不保存
+
+POLICIES = (POLICY_OFF, POLICY_FLAG, POLICY_LINK, POLICY_SKIP)
+
+# 指纹索引和重复文章清单，位于输出根目录下
+INDEX_FILENAME = '.simhash.jsonl'
+DUPLICATES_FILENAME = '.duplicates.jsonl'
+
+# SimHash位数，按16位分成4段建立分桶索引
+FINGERPRINT_BITS = 64
+BAND_BITS = 16
+BANDS = FINGERPRINT_BITS // BAND_BITS
+
+# 默认汉明距离阈值；阈值小于段数时，任意近似重复的指纹至少有一段完全相同
+DEFAULT_MAX_DISTANCE = 3
+
+# 正文过短（如纯图片文章）时指纹区分度低，不参与检测
+MIN_TEXT_LENGTH = 200
+
+# 字符n-gram长度，对中文不需要分词
+SHINGLE_SIZE = 3
+
+_MARKDOWN_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_URL = re.compile(r'https?://\S+')
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_text(text):
+    """去掉链接、图片、标点和空白，只保留正文文字
+
+    Args:
+        text: Markdown或纯文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    text = _MARKDOWN_LINK.sub(r'\1', text or '')
+    text = _URL.sub('', text)
+    return _NON_WORD.sub('', text).lower()
+
+
+def _hash64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text):
+    """计算文本的64位SimHash指纹
+
+    Args:
+        text: Markdown或纯文本
+
+    Returns:
+        int or None: 指纹，正文过短时返回None
+    """
+    text = normalize_text(text)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+
+    shingles = Counter(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        value = _hash64(shingle)
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    """两个指纹的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """近似重复文章索引
+
+    指纹按4个16位分段建立分桶，查找时只比较至少一段相同的候选，
+    不需要与全部文章逐一比较。索引以JSON Lines保存，重新运行时加载。
+    """
+
+    def __init__(self, root_dir, max_distance=DEFAULT_MAX_DISTANCE):
+        """初始化索引
+
+        Args:
+            root_dir: 输出根目录
+            max_distance: 视为重复的最大汉明距离，需小于分段数
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_path = os.path.join(self.root_dir, INDEX_FILENAME)
+        self.duplicates_path = os.path.join(self.root_dir, DUPLICATES_FILENAME)
+        self.max_distance = min(int(max_distance), BANDS - 1)
+        self._lock = threading.Lock()
+        self._entries = []
+        self._buckets = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 忽略写入中断产生的残缺行
+                        continue
+                    self._insert(entry)
+        except Exception as e:
+            print(f"加载文章指纹索引失败: {str(e)}")
+
+    def _insert(self, entry):
+        position = len(self._entries)
+        self._entries.append(entry)
+        fingerprint = int(entry['fingerprint'], 16)
+        for key in _bands(fingerprint):
+            self._buckets.setdefault(key, []).append(position)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, fingerprint, url=None, markdown_path=None):
+        """查找与指纹近似重复的已保存文章
+
+        同一篇文章重新下载时不应与自己上次保存的指纹匹配，因此跳过链接标识
+        或Markdown路径与本篇相同的记录。
+
+        Args:
+            fingerprint: SimHash指纹
+            url: 本篇文章链接
+            markdown_path: 本篇文章的Markdown路径
+
+        Returns:
+            tuple or None: (索引记录, 汉明距离)，取距离最小的一篇
+        """
+        if fingerprint is None:
+            return None
+        identity = article_identity(url) if url else None
+        relpath = self._relpath(markdown_path) if markdown_path else None
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in _bands(fingerprint):
+                candidates.update(self._buckets.get(key, ()))
+            for position in candidates:
+                entry = self._entries[position]
+                if relpath and entry['markdown'] == relpath:
+                    continue
+                if identity and entry.get('url') and article_identity(entry['url']) == identity:
+                    continue
+                distance = hamming_distance(fingerprint, int(entry['fingerprint'], 16))
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (dict(entry), distance)
+        return best
+
+    def add(self, fingerprint, markdown_path, url=None, title=None):
+        """记录已保存文章的指纹
+
+        Args:
+            fingerprint: SimHash指纹
+            markdown_path: Markdown文件路径
+            url: 文章链接
+            title: 文章标题
+        """
+        if fingerprint is None:
+            return
+        entry = {
+            'fingerprint': f'{fingerprint:016x}',
+            'markdown': self._relpath(markdown_path),
+            'url': url,
+            'title': title
+        }
+        self._append(self.index_path, entry, insert=True)
+
+    def record_duplicate(self, markdown_path, url, title, match, distance, policy):
+        """将检测到的重复文章记入清单
+
+        Args:
+            markdown_path: 本篇保存的Markdown路径（跳过时为None）
+            url: 文章链接
+            title: 文章标题
+            match: 已有文章的索引记录
+            distance: 汉明距离
+            policy: 处理方式
+        """
+        entry = {
+            'url': url,
+            'title': title,
+            'markdown': self._relpath(markdown_path) if markdown_path else None,
+            'duplicate_of': match['markdown'],
+            'duplicate_url': match.get('url'),
+            'distance': distance,
+            'policy': policy,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self._append(self.duplicates_path, entry)
+
+    def _relpath(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root_dir).replace(os.sep, '/')
+
+    def _append(self, path, entry, insert=False):
+        try:
+            with self._lock:
+                os.makedirs(self.root_dir, exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                if insert:
+                    self._insert(entry)
+        except Exception as e:
+            print(f"写入文章指纹索引失败: {str(e)}")
+
+
+def get_near_duplicate_policy():
+    """读取 config.json 中的 NEAR_DUPLICATE_POLICY 配置
+
+    Returns:
+        str: 处理方式（off/flag/link/skip）
+    """
+    try:
+        from utils.config_manager import ConfigManager
+        policy = ConfigManager().get('NEAR_DUPLICATE_POLICY', POLICY_OFF)
+    except Exception as e:
+        print(f"读取重复文章检测配置失败: {str(e)}")
+        policy = POLICY_OFF
+    return policy if policy in POLICIES else POLICY_OFF
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_near_duplicate_index(root_dir):
+    """获取输出目录对应的指纹索引，同一目录在进程内共用一个实例
+
+    读取 config.json 中的 NEAR_DUPLICATE_DISTANCE 作为汉明距离阈值。
+
+    Args:
+        root_dir: 输出根目录
+
+    Returns:
+        NearDuplicateIndex: 指纹索引
+    """
+    key = os.path.abspath(root_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            try:
+                from utils.config_manager import ConfigManager
+                max_distance = ConfigManager().get('NEAR_DUPLICATE_DISTANCE', DEFAULT_MAX_DISTANCE)
+            except Exception:
+                max_distance = DEFAULT_MAX_DISTANCE
+            index = _indexes[key] = NearDuplicateIndex(key, max_distance)
+        return index
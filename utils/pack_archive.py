@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+# 归档文件扩展名
+PACK_EXTENSION = '.pack'
+INDEX_EXTENSION = '.idx'
+
+# 流式写入时内存缓冲上限，超过后落到临时文件
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# 默认每写入多少个成员执行一次批量fsync
+DEFAULT_FSYNC_BATCH = 64
+
+
+def _load_index(index_path):
+    """读取归档索引，同名成员以最后一条为准"""
+    entries = {}
+    if not os.path.exists(index_path):
+        return entries
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 忽略写入中断产生的残缺行
+                continue
+            entries[entry['path']] = entry
+    return entries
+
+
+class PackArchiveWriter:
+    """单文件归档写入器
+
+    文章和图片依次追加到 <名称>.pack，<名称>.idx 以JSON Lines记录每个成员的
+    偏移、大小和SHA-256，支持随机读取。接口与 AtomicFileWriter 一致，
+    下载器无需区分输出格式。
+    """
+
+    def __init__(self, root_dir, archive_name='articles', fsync_batch=DEFAULT_FSYNC_BATCH):
+        """初始化归档写入器
+
+        Args:
+            root_dir: 输出根目录，成员名称为相对该目录的路径
+            archive_name: 归档名称（通常为公众号名称）
+            fsync_batch: 每批fsync的成员数
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.archive_name = archive_name
+        self.pack_path = os.path.join(self.root_dir, f"{archive_name}{PACK_EXTENSION}")
+        self.index_path = os.path.join(self.root_dir, f"{archive_name}{INDEX_EXTENSION}")
+        # 需要在磁盘上处理的文件（如待转码图片）先放在暂存目录
+        self.staging_dir = os.path.join(self.root_dir, '.staging', archive_name)
+        self.fsync_batch = max(1, int(fsync_batch))
+        self._lock = threading.RLock()
+        self._pending = []
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._entries = _load_index(self.index_path)
+        self._pack = open(self.pack_path, 'ab+')
+        self._recover()
+
+    def _recover(self):
+        """截掉上次中断时写入了数据但未写入索引的尾部"""
+        end = max((entry['offset'] + entry['size'] for entry in self._entries.values()), default=0)
+        self._pack.seek(0, os.SEEK_END)
+        if self._pack.tell() > end:
+            self._pack.truncate(end)
+        self._offset = end
+
+    def _relpath(self, path):
+        """转换为归档中的成员名称"""
+        if not os.path.isabs(path):
+            return path.replace(os.sep, '/')
+        return os.path.relpath(path, self.root_dir).replace(os.sep, '/')
+
+    def exists(self, path):
+        """成员是否存在（包括尚未落盘的成员）"""
+        name = self._relpath(path)
+        with self._lock:
+            return name in self._entries or any(entry['path'] == name for entry in self._pending)
+
+    def is_complete(self, path, verify_hash=False):
+        """成员是否已完整写入并落盘
+
+        Args:
+            path: 成员路径
+            verify_hash: 是否重新计算SHA-256校验内容
+
+        Returns:
+            bool: 是否完整
+        """
+        with self._lock:
+            entry = self._entries.get(self._relpath(path))
+        if not entry:
+            return False
+        if verify_hash:
+            return hashlib.sha256(self.read_bytes(path)).hexdigest() == entry['sha256']
+        return True
+
+    def get_entry(self, path):
+        """获取索引中的记录"""
+        with self._lock:
+            entry = self._entries.get(self._relpath(path))
+            return dict(entry) if entry else None
+
+    def read_bytes(self, path):
+        """读取成员内容（包括尚未落盘的成员）"""
+        name = self._relpath(path)
+        with self._lock:
+            entry = self._entries.get(name)
+            for pending in self._pending:
+                if pending['path'] == name:
+                    entry = pending
+            if not entry:
+                raise FileNotFoundError(name)
+            self._pack.flush()
+            with open(self.pack_path, 'rb') as f:
+                f.seek(entry['offset'])
+                return f.read(entry['size'])
+
+    def read_text(self, path, encoding='utf-8'):
+        """读取文本成员"""
+        return self.read_bytes(path).decode(encoding)
+
+    def write_bytes(self, path, data):
+        """追加二进制成员"""
+        return self.write_stream(path, [data])
+
+    def write_text(self, path, text, encoding='utf-8'):
+        """追加文本成员"""
+        return self.write_stream(path, [text.encode(encoding)])
+
+    def write_stream(self, path, chunks):
+        """追加成员内容
+
+        先在内存（超过上限时为临时文件）中缓冲完整内容，再加锁一次性追加，
+        避免多个下载线程交错写入，也不会在网络读取期间占用锁。
+
+        Args:
+            path: 成员路径
+            chunks: 字节块迭代器
+
+        Returns:
+            dict: 成员记录（offset、size、sha256）
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            for chunk in chunks:
+                if chunk:
+                    spool.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            spool.seek(0)
+            with self._lock:
+                offset = self._offset
+                self._pack.seek(0, os.SEEK_END)
+                shutil.copyfileobj(spool, self._pack)
+                self._offset += size
+                return self._add_pending(path, offset, size, digest.hexdigest())
+
+    def staging_path(self, path):
+        """获取需要在磁盘上处理的文件的暂存路径"""
+        return os.path.join(self.staging_dir, self._relpath(path))
+
+    def write_staging(self, path, chunks):
+        """将内容写入暂存文件，供子进程处理后再通过 register 收入归档
+
+        Returns:
+            tuple: (暂存文件路径, 大小)
+        """
+        staging = self.staging_path(path)
+        os.makedirs(os.path.dirname(staging), exist_ok=True)
+        size = 0
+        with open(staging, 'wb') as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    size += len(chunk)
+        return staging, size
+
+    def register(self, disk_path, path=None):
+        """将磁盘上的文件收入归档并删除该文件
+
+        Args:
+            disk_path: 磁盘文件路径（通常为暂存文件）
+            path: 成员路径，默认与 disk_path 相同
+
+        Returns:
+            dict: 成员记录
+        """
+        with open(disk_path, 'rb') as f:
+            entry = self.write_stream(path or disk_path, iter(lambda: f.read(1024 * 1024), b''))
+        if os.path.abspath(disk_path).startswith(self.staging_dir):
+            os.remove(disk_path)
+        return entry
+
+    def _add_pending(self, path, offset, size, sha256):
+        entry = {
+            'path': self._relpath(path),
+            'offset': offset,
+            'size': size,
+            'sha256': sha256,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self._pending.append(entry)
+        if len(self._pending) >= self.fsync_batch:
+            self.commit()
+        return entry
+
+    def commit(self):
+        """先将归档数据fsync落盘，再追加索引，保证索引指向的数据都已完整"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                self._pack.flush()
+                os.fsync(self._pack.fileno())
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    for entry in pending:
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                for entry in pending:
+                    self._entries[entry['path']] = entry
+            except Exception as e:
+                print(f"写入归档索引失败: {str(e)}")
+
+    def close(self):
+        """提交剩余成员并关闭归档"""
+        with self._lock:
+            self.commit()
+            self._pack.close()
+
+
+class PackArchiveReader:
+    """单文件归档读取器，按索引随机读取成员"""
+
+    def __init__(self, pack_path):
+        """初始化读取器
+
+        Args:
+            pack_path: .pack 文件路径
+        """
+        self.pack_path = pack_path
+        self.index_path = os.path.splitext(pack_path)[0] + INDEX_EXTENSION
+        self.entries = _load_index(self.index_path)
+
+    def list(self):
+        """列出所有成员名称"""
+        return sorted(self.entries)
+
+    def read_bytes(self, path):
+        """读取成员内容
+
+        Args:
+            path: 成员名称
+
+        Returns:
+            bytes: 成员内容
+        """
+        entry = self.entries.get(path)
+        if not entry:
+            raise FileNotFoundError(path)
+        with open(self.pack_path, 'rb') as f:
+            f.seek(entry['offset'])
+            return f.read(entry['size'])
+
+    def read_text(self, path, encoding='utf-8'):
+        """读取文本成员"""
+        return self.read_bytes(path).decode(encoding)
+
+    def extract(self, dest_dir, members=None):
+        """解包到目录
+
+        Args:
+            dest_dir: 目标目录
+            members: 要解包的成员名称，默认全部
+
+        Returns:
+            int: 解包的成员数
+        """
+        count = 0
+        with open(self.pack_path, 'rb') as f:
+            for name in members or self.list():
+                entry = self.entries[name]
+                target = os.path.join(dest_dir, *name.split('/'))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                f.seek(entry['offset'])
+                with open(target, 'wb') as out:
+                    out.write(f.read(entry['size']))
+                count += 1
+        return count
+
+
+if __name__ == '__main__':
+    # 命令行用法：python -m utils.pack_archive <归档.pack> [解包目录]
+    import sys
+    if len(sys.argv) < 2:
+        print("用法: python -m utils.pack_archive <归档.pack> [解包目录]")
+        sys.exit(1)
+    reader = PackArchiveReader(sys.argv[1])
+    if len(sys.argv) > 2:
+        print(f"已解包 {reader.extract(sys.argv[2])} 个文件到 {sys.argv[2]}")
+    else:
+        for name in reader.list():
+            print(f"{reader.entries[name]['size']:>10}  {name}")
@@ -3,7 +3,19 @@ import random
 import threading
 import queue
 import requests
+from collections import deque
 from PyQt6.QtCore import QThread, pyqtSignal
+from utils.fakeid_cache import get_fakeid_cache
+from utils.metrics import get_metrics, STAGE_SEARCH_GZH, STAGE_PAGE_FETCH
+from utils.endpoints import get_mp_base_url, get_mp_host
+from utils.url_canonical import canonicalize_article_url, ArticleDedupeIndex
+from utils.session_manager import get_session_manager, SessionExpired
+
+# 每批并发抓取的页数
+BATCH_PAGES = 10
+
+# 非登录失效原因失败的页面最多重试次数
+PAGE_RETRY_LIMIT = 2
 
 class SearchThread(QThread):
     """搜索线程，避免UI卡顿"""
@@ -11,36 +23,62 @@ class SearchThread(QThread):
     search_failed = pyqtSignal(str)    # 搜索失败信号
     search_progress = pyqtSignal(int, int)  # 搜索进度信号，当前数量和总数量
     search_complete = pyqtSignal(int)  # 搜索完成信号，传递总文章数
+    search_paused = pyqtSignal(str)    # 登录失效，搜索暂停等待重新登录
+    search_resumed = pyqtSignal()      # 重新登录后继续搜索
     
-    def __init__(self, gzh_name, login_info, article_limit=0):
+    def __init__(self, gzh_name, login_info, article_limit=0, fakeid_cache=None, session_manager=None):
         super().__init__()
         self.gzh_name = gzh_name
         self.login_info = login_info
         self.article_limit = article_limit
+        # fakeid缓存，命中时不再请求searchbiz接口
+        self.fakeid_cache = fakeid_cache or get_fakeid_cache()
+        # 公众号信息（fakeid、昵称、头像）
+        self.account_info = None
+        # 性能指标
+        self.metrics = get_metrics()
         self.searching = True
         self.articles_queue = queue.Queue()
+        # 会话管理，登录失效时暂停，重新登录后继续
+        self.session_manager = session_manager or get_session_manager()
+        # 本批次抓取失败的页面 [(offset, 是否因登录失效)]
+        self.failed_pages = []
+        self._failed_lock = threading.Lock()
+        # 已抓取的文章，分页重叠或同一文章不同链接时只输出一次
+        self.seen_articles = ArticleDedupeIndex()
+        # 接口地址，可指向本地模拟服务
+        self.base_url = get_mp_base_url()
+        # 批次间随机延时范围（秒），避免被封
+        self.batch_delay = (3, 5)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': "https://mp.weixin.qq.com/",
-            "Host": "mp.weixin.qq.com",
+            'Referer': f"{self.base_url}/",
+            "Host": get_mp_host(self.base_url),
             "Cookie": self.login_info['cookie']
         }
         
     def run(self):
         try:
             # 搜索公众号fakeid
-            fakeid = self.search_gzh(self.gzh_name)
+            fakeid = self.call_with_session(self.search_gzh, self.gzh_name)
+            if not self.searching:
+                self.search_complete.emit(0)
+                return
             if not fakeid:
                 self.search_failed.emit(f"未找到 {self.gzh_name} 的公众号信息")
                 return
                 
             # 获取文章总数
-            first_page = requests.get(
-                f'https://mp.weixin.qq.com/cgi-bin/appmsg?action=list_ex&begin=0&count=5&fakeid={fakeid}&type=9&query=&token={self.login_info["token"]}&lang=zh_CN&f=json&ajax=1',
-                headers=self.headers
-            ).json()
+            first_page = self.call_with_session(
+                self.get_json,
+                f'{self.base_url}/cgi-bin/appmsg?action=list_ex&begin=0&count=5&fakeid={fakeid}&type=9&query=&token={{token}}&lang=zh_CN&f=json&ajax=1',
+                STAGE_PAGE_FETCH
+            )
+            if not self.searching:
+                self.search_complete.emit(0)
+                return
             
-            if first_page.get('app_msg_cnt'):
+            if first_page and first_page.get('app_msg_cnt'):
                 total_articles = first_page['app_msg_cnt']
                 total_pages = (total_articles - 1) // 5 + 1
                 
@@ -50,19 +88,18 @@ class SearchThread(QThread):
                     total_pages = (total_articles - 1) // 5 + 1
                 
                 articles_count = 0
+                # 待抓取的页面，失败的页面重新排队
+                pending = deque(page * 5 for page in range(total_pages))
+                attempts = {}
                 
                 # 开始抓取文章
-                for batch_start in range(0, total_pages, 10):
-                    if not self.searching:
-                        break
-                        
+                while pending and self.searching:
                     threads = []
-                    batch_end = min(batch_start + 10, total_pages)
+                    batch = [pending.popleft() for _ in range(min(BATCH_PAGES, len(pending)))]
                     
-                    for page in range(batch_start, batch_end):
+                    for offset in batch:
                         if not self.searching:
                             break
-                        offset = page * 5
                         t = threading.Thread(target=self.fetch_page, args=(offset, fakeid))
                         t.daemon = True
                         threads.append(t)
@@ -85,9 +122,27 @@ class SearchThread(QThread):
                                 self.searching = False
                                 break
                     
+                    # 失败的页面放回队首，登录失效的页面总是重试
+                    retry = []
+                    session_expired = False
+                    for offset, expired in self.take_failed_pages():
+                        session_expired = session_expired or expired
+                        if not expired:
+                            attempts[offset] = attempts.get(offset, 0) + 1
+                            if attempts[offset] > PAGE_RETRY_LIMIT:
+                                print(f"页面多次抓取失败，已跳过 (offset={offset})")
+                                continue
+                        retry.append(offset)
+                    pending.extendleft(reversed(retry))
+                    
+                    # 登录失效时暂停，重新登录后继续
+                    if self.searching and session_expired:
+                        if not self.wait_for_session():
+                            break
+                    
                     # 批次间延时，避免被封
-                    if batch_end < total_pages and self.searching:
-                        delay = random.randint(3, 5)
+                    if pending and self.searching:
+                        delay = random.uniform(*self.batch_delay)
                         time.sleep(delay)
                 
                 self.search_complete.emit(articles_count)
@@ -97,17 +152,102 @@ class SearchThread(QThread):
         except Exception as e:
             self.search_failed.emit(f"搜索过程出错: {str(e)}")
     
+    def wait_for_session(self):
+        """登录失效时暂停搜索，等待重新登录
+        
+        Returns:
+            bool: 已重新登录返回True，等待期间搜索被停止返回False
+        """
+        self.search_paused.emit("公众号登录已失效，请重新扫码登录，登录后自动继续")
+        login_info = self.session_manager.wait_until_valid(lambda: not self.searching)
+        if not login_info:
+            return False
+        self.login_info = login_info
+        self.headers['Cookie'] = login_info['cookie']
+        self.search_resumed.emit()
+        return True
+    
+    def call_with_session(self, func, *args):
+        """调用依赖登录的请求，登录失效时等待重新登录后重试
+        
+        Returns:
+            请求结果，等待期间搜索被停止时为None
+        """
+        while self.searching:
+            try:
+                return func(*args)
+            except SessionExpired:
+                if not self.wait_for_session():
+                    return None
+        return None
+    
+    def get_json(self, url, stage, timeout=None):
+        """请求接口并检查登录是否失效
+        
+        Args:
+            url: 接口地址，{token} 替换为当前token，重新登录后自动使用新token
+            stage: 性能指标阶段
+            timeout: 请求超时（秒）
+            
+        Returns:
+            dict: 接口返回的JSON
+            
+        Raises:
+            SessionExpired: 登录已失效
+        """
+        with self.metrics.timer(stage):
+            response = requests.get(url.replace('{token}', self.login_info["token"]), headers=self.headers, timeout=timeout)
+        self.metrics.observe_response(response, stage)
+        data = response.json()
+        if self.session_manager.report_response(data):
+            raise SessionExpired(data.get('base_resp', {}).get('err_msg', ''))
+        return data
+    
+    def take_failed_pages(self):
+        """取出本批次失败的页面"""
+        with self._failed_lock:
+            failed, self.failed_pages = self.failed_pages, []
+        return failed
+    
     def stop_search(self):
         """停止搜索"""
         self.searching = False
     
     def search_gzh(self, gzh_name):
-        """搜索公众号fakeid"""
-        search_url = f'https://mp.weixin.qq.com/cgi-bin/searchbiz?action=search_biz&token={self.login_info["token"]}&lang=zh_CN&f=json&ajax=1&random={time.time()}&query={gzh_name}&begin=0&count=5'
-        response = requests.get(search_url, headers=self.headers)
-        data = response.json()
+        """搜索公众号fakeid，优先使用本地缓存"""
+        cached = self.fakeid_cache.get(gzh_name)
+        if cached:
+            self.account_info = cached
+            return cached['fakeid']
+        
+        search_url = f'{self.base_url}/cgi-bin/searchbiz?action=search_biz&token={{token}}&lang=zh_CN&f=json&ajax=1&random={time.time()}&query={gzh_name}&begin=0&count=5'
+        try:
+            data = self.get_json(search_url, STAGE_SEARCH_GZH)
+        except Exception as e:
+            # 重新解析失败时使用已过期的缓存兜底
+            stale = self.fakeid_cache.get(gzh_name, allow_expired=True)
+            if stale:
+                print(f"搜索公众号失败，使用过期缓存: {str(e)}")
+                self.account_info = stale
+                return stale['fakeid']
+            raise
+        
         if data.get('list'):
-            return data['list'][0]['fakeid']
+            account = data['list'][0]
+            self.fakeid_cache.set(
+                gzh_name,
+                account['fakeid'],
+                nickname=account.get('nickname', ''),
+                avatar=account.get('round_head_img', '')
+            )
+            self.account_info = self.fakeid_cache.get(gzh_name)
+            return account['fakeid']
+        
+        # 接口未返回结果（如触发频率限制）时同样使用过期缓存兜底
+        stale = self.fakeid_cache.get(gzh_name, allow_expired=True)
+        if stale:
+            self.account_info = stale
+            return stale['fakeid']
         return None
     
     def fetch_page(self, offset, fakeid):
@@ -116,9 +256,8 @@ class SearchThread(QThread):
             return
             
         try:
-            article_url = f'https://mp.weixin.qq.com/cgi-bin/appmsg?action=list_ex&begin={offset}&count=5&fakeid={fakeid}&type=9&query=&token={self.login_info["token"]}&lang=zh_CN&f=json&ajax=1'
-            response = requests.get(article_url, headers=self.headers, timeout=10)
-            data = response.json()
+            article_url = f'{self.base_url}/cgi-bin/appmsg?action=list_ex&begin={offset}&count=5&fakeid={fakeid}&type=9&query=&token={{token}}&lang=zh_CN&f=json&ajax=1'
+            data = self.get_json(article_url, STAGE_PAGE_FETCH, timeout=10)
             
             if not self.searching:
                 return
@@ -126,9 +265,13 @@ class SearchThread(QThread):
             if data.get('app_msg_list'):
                 new_articles = []
                 for a in data['app_msg_list']:
+                    link = canonicalize_article_url(a['link'])
+                    if not self.seen_articles.add(link):
+                        self.metrics.inc('articles_deduplicated')
+                        continue
                     article = {
                         '标题': a['title'],
-                        '链接': a['link'],
+                        '链接': link,
                         '发布时间': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(a.get('create_time', 0))),
                         '阅读数': a.get('read_num', 0),
                         '封面': a.get('cover', '')
@@ -137,5 +280,20 @@ class SearchThread(QThread):
                 
                 if self.searching:
                     self.articles_queue.put(new_articles)
+            else:
+                ret = data.get('base_resp', {}).get('ret', 'empty')
+                self.metrics.inc_error(STAGE_PAGE_FETCH, ret)
+                # 频率限制等错误时页面重新排队，正常返回的空页面不再重试
+                if ret != 0:
+                    self.add_failed_page(offset, False)
+        except SessionExpired:
+            self.metrics.inc_error(STAGE_PAGE_FETCH, 'session_expired')
+            self.add_failed_page(offset, True)
         except Exception as e:
             print(f"抓取页面出错 (offset={offset}): {str(e)}")
+            self.add_failed_page(offset, False)
+    
+    def add_failed_page(self, offset, expired):
+        """记录失败的页面，批次结束后重新排队"""
+        with self._failed_lock:
+            self.failed_pages.append((offset, expired))
@@ -0,0 +1,222 @@
+import time
+import threading
+import requests
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from utils.endpoints import get_mp_base_url, get_mp_host
+
+
+# 表示登录已失效的 base_resp.ret（200003: 会话失效，200040: token无效）
+SESSION_EXPIRED_RETS = (200003, 200040)
+
+# 保活请求间隔（秒），可通过 config.json 的 SESSION_KEEPALIVE_INTERVAL 修改
+DEFAULT_KEEPALIVE_INTERVAL = 600
+
+# 登录超过该时长（秒）后缩短保活间隔，尽早发现失效
+AGING_TOKEN_AGE = 3 * 24 * 3600
+AGING_KEEPALIVE_INTERVAL = 120
+
+# 保活请求超时（秒）
+PING_TIMEOUT = 10
+
+
+class SessionExpired(Exception):
+    """公众号登录已失效"""
+
+
+def is_session_expired(data):
+    """根据接口返回的 base_resp.ret 判断登录是否已失效
+
+    Args:
+        data: 接口返回的JSON
+
+    Returns:
+        bool: 是否已失效
+    """
+    if not isinstance(data, dict):
+        return False
+    base_resp = data.get('base_resp') or {}
+    try:
+        return int(base_resp.get('ret', 0)) in SESSION_EXPIRED_RETS
+    except (TypeError, ValueError):
+        return False
+
+
+class SessionManager(QObject):
+    """公众号会话管理
+
+    记录登录时间，定时请求轻量接口保持会话活跃；任何接口返回登录失效时
+    通过 report_response 标记失效并发出 session_expired，依赖登录的采集
+    线程在 wait_until_valid 处暂停，重新登录后 set_login 恢复。
+    """
+
+    session_expired = pyqtSignal()        # 登录已失效，需要重新扫码
+    session_resumed = pyqtSignal(dict)    # 重新登录后的登录信息
+
+    # 内部信号：保活线程 -> 界面线程，安排下一次保活
+    _ping_done = pyqtSignal()
+
+    def __init__(self, keepalive_interval=None, parent=None):
+        """初始化
+
+        Args:
+            keepalive_interval: 保活请求间隔（秒），默认读取配置
+        """
+        super().__init__(parent)
+        if keepalive_interval is None:
+            keepalive_interval = _get_config_interval()
+        self.keepalive_interval = keepalive_interval
+        self.base_url = get_mp_base_url()
+        self.login_info = None
+        self.logged_in_at = None
+        self.last_ok_at = None
+        self._lock = threading.Lock()
+        self._valid = threading.Event()
+        self._pinging = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.ping)
+        self._ping_done.connect(self._on_ping_done)
+
+    def is_valid(self):
+        """当前登录是否有效"""
+        return self._valid.is_set()
+
+    def token_age(self):
+        """登录时长（秒），未登录时为None"""
+        if self.logged_in_at is None:
+            return None
+        return time.time() - self.logged_in_at
+
+    def set_login(self, login_info):
+        """登录成功（含重新登录）后调用，恢复暂停的采集并开始保活
+
+        Args:
+            login_info: 登录信息 {'token', 'cookie', 'login_time'}
+        """
+        with self._lock:
+            self.login_info = dict(login_info)
+            self.logged_in_at = login_info.get('login_time') or time.time()
+            self.last_ok_at = time.time()
+            was_valid = self._valid.is_set()
+            self._valid.set()
+        self._schedule_ping()
+        if not was_valid:
+            self.session_resumed.emit(dict(login_info))
+
+    def clear(self):
+        """注销时调用，停止保活"""
+        with self._lock:
+            self.login_info = None
+            self.logged_in_at = None
+            self._valid.clear()
+        self._timer.stop()
+
+    def report_response(self, data):
+        """检查接口返回，登录失效时标记失效，可在任意线程中调用
+
+        Args:
+            data: 接口返回的JSON
+
+        Returns:
+            bool: 登录是否已失效
+        """
+        if is_session_expired(data):
+            self.mark_expired()
+            return True
+        self.last_ok_at = time.time()
+        return False
+
+    def mark_expired(self):
+        """标记登录失效，同一次失效只通知一次"""
+        with self._lock:
+            was_valid = self._valid.is_set()
+            self._valid.clear()
+        if was_valid:
+            print("公众号登录已失效，暂停采集等待重新登录")
+            self.session_expired.emit()
+
+    def wait_until_valid(self, should_stop=None, poll=1.0):
+        """阻塞直到重新登录，供采集线程使用
+
+        Args:
+            should_stop: 返回True时放弃等待的函数（如搜索已停止）
+            poll: 检查 should_stop 的间隔（秒）
+
+        Returns:
+            dict: 新的登录信息，放弃等待时为None
+        """
+        while not self._valid.wait(poll):
+            if should_stop and should_stop():
+                return None
+        with self._lock:
+            return dict(self.login_info) if self.login_info else None
+
+    def _schedule_ping(self):
+        """按登录时长安排下一次保活请求"""
+        interval = self.keepalive_interval
+        age = self.token_age()
+        if age is not None and age > AGING_TOKEN_AGE:
+            interval = min(interval, AGING_KEEPALIVE_INTERVAL)
+        self._timer.start(int(interval * 1000))
+
+    def ping(self):
+        """在后台线程请求轻量接口，检查并保持会话"""
+        if not self._valid.is_set() or self._pinging:
+            return
+        self._pinging = True
+        threading.Thread(target=self._ping, args=(dict(self.login_info),), daemon=True).start()
+
+    def _ping(self, login_info):
+        try:
+            response = requests.get(
+                f'{self.base_url}/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1',
+                headers={
+                    'Referer': f"{self.base_url}/",
+                    'Host': get_mp_host(self.base_url),
+                    'Cookie': login_info['cookie'],
+                },
+                timeout=PING_TIMEOUT
+            )
+            data = response.json()
+            if is_session_expired(data):
+                self.mark_expired()
+            elif (data.get('base_resp') or {}).get('ret') == 0:
+                self.last_ok_at = time.time()
+            else:
+                # 频率限制等其他错误不代表登录失效，下次保活时再检查
+                print(f"会话保活返回异常: {data.get('base_resp')}")
+        except Exception as e:
+            # 网络错误不代表登录失效，下次保活时再检查
+            print(f"会话保活请求失败: {str(e)}")
+        finally:
+            self._pinging = False
+            self._ping_done.emit()
+
+    def _on_ping_done(self):
+        if self._valid.is_set():
+            self._schedule_ping()
+
+
+def _get_config_interval():
+    try:
+        from utils.config_manager import ConfigManager
+        return int(ConfigManager().get('SESSION_KEEPALIVE_INTERVAL', DEFAULT_KEEPALIVE_INTERVAL))
+    except Exception as e:
+        print(f"读取保活间隔配置失败: {str(e)}")
+        return DEFAULT_KEEPALIVE_INTERVAL
+
+
+_session_manager = None
+
+def get_session_manager():
+    """获取全局公众号会话管理器，需在界面线程中首次调用
+
+    Returns:
+        SessionManager: 会话管理器
+    """
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager()
+    return _session_manager
@@ -0,0 +1,121 @@
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 公众号文章域名
+MP_ARTICLE_HOST = 'mp.weixin.qq.com'
+
+# 确定一篇文章的参数，其余参数（chksm、scene、srcid、sharer_* 等）随分享场景变化
+IDENTITY_PARAMS = ('__biz', 'mid', 'idx', 'sn')
+
+
+def _parse(url):
+    # 接口返回的链接中 & 可能被转义为 &amp;
+    url = (url or '').strip().replace('&amp;', '&')
+    parts = urlsplit(url)
+    return parts, dict(parse_qsl(parts.query, keep_blank_values=True))
+
+
+def _is_long_link(query):
+    """是否为带文章参数的长链接：至少有 __biz 和 mid（idx 缺省时为第一篇）
+
+    canonicalize_article_url 和 article_identity 共用此规则，两者对同一链接的判断一致。
+    """
+    return bool(query.get('__biz') and query.get('mid'))
+
+
+def _identity_params(query):
+    """长链接的文章参数，缺省或为空的 idx 按第一篇补为 1"""
+    values = {name: query.get(name, '') for name in IDENTITY_PARAMS}
+    values['idx'] = values['idx'] or '1'
+    return values
+
+
+def canonicalize_article_url(url):
+    """将文章链接规范化，同一篇文章的不同链接得到同一地址
+
+    长链接只保留 __biz、mid、idx、sn 参数，短链接 /s/<id> 去掉参数和锚点，
+    公众号文章统一使用 https。无法识别的链接原样返回（去掉锚点）。
+
+    Args:
+        url: 文章链接
+
+    Returns:
+        str: 规范化后的链接
+    """
+    parts, query = _parse(url)
+    if not parts.netloc:
+        return url
+    host = parts.netloc.lower()
+    # 公众号文章统一使用 https，其他地址（如本地模拟服务）保留原协议
+    scheme = 'https' if host == MP_ARTICLE_HOST else parts.scheme
+
+    if _is_long_link(query):
+        params = [(name, value) for name, value in _identity_params(query).items() if value]
+        return urlunsplit((scheme, host, '/s', urlencode(params), ''))
+
+    path = parts.path.rstrip('/')
+    if path.startswith('/s/'):
+        return urlunsplit((scheme, host, path, '', ''))
+
+    return urlunsplit((parts.scheme, host, parts.path, parts.query, ''))
+
+
+def article_identity(url):
+    """获取文章标识，用于去重和索引
+
+    Args:
+        url: 文章链接
+
+    Returns:
+        str: 长链接为 biz|mid|idx|sn，短链接为 域名/s/<id>，其余为规范化后的链接
+    """
+    parts, query = _parse(url)
+    if _is_long_link(query):
+        return '|'.join(_identity_params(query).values())
+    path = parts.path.rstrip('/')
+    if path.startswith('/s/'):
+        return f"{parts.netloc.lower()}{path}"
+    return canonicalize_article_url(url)
+
+
+class ArticleDedupeIndex:
+    """文章去重索引，按文章标识记录已出现的文章，线程安全"""
+
+    def __init__(self, urls=None):
+        """初始化去重索引
+
+        Args:
+            urls: 已有的文章链接
+        """
+        self._lock = threading.Lock()
+        self._seen = {article_identity(url) for url in urls or []}
+
+    def add(self, url):
+        """记录文章
+
+        Args:
+            url: 文章链接
+
+        Returns:
+            bool: 首次出现返回True，重复返回False
+        """
+        key = article_identity(url)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+    def discard(self, url):
+        """移除文章记录，如下载失败后允许重新加入"""
+        with self._lock:
+            self._seen.discard(article_identity(url))
+
+    def __contains__(self, url):
+        with self._lock:
+            return article_identity(url) in self._seen
+
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
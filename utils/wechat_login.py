@@ -6,6 +6,7 @@ import requests
 from urllib.parse import urlparse, parse_qs
 from fake_useragent import UserAgent
 from threading import Thread
+from utils.endpoints import get_mp_base_url, get_mp_host
 
 class QRCodeDisplay(Thread):
     """显示二维码的线程类"""
@@ -27,8 +28,45 @@ class QRCodeDisplay(Thread):
                 f.write(self.image_content)
             print("二维码已保存为 qrcode.png")
 
+# 二维码状态（scanloginqrcode?action=ask 返回的 status）
+QR_STATUS_WAITING = 0       # 等待扫码
+QR_STATUS_CONFIRMED = 1     # 已确认登录
+QR_STATUS_EXPIRED = (2, 3)  # 二维码已过期
+QR_STATUS_SCANNED = (4, 6)  # 已扫码，等待确认
+
+# 轮询间隔（秒）：等待扫码时逐步放慢，扫码后加快以尽快完成登录
+POLL_INTERVAL_MIN = 1.0
+POLL_INTERVAL_MAX = 3.0
+POLL_INTERVAL_BACKOFF = 1.5
+POLL_INTERVAL_SCANNED = 0.5
+
+# 单次请求超时（秒）
+REQUEST_TIMEOUT = 10
+
+
+def next_poll_interval(status, previous=None):
+    """根据二维码状态计算下一次轮询间隔
+
+    Args:
+        status: 本次查询到的二维码状态
+        previous: 上一次的轮询间隔
+
+    Returns:
+        float: 下一次轮询前等待的秒数
+    """
+    if status in QR_STATUS_SCANNED:
+        return POLL_INTERVAL_SCANNED
+    if previous is None or previous < POLL_INTERVAL_MIN:
+        return POLL_INTERVAL_MIN
+    return min(previous * POLL_INTERVAL_BACKOFF, POLL_INTERVAL_MAX)
+
+
 class WeChatLoginAPI:
-    """微信公众号登录API"""
+    """微信公众号登录API
+
+    扫码登录拆分为 start_qr_session / ask_qr_status / finish_qr_login 三步，
+    由调用方决定轮询方式；login() 为命令行下的阻塞式完整流程。
+    """
     
     def __init__(self, cookie_path=None, cookie_json_path=None):
         """
@@ -39,10 +77,11 @@ class WeChatLoginAPI:
             cookie_json_path: token和cookie信息的JSON文件保存路径
         """
         self.ua = UserAgent()
+        self.base_url = get_mp_base_url()
         self.headers = {
             'User-Agent': self.ua.random, 
-            'Referer': "https://mp.weixin.qq.com/", 
-            "Host": "mp.weixin.qq.com"
+            'Referer': f"{self.base_url}/", 
+            "Host": get_mp_host(self.base_url)
         }
         
         # 创建cookies目录
@@ -54,6 +93,57 @@ class WeChatLoginAPI:
         self.cookie_path = cookie_path or os.path.join(cookies_dir, 'gzhcookies.cookie')
         self.cookie_json_path = cookie_json_path or os.path.join(cookies_dir, 'cookie.json')
     
+    def load_cached_login(self):
+        """
+        读取本地保存的登录信息，不发送网络请求
+        
+        Returns:
+            tuple: (session, login_info)，本地没有完整的登录信息时为 (None, None)
+        """
+        if not os.path.exists(self.cookie_path) or not os.path.exists(self.cookie_json_path):
+            return None, None
+        try:
+            session = requests.session()
+            with open(self.cookie_path, 'rb') as f:
+                session.cookies = pickle.load(f)
+            with open(self.cookie_json_path, 'r') as f:
+                login_info = json.load(f)
+        except Exception as e:
+            print(f"读取登录信息失败: {e}")
+            return None, None
+        if not login_info.get('token') or not login_info.get('cookie'):
+            return None, None
+        # 旧版本未保存登录时间，以文件修改时间代替
+        login_info.setdefault('login_time', int(os.path.getmtime(self.cookie_json_path)))
+        return session, login_info
+    
+    def clear_cached_login(self):
+        """删除本地保存的cookies和token"""
+        for path in (self.cookie_path, self.cookie_json_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"删除登录信息失败: {e}")
+    
+    def check_session(self, session, timeout=REQUEST_TIMEOUT):
+        """
+        检查会话中的cookies是否仍然有效
+        
+        Args:
+            session: requests.Session对象
+            timeout: 请求超时（秒）
+            
+        Returns:
+            bool: 是否已登录
+        """
+        data = session.get(
+            f"{self.base_url}/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1",
+            timeout=timeout
+        ).json()
+        return data.get('base_resp', {}).get('ret') == 0
+    
     def is_login(self, session):
         """
         检查当前会话是否已登录
@@ -64,109 +154,136 @@ class WeChatLoginAPI:
         Returns:
             tuple: (session, 是否已登录)
         """
-        try:
-            session.cookies.load(ignore_discard=True)
-        except Exception:
-            pass
-            
-        login_url = session.get(
-            "https://mp.weixin.qq.com/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1"
-        ).json()
-        
-        if login_url['base_resp']['ret'] == 0:
+        if self.check_session(session):
             print('Cookies值有效，无需扫码登录！')
             return session, True
         else:
             print('Cookies值已经失效，请重新扫码登录！')
             return session, False
     
-    def login(self):
+    def start_qr_session(self, timeout=REQUEST_TIMEOUT):
         """
-        登录微信公众号
+        开始扫码登录，获取登录二维码
         
+        Args:
+            timeout: 请求超时（秒）
+            
         Returns:
-            dict: 包含token和cookie的字典
+            tuple: (session, 二维码图片内容)
         """
-        # 创建会话并尝试加载已有cookies
         session = requests.session()
-        if not os.path.exists(self.cookie_path):
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
-            with open(self.cookie_path, 'wb') as f:
-                pickle.dump(session.cookies, f)
-        
-        # 读取cookies
-        session.cookies = pickle.load(open(self.cookie_path, 'rb'))
-        session, status = self.is_login(session)
-        
-        # 如果未登录，则进行扫码登录
-        if not status:
-            session = requests.session()
-            session.get('https://mp.weixin.qq.com/', headers=self.headers)
-            session.post(
-                'https://mp.weixin.qq.com/cgi-bin/bizlogin?action=startlogin',
-                data='userlang=zh_CN&redirect_url=&login_type=3&sessionid={}&token=&lang=zh_CN&f=json&ajax=1'.format(
-                    int(time.time() * 1000)
-                ), 
-                headers=self.headers
-            )
+        session.get(f'{self.base_url}/', headers=self.headers, timeout=timeout)
+        session.post(
+            f'{self.base_url}/cgi-bin/bizlogin?action=startlogin',
+            data='userlang=zh_CN&redirect_url=&login_type=3&sessionid={}&token=&lang=zh_CN&f=json&ajax=1'.format(
+                int(time.time() * 1000)
+            ), 
+            headers=self.headers,
+            timeout=timeout
+        )
+        
+        # 获取登录二维码
+        qrcode = session.get(
+            f'{self.base_url}/cgi-bin/scanloginqrcode?action=getqrcode&random={int(time.time() * 1000)}',
+            timeout=timeout
+        )
+        return session, qrcode.content
+    
+    def ask_qr_status(self, session, timeout=REQUEST_TIMEOUT):
+        """
+        查询二维码状态
+        
+        Args:
+            session: start_qr_session 返回的会话
+            timeout: 请求超时（秒）
             
-            # 获取登录二维码
-            login_url = session.get(
-                'https://mp.weixin.qq.com/cgi-bin/scanloginqrcode?action=getqrcode&random={}'.format(
-                    int(time.time() * 1000)
-                )
-            )
+        Returns:
+            int: 二维码状态，见 QR_STATUS_*
+        """
+        data = session.get(
+            f'{self.base_url}/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1',
+            timeout=timeout
+        ).json()
+        return data.get('status')
+    
+    def finish_qr_login(self, session, timeout=REQUEST_TIMEOUT):
+        """
+        扫码确认后完成登录，保存cookies和token信息
+        
+        Args:
+            session: start_qr_session 返回的会话
+            timeout: 请求超时（秒）
             
-            date_url = 'https://mp.weixin.qq.com/cgi-bin/scanloginqrcode?action=ask&token=&lang=zh_CN&f=json&ajax=1'
+        Returns:
+            dict: 包含token和cookie的字典
+        """
+        url = session.post(
+            f'{self.base_url}/cgi-bin/bizlogin?action=login',
+            data='userlang=zh_CN&redirect_url=&cookie_forbidden=0&cookie_cleaned=1&plugin_used=0&login_type=3&token=&lang=zh_CN&f=json&ajax=1',
+            headers=self.headers,
+            timeout=timeout
+        ).json()
+        
+        # 解析token
+        token = parse_qs(urlparse(url['redirect_url']).query).get('token', [None])[0]
+        session.get(f"{self.base_url}{url['redirect_url']}", headers=self.headers, timeout=timeout)
+        
+        # 保存cookies和token信息
+        cookie = '; '.join([f"{name}={value}" for name, value in session.cookies.items()])
+        
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
+        with open(self.cookie_path, 'wb') as f:
+            pickle.dump(session.cookies, f)
             
-            # 显示二维码
-            t = QRCodeDisplay(login_url.content)
-            t.start()
+        login_info = {'token': token, 'cookie': cookie, 'login_time': int(time.time())}
+        
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.cookie_json_path), exist_ok=True)
+        with open(self.cookie_json_path, 'w') as f:
+            json.dump(login_info, f, ensure_ascii=False)
             
-            # 轮询登录状态
-            while True:
-                date = session.get(date_url).json()
-                if date['status'] == 0:
-                    print('二维码未失效，请扫码！')
-                elif date['status'] == 6:
+        return login_info
+    
+    def login(self):
+        """
+        登录微信公众号（阻塞，命令行使用；界面中使用 utils.login_state）
+        
+        Returns:
+            dict: 包含token和cookie的字典
+        """
+        # 尝试使用已保存的cookies
+        session, login_info = self.load_cached_login()
+        if session is not None:
+            session, status = self.is_login(session)
+            if status:
+                return login_info
+        
+        # 扫码登录
+        session, qrcode = self.start_qr_session()
+        
+        # 显示二维码
+        t = QRCodeDisplay(qrcode)
+        t.start()
+        
+        # 轮询登录状态
+        interval = None
+        last_status = None
+        while True:
+            status = self.ask_qr_status(session)
+            if status == QR_STATUS_CONFIRMED:
+                print('已确认，登录成功！')
+                return self.finish_qr_login(session)
+            if status in QR_STATUS_EXPIRED:
+                raise RuntimeError('二维码已过期，请重新登录')
+            if status != last_status:
+                if status in QR_STATUS_SCANNED:
                     print('已扫码，请确认！')
-                elif date['status'] == 1:
-                    print('已确认，登录成功！')
-                    url = session.post(
-                        'https://mp.weixin.qq.com/cgi-bin/bizlogin?action=login',
-                        data='userlang=zh_CN&redirect_url=&cookie_forbidden=0&cookie_cleaned=1&plugin_used=0&login_type=3&token=&lang=zh_CN&f=json&ajax=1',
-                        headers=self.headers
-                    ).json()
-                    
-                    # 解析token
-                    token = parse_qs(urlparse(url['redirect_url']).query).get('token', [None])[0]
-                    session.get('https://mp.weixin.qq.com{}'.format(url['redirect_url']), headers=self.headers)
-                    break
-                    
-                time.sleep(2)
-            
-            # 保存cookies和token信息
-            cookie = '; '.join([f"{name}={value}" for name, value in session.cookies.items()])
-            
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
-            with open(self.cookie_path, 'wb') as f:
-                pickle.dump(session.cookies, f)
-                
-            login_info = {'token': token, 'cookie': cookie}
-            
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.cookie_json_path), exist_ok=True)
-            with open(self.cookie_json_path, 'w') as f:
-                json.dump(login_info, f, ensure_ascii=False)
-                
-            return login_info
-        else:
-            # 已登录，直接返回保存的信息
-            with open(self.cookie_json_path, 'r') as f:
-                login_info = json.load(f)
-            return login_info
+                else:
+                    print('二维码未失效，请扫码！')
+                last_status = status
+            interval = next_poll_interval(status, interval)
+            time.sleep(interval)
     
     def get_session(self):
         """